@@ -1,11 +1,17 @@
 """FastAPI application entry point for MemeVid."""
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from workflows.Jokestruc.graph import _memory
+from workflows.Jokestruc.loop_monitor import install_blocking_audit, start_loop_watchdog
+
 # Import the Jokestruc router
 from workflows.Jokestruc.main import router as jokestruc_router
+from workflows.Jokestruc.metrics import install_metrics, metrics_enabled, render_latest
+from workflows.Jokestruc.profiling import ProfilingMiddleware, profiling_enabled
+from workflows.Jokestruc.utils.sandbox import apply_api_affinity
 
 load_dotenv(override=True)
 
@@ -13,6 +19,12 @@ import logging
 
 logging.basicConfig(level=logging.INFO)
 
+# Keep the API on its own cores when FFMPEG_CPU_AFFINITY reserves the rest
+apply_api_affinity()
+
+# LOOP_BLOCKING_AUDIT=warn|strict flags blocking calls made on the event loop
+install_blocking_audit()
+
 
 app = FastAPI(title="MemeVid API")
 
@@ -25,6 +37,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiles (X-Profile header or PROFILE_SAMPLE_RATE)
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+
+@app.on_event("startup")
+async def watch_event_loop() -> None:
+    """Start the event-loop stall watchdog on the server's loop."""
+    start_loop_watchdog()
+
 
 @app.get("/health")
 async def health() -> dict[str, str]:
@@ -32,5 +54,15 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+if metrics_enabled():
+    install_metrics(_memory)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Expose Prometheus metrics."""
+        body, content_type = render_latest()
+        return Response(content=body, headers={"Content-Type": content_type})
+
+
 # Include Jokestruc workflow endpoints
 app.include_router(jokestruc_router)
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Benchmark the whole Jokestruc graph with stub LLM providers.
+
+Drives the compiled graph over a corpus of clips (synthetic ``testsrc2``
+clips by default), auto-resumes the human review interrupt, and reports
+per-node p50/p95/p99 latency, stub provider call times, checkpoint write
+time, event-loop lag and memory growth per run. Provider latency is
+simulated by ``scripts/stub_providers.py``; no API keys needed.
+
+    python scripts/bench_pipeline.py --runs 5 --durations 8 --json report.json
+    python scripts/bench_pipeline.py --clips a.mp4 b.mp4 --latency openai=0.5
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("RENDER_CACHE_ENABLED", "false")
+os.environ.setdefault("GEMINI_UPLOAD_POLL_SEC", "0.5")
+
+from langgraph.types import Command  # noqa: E402
+
+# ``workflows.Jokestruc.graph`` is imported inside the functions below: it
+# pins the artifact store root on import, and main() sets ARTIFACT_ROOT first.
+from workflows.Jokestruc.loop_monitor import (  # noqa: E402
+    AUDIT_MODES,
+    install_blocking_audit,
+    start_loop_watchdog,
+)
+from workflows.Jokestruc.utils.synthetic_media import make_test_clip  # noqa: E402
+
+from stub_providers import (  # noqa: E402
+    DEFAULT_STUB_LATENCY,
+    StubProviders,
+    parse_latency,
+)
+
+LAG_INTERVAL_SEC = 0.05
+COMPARED_METRICS = ("p50", "p95")
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; ``None`` for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def distribution(values: Sequence[float]) -> Dict[str, Any]:
+    """Summarize durations in milliseconds: count, percentiles, max and total."""
+    def _ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 1)
+
+    return {
+        "count": len(values),
+        "p50": _ms(percentile(values, 50)),
+        "p95": _ms(percentile(values, 95)),
+        "p99": _ms(percentile(values, 99)),
+        "max": _ms(max(values) if values else None),
+        "total": _ms(sum(values)),
+    }
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoopLagMonitor:
+    """Measure how late a periodic sleep wakes up on the running loop."""
+
+    def __init__(self, interval: float = LAG_INTERVAL_SEC) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self) -> None:
+        """Begin sampling on the running loop."""
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling and wait for the sampler task to exit."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class CheckpointTimer:
+    """Time every write the graph's checkpointer performs."""
+
+    def __init__(self, saver: Any) -> None:
+        self.samples: List[float] = []
+        for name in ("aput", "aput_writes"):
+            original = getattr(saver, name)
+            setattr(saver, name, self._timed(original))
+
+    def _timed(self, method: Any) -> Any:
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.samples.append(time.perf_counter() - started)
+
+        return wrapper
+
+
+async def _stream(
+    payload: Any, config: Dict[str, Any], timings: Dict[str, List[float]]
+) -> Optional[Any]:
+    """Stream node updates, timing each node; return the interrupt, if any."""
+    from workflows.Jokestruc import graph
+
+    last = time.perf_counter()
+    interrupt_value = None
+    async for update in graph.app.astream(payload, config, stream_mode="updates"):
+        now = time.perf_counter()
+        for node in update:
+            if node == "__interrupt__":
+                interrupt_value = update[node][0].value
+            else:
+                timings[node].append(now - last)
+        last = now
+    return interrupt_value
+
+
+def _first_caption(candidates: Any) -> str:
+    lines = candidates.splitlines() if isinstance(candidates, str) else candidates
+    for line in lines or []:
+        text = str(line).strip().lstrip("0123456789.) ").strip()
+        if text:
+            return text
+    return "Benchmark caption"
+
+
+async def run_once(
+    clip: Path, render_options: Dict[str, Any], timings: Dict[str, List[float]]
+) -> Dict[str, Any]:
+    """Run one thread end to end, resuming the review interrupt."""
+    config = {"configurable": {"thread_id": f"bench-{uuid.uuid4().hex[:8]}"}}
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+
+    review = await _stream({"input": {"media_path": str(clip)}}, config, timings)
+    if review is None:
+        raise RuntimeError("Graph finished without pausing for human review")
+    resume = {
+        "user_selected_caption": _first_caption(review.get("candidates")),
+        "render_options": render_options,
+    }
+    await _stream(Command(resume=resume), config, timings)
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return {
+        "clip": clip.name,
+        "thread_id": config["configurable"]["thread_id"],
+        "wall_sec": round(elapsed, 3),
+        "rss_mb_after": round(_rss_mb(), 1),
+        "rss_growth_mb": round(_rss_mb() - rss_before, 2),
+    }
+
+
+async def bench(args: argparse.Namespace, clips: List[Path]) -> Dict[str, Any]:
+    """Run every clip through the graph with stubs installed and build the report."""
+    from workflows.Jokestruc import graph
+
+    stubs = StubProviders(
+        parse_latency(args.latency), jitter=args.jitter, seed=args.seed
+    ).install()
+    checkpoints = CheckpointTimer(graph._memory)
+    monitor = LoopLagMonitor()
+    install_blocking_audit(args.audit_blocking)
+    watchdog = start_loop_watchdog()
+    timings: Dict[str, List[float]] = defaultdict(list)
+    render_options: Dict[str, Any] = {"mode": args.mode}
+    if args.no_packaging:
+        render_options["packaging"] = False
+    else:
+        render_options["packaging"] = {"background": False}
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    rss_start = _rss_mb()
+
+    async def _guarded(clip: Path) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_once(clip, render_options, timings)
+
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        corpus = [clips[idx % len(clips)] for idx in range(args.runs)]
+        runs = await asyncio.gather(*(_guarded(clip) for clip in corpus))
+    finally:
+        install_blocking_audit("off")
+        await monitor.stop()
+        if watchdog is not None:
+            await watchdog.stop()
+        stubs.uninstall()
+    wall = time.perf_counter() - started
+
+    return {
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "mode": args.mode,
+            "latency_sec": stubs.latency,
+            "jitter": args.jitter,
+        },
+        "wall_sec": round(wall, 3),
+        "runs": runs,
+        "run_wall": distribution([run["wall_sec"] for run in runs]),
+        "nodes": {node: distribution(values) for node, values in timings.items()},
+        "providers": {
+            kind: distribution(values)
+            for kind, values in stubs.stats.snapshot().items()
+        },
+        "checkpoint_writes": distribution(checkpoints.samples),
+        "loop_lag": distribution(monitor.samples),
+        "loop_stalls": list(watchdog.stalls) if watchdog is not None else [],
+        "memory": {
+            "rss_start_mb": round(rss_start, 1),
+            "rss_end_mb": round(_rss_mb(), 1),
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "checkpointed_threads": len(graph._memory.storage),
+        },
+    }
+
+
+def compare_to_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Flag nodes whose p50/p95 latency grew by more than ``tolerance``."""
+    regressions = []
+    sections = ("nodes", "checkpoint_writes", "loop_lag", "run_wall")
+    for section in sections:
+        current, previous = report.get(section) or {}, baseline.get(section) or {}
+        pairs = (
+            [(section, current, previous)]
+            if section != "nodes"
+            else [
+                (f"nodes.{name}", stats, previous.get(name) or {})
+                for name, stats in current.items()
+            ]
+        )
+        for label, new_stats, old_stats in pairs:
+            for metric in COMPARED_METRICS:
+                old, new = old_stats.get(metric), new_stats.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if change > tolerance:
+                    regressions.append(
+                        f"{label} {metric} {old}ms -> {new}ms (+{change:.0%})"
+                    )
+    return regressions
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    print(f"{'node':<20} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [*report["nodes"].items(), ("(checkpoint)", report["checkpoint_writes"])]
+    rows += [(f"[{kind}]", stats) for kind, stats in report["providers"].items()]
+    for name, stats in rows:
+        print(
+            f"{name:<20} {stats['count']:>4} {stats['p50'] or 0:>9.1f} "
+            f"{stats['p95'] or 0:>9.1f} {stats['p99'] or 0:>9.1f}"
+        )
+    lag, memory = report["loop_lag"], report["memory"]
+    print(
+        f"loop lag p99 {lag['p99'] or 0:.1f} ms, max {lag['max'] or 0:.1f} ms; "
+        f"RSS {memory['rss_start_mb']} -> {memory['rss_end_mb']} MB; "
+        f"wall {report['wall_sec']} s"
+    )
+    for stall in report["loop_stalls"]:
+        last_frame = stall["stack"].strip().splitlines()[-2:]
+        print(f"STALL {stall['stalled_sec'] * 1000:.0f} ms at {' '.join(last_frame)}")
+
+
+def main() -> int:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=Path, nargs="*", default=[])
+    parser.add_argument("--durations", type=float, nargs="+", default=[8.0])
+    parser.add_argument("--size", default="640x360", help="WIDTHxHEIGHT")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--mode", default="burn_in", help="render_options.mode")
+    parser.add_argument("--no-packaging", action="store_true")
+    parser.add_argument(
+        "--latency",
+        nargs="*",
+        default=[],
+        metavar="KIND=SEC",
+        help=f"Override stub latency; kinds: {', '.join(DEFAULT_STUB_LATENCY)}",
+    )
+    parser.add_argument(
+        "--audit-blocking",
+        choices=AUDIT_MODES,
+        default="off",
+        help="Flag blocking calls on the event loop; strict fails the run",
+    )
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against this report")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="memevid-pipeline-") as tmp:
+        os.environ.setdefault("ARTIFACT_ROOT", str(Path(tmp) / "artifacts"))
+        clips = list(args.clips)
+        if not clips:
+            width, height = (int(part) for part in args.size.split("x"))
+            clips = [
+                make_test_clip(
+                    Path(tmp) / f"testsrc_{duration:g}s.mp4",
+                    duration,
+                    width=width,
+                    height=height,
+                )
+                for duration in args.durations
+            ]
+        report = asyncio.run(bench(args, clips))
+
+    regressions: List[str] = []
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        report["regressions"] = regressions
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+    _print_summary(report)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+r"""Benchmark dag_composer + renderer across modes, sizes, lengths and encoders.
+
+Generates synthetic ``testsrc2`` + ``sine`` clips with ffmpeg's lavfi
+sources, then renders every case in a fresh child process so CPU seconds
+and peak RSS cover exactly that case (Python plus its ffmpeg children).
+Results are written as JSON and can be compared against a stored baseline;
+the exit status is 1 when any case regresses. Requires only ffmpeg on PATH.
+
+    python scripts/bench_render.py --sizes 640x360 1280x720 --durations 10 30 \
+        --json results.json --baseline bench_baseline.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+RESULT_PREFIX = "BENCH_RESULT "
+DEFAULT_MODES = ["burn_in", "parallel", "ass", "soft", "sidecar", "targets"]
+BENCH_TARGETS = ["landscape_720", "preview"]
+# Metrics compared against the baseline; lower is better for all of them.
+COMPARED_METRICS = ("wall_sec", "cpu_sec", "peak_rss_mb")
+
+
+def _beats(duration: float, count: int) -> List[Dict[str, Any]]:
+    """Spread ``count`` caption beats evenly across the clip."""
+    step = duration / count
+    return [
+        {
+            "start": round(step * idx, 3),
+            "end": round(step * idx + step * 0.8, 3),
+            "caption": f"Benchmark caption number {idx + 1}",
+            "action": "overlay",
+            "audio_cue": "",
+        }
+        for idx in range(count)
+    ]
+
+
+def _case_id(case: Dict[str, Any]) -> str:
+    return (
+        f"{case['mode']}/{case['size']}/{case['duration']:g}s/"
+        f"{case['beats']}beats/{case['preset']}"
+    )
+
+
+def _output_bytes(output_paths: Dict[str, Any], source: Path) -> int:
+    total = 0
+    for value in output_paths.values():
+        path = Path(str(value))
+        if path != source and path.is_file():
+            total += path.stat().st_size
+    return total
+
+
+async def _render_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Compose and render one case inside the child process."""
+    from workflows.Jokestruc.Nodes.dag_composer import dag_composer
+    from workflows.Jokestruc.Nodes.renderer import renderer
+
+    clip = Path(case["clip"])
+    render_options: Dict[str, Any] = {"mode": case["mode"]}
+    if case["mode"] == "targets":
+        render_options = {"targets": BENCH_TARGETS}
+    state: Dict[str, Any] = {
+        "input": {"media_path": str(clip), "duration_sec": case["duration"]},
+        "timing_plan": {"beats": _beats(case["duration"], case["beats"])},
+        "render_options": render_options,
+    }
+
+    started = time.perf_counter()
+    composed = await dag_composer(state)
+    await renderer({**state, **composed})
+    wall = time.perf_counter() - started
+
+    return {
+        "wall_sec": wall,
+        "steps": len(composed["dag_plan"]),
+        "output_bytes": _output_bytes(composed["output_paths"], clip),
+    }
+
+
+def _cpu_seconds() -> float:
+    """User + system CPU of this process and its reaped ffmpeg children."""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def run_case_in_child(case: Dict[str, Any]) -> None:
+    """Child entry point: render, then report wall, CPU and RSS on stdout."""
+    os.environ["ARTIFACT_ROOT"] = case["artifact_root"]
+    os.environ["RENDER_CACHE_ENABLED"] = "false"
+    os.environ["MEZZANINE_ENABLED"] = "false"
+    os.environ["RENDER_X264_PRESET"] = case["preset"]
+
+    # Import before the first snapshot so module loading is not billed
+    import workflows.Jokestruc.Nodes.dag_composer  # noqa: F401
+    import workflows.Jokestruc.Nodes.renderer  # noqa: F401
+
+    before = _cpu_seconds()
+    result = asyncio.run(_render_case(case))
+    result["cpu_sec"] = _cpu_seconds() - before
+    # ru_maxrss is in KiB on Linux. A child's figure includes the Python image
+    # it was forked from, so the peak only rises above python_rss_mb once an
+    # ffmpeg process itself grows larger than the interpreter.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    result["peak_rss_mb"] = max(own, children) / 1024
+    result["python_rss_mb"] = own / 1024
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def _spawn_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, __file__, "--run-case", json.dumps(case)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX) :])
+    raise RuntimeError(
+        f"Case {_case_id(case)} failed:\n{completed.stderr.strip()[-2000:]}"
+    )
+
+
+def _summarize(case: Dict[str, Any], runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Take the median of each metric across repeats."""
+    wall = statistics.median(run["wall_sec"] for run in runs)
+    return {
+        "id": _case_id(case),
+        "mode": case["mode"],
+        "size": case["size"],
+        "duration_sec": case["duration"],
+        "beats": case["beats"],
+        "preset": case["preset"],
+        "steps": runs[0]["steps"],
+        "wall_sec": round(wall, 3),
+        "cpu_sec": round(statistics.median(run["cpu_sec"] for run in runs), 3),
+        "peak_rss_mb": round(statistics.median(run["peak_rss_mb"] for run in runs), 1),
+        "python_rss_mb": round(max(run["python_rss_mb"] for run in runs), 1),
+        "realtime_factor": round(case["duration"] / wall, 2) if wall else None,
+        "output_bytes": runs[0]["output_bytes"],
+        "runs_wall_sec": [round(run["wall_sec"], 3) for run in runs],
+    }
+
+
+def compare_to_baseline(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return one message per metric that is worse than baseline by > tolerance."""
+    previous = {case["id"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results:
+        before = previous.get(case["id"])
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            case.setdefault("vs_baseline", {})[metric] = round(change, 3)
+            if change > tolerance:
+                regressions.append(
+                    f"{case['id']}: {metric} {old} -> {new} (+{change:.0%})"
+                )
+    return regressions
+
+
+def bench(args: argparse.Namespace, workdir: Path) -> List[Dict[str, Any]]:
+    """Generate clips, then run every case ``--repeat`` times."""
+    from workflows.Jokestruc.utils.synthetic_media import make_test_clip
+
+    results: List[Dict[str, Any]] = []
+    for size, duration in itertools.product(args.sizes, args.durations):
+        width, height = (int(part) for part in size.split("x"))
+        clip = make_test_clip(
+            workdir / f"testsrc_{duration:g}s_{size}.mp4",
+            duration,
+            width=width,
+            height=height,
+        )
+        for mode, beats, preset in itertools.product(
+            args.modes, args.beats, args.presets
+        ):
+            case = {
+                "clip": str(clip),
+                "artifact_root": str(workdir / "artifacts"),
+                "mode": mode,
+                "size": size,
+                "duration": duration,
+                "beats": beats,
+                "preset": preset,
+            }
+            runs = [_spawn_case(case) for _ in range(args.repeat)]
+            summary = _summarize(case, runs)
+            results.append(summary)
+            print(
+                f"{summary['id']:<48} {summary['wall_sec']:7.2f}s "
+                f"cpu {summary['cpu_sec']:7.2f}s "
+                f"rss {summary['peak_rss_mb']:7.1f}MB "
+                f"x{summary['realtime_factor'] or 0:.2f} "
+                f"{summary['output_bytes'] / 1e6:7.2f}MB"
+            )
+    return results
+
+
+def main() -> Optional[int]:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["640x360", "1280x720"])
+    parser.add_argument("--durations", type=float, nargs="+", default=[10.0, 30.0])
+    parser.add_argument("--beats", type=int, nargs="+", default=[4])
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES)
+    parser.add_argument(
+        "--presets", nargs="+", default=["medium"], help="libx264 presets to compare"
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against this file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed relative slowdown before a metric counts as a regression",
+    )
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        run_case_in_child(json.loads(args.run_case))
+        return None
+
+    with tempfile.TemporaryDirectory(prefix="memevid-bench-") as tmp:
+        results = bench(args, Path(tmp))
+
+    report = {
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "cases": results,
+    }
+    regressions: List[str] = []
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        report["regressions"] = regressions
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark segment-parallel rendering against a single ffmpeg process.
+
+Generates synthetic ``testsrc2`` clips, renders the same caption plan once as
+a single encode and then with an increasing number of keyframe-aligned
+chunks, and prints the speedup curve. Requires only ffmpeg on PATH.
+
+    python scripts/bench_segment_render.py --durations 30 120 --size 640x360
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("RENDER_CACHE_ENABLED", "false")
+
+from workflows.Jokestruc.Nodes.dag_composer import dag_composer  # noqa: E402
+from workflows.Jokestruc.Nodes.renderer import renderer  # noqa: E402
+from workflows.Jokestruc.utils.ffmpeg_util import pick_font_path  # noqa: E402
+from workflows.Jokestruc.utils.segment_render import (  # noqa: E402
+    build_segment_parallel_plan,
+)
+from workflows.Jokestruc.utils.synthetic_media import (  # noqa: E402
+    make_test_clip,
+    synthetic_keyframes,
+)
+
+
+def _beats(duration: float) -> List[Dict[str, Any]]:
+    """Spread a few caption beats across the clip."""
+    step = duration / 4
+    return [
+        {
+            "start": round(step * idx, 3),
+            "end": round(step * idx + step * 0.8, 3),
+            "caption": f"Benchmark caption number {idx + 1}",
+            "action": "overlay",
+            "audio_cue": "",
+        }
+        for idx in range(4)
+    ]
+
+
+def _chunk_counts(max_chunks: int) -> List[int]:
+    counts, value = [], 2
+    while value <= max_chunks:
+        counts.append(value)
+        value *= 2
+    return counts
+
+
+async def _time_render(plan: List[Dict[str, Any]]) -> float:
+    started = time.perf_counter()
+    await renderer({"dag_plan": plan})
+    return time.perf_counter() - started
+
+
+async def bench(
+    durations: List[float], width: int, height: int, max_chunks: int, workdir: Path
+) -> List[Dict[str, Any]]:
+    """Run the single-process baseline and each chunk count per duration."""
+    font_path = pick_font_path()
+    results: List[Dict[str, Any]] = []
+    for duration in durations:
+        clip = make_test_clip(
+            workdir / f"testsrc_{int(duration)}s_{width}x{height}.mp4",
+            duration,
+            width=width,
+            height=height,
+        )
+        beats = _beats(duration)
+        composed = await dag_composer(
+            {
+                "input": {"media_path": str(clip), "duration_sec": duration},
+                "timing_plan": {"beats": beats},
+            }
+        )
+        baseline = await _time_render(composed["dag_plan"])
+        results.append(
+            {"duration_sec": duration, "chunks": 1, "wall_sec": round(baseline, 3)}
+        )
+        print(f"{duration:>6.0f}s  single      {baseline:7.2f}s")
+
+        keyframes = synthetic_keyframes(duration)
+        for chunks in _chunk_counts(max_chunks):
+            plan = build_segment_parallel_plan(
+                clip,
+                workdir / f"parallel_{int(duration)}s_{chunks}.mp4",
+                beats,
+                font_path,
+                duration,
+                keyframes,
+                chunks,
+            )
+            wall = await _time_render(plan)
+            results.append(
+                {
+                    "duration_sec": duration,
+                    "chunks": len(plan) - 1,
+                    "wall_sec": round(wall, 3),
+                    "speedup": round(baseline / wall, 2),
+                }
+            )
+            print(
+                f"{duration:>6.0f}s  {len(plan) - 1:>2} chunks  {wall:7.2f}s  "
+                f"x{baseline / wall:.2f}"
+            )
+    return results
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[30.0, 60.0, 120.0]
+    )
+    parser.add_argument("--size", default="640x360", help="WIDTHxHEIGHT")
+    parser.add_argument("--max-chunks", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    width, height = (int(part) for part in args.size.split("x"))
+    with tempfile.TemporaryDirectory(prefix="memevid-bench-") as tmp:
+        results = asyncio.run(
+            bench(args.durations, width, height, args.max_chunks, Path(tmp))
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
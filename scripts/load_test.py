@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Async load generator for the generate -> review -> resume flow.
+
+Sessions arrive as a Poisson process at ``--rate`` per second for
+``--duration`` seconds. Each one POSTs ``/jokestruc/generate`` with a
+clip drawn from a mixed-size corpus, "thinks" at the review step, then
+POSTs ``/jokestruc/resume``. The report covers throughput, per-endpoint
+latency percentiles, error rates and server memory over time.
+
+By default the FastAPI app runs in-process over ASGI with stub providers,
+so memory samples include the ``MemorySaver`` checkpoint count. With
+``--base-url`` the target is a running server (start it with
+``scripts/stub_providers.py`` for fake providers). Pass ``--server-pid``
+to sample that server's RSS from ``/proc``.
+
+    python scripts/load_test.py --rate 0.5 --duration 60 --think-sec 5
+    python scripts/load_test.py --base-url http://localhost:8000 --server-pid 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from stub_providers import (  # noqa: E402
+    DEFAULT_STUB_LATENCY,
+    StubProviders,
+    parse_latency,
+)
+
+SAMPLE_INTERVAL_SEC = 1.0
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; ``None`` for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _latency_ms(values: Sequence[float]) -> Dict[str, Any]:
+    def _ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 1)
+
+    return {
+        "count": len(values),
+        "p50": _ms(percentile(values, 50)),
+        "p90": _ms(percentile(values, 90)),
+        "p95": _ms(percentile(values, 95)),
+        "p99": _ms(percentile(values, 99)),
+        "max": _ms(max(values) if values else None),
+    }
+
+
+def _rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Resident set size of ``pid`` (this process when ``None``)."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024**2, 1)
+
+
+class LoadStats:
+    """Collects request outcomes and periodic server samples."""
+
+    def __init__(self) -> None:
+        self.latency: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.sessions_started = 0
+        self.sessions_completed = 0
+        self.in_flight = 0
+        self.samples: List[Dict[str, Any]] = []
+
+    def record(self, endpoint: str, elapsed: float, error: Optional[str]) -> None:
+        """Add one request's latency and, if it failed, its error kind."""
+        self.latency[endpoint].append(elapsed)
+        if error:
+            self.errors[endpoint][error] += 1
+
+
+async def _post(
+    client: httpx.AsyncClient,
+    stats: LoadStats,
+    endpoint: str,
+    payload: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    started = time.perf_counter()
+    error: Optional[str] = None
+    body: Optional[Dict[str, Any]] = None
+    try:
+        response = await client.post(f"/jokestruc/{endpoint}", json=payload)
+        if response.status_code >= 400:
+            error = f"http_{response.status_code}"
+        else:
+            body = response.json()
+    except httpx.TimeoutException:
+        error = "timeout"
+    except httpx.HTTPError as exc:
+        error = type(exc).__name__
+    stats.record(endpoint, time.perf_counter() - started, error)
+    return body
+
+
+def _first_caption(candidates: Any) -> str:
+    lines = candidates.splitlines() if isinstance(candidates, str) else candidates
+    for line in lines or []:
+        text = str(line).strip().lstrip("0123456789.) ").strip()
+        if text:
+            return text
+    return "Load test caption"
+
+
+async def session(
+    client: httpx.AsyncClient,
+    stats: LoadStats,
+    clip: Path,
+    think_sec: float,
+    render_options: Dict[str, Any],
+    rng: random.Random,
+) -> None:
+    """One reviewer: generate, think, pick the first caption, resume."""
+    stats.sessions_started += 1
+    stats.in_flight += 1
+    try:
+        generated = await _post(
+            client,
+            stats,
+            "generate",
+            {"media_path": str(clip), "render_options": render_options},
+        )
+        if not generated or generated.get("status") != "awaiting_review":
+            return
+        if think_sec > 0:
+            await asyncio.sleep(rng.expovariate(1 / think_sec))
+        payload = generated.get("payload") or {}
+        resumed = await _post(
+            client,
+            stats,
+            "resume",
+            {
+                "thread_id": generated["thread_id"],
+                "user_selected_caption": _first_caption(payload.get("candidates")),
+                "render_options": render_options,
+            },
+        )
+        if resumed is not None:
+            stats.sessions_completed += 1
+    finally:
+        stats.in_flight -= 1
+
+
+async def sampler(
+    stats: LoadStats, started: float, server_pid: Optional[int], saver: Any
+) -> None:
+    """Record server memory, checkpoint count and in-flight sessions."""
+    while True:
+        sample: Dict[str, Any] = {
+            "t_sec": round(time.perf_counter() - started, 1),
+            "rss_mb": _rss_mb(server_pid),
+            "in_flight": stats.in_flight,
+            "completed": stats.sessions_completed,
+        }
+        if saver is not None:
+            sample["checkpointed_threads"] = len(saver.storage)
+        stats.samples.append(sample)
+        await asyncio.sleep(SAMPLE_INTERVAL_SEC)
+
+
+def _make_corpus(args: argparse.Namespace, workdir: Path) -> List[Path]:
+    if args.clips:
+        return list(args.clips)
+    from workflows.Jokestruc.utils.synthetic_media import make_test_clip
+
+    corpus = []
+    for size in args.sizes:
+        width, height = (int(part) for part in size.split("x"))
+        for duration in args.durations:
+            corpus.append(
+                make_test_clip(
+                    workdir / f"load_{size}_{duration:g}s.mp4",
+                    duration,
+                    width=width,
+                    height=height,
+                )
+            )
+    return corpus
+
+
+def _client(args: argparse.Namespace) -> Tuple[httpx.AsyncClient, Any]:
+    """Return an HTTP client for the target and the in-process saver, if any."""
+    timeout = httpx.Timeout(args.timeout)
+    if args.base_url:
+        return httpx.AsyncClient(base_url=args.base_url, timeout=timeout), None
+
+    StubProviders(parse_latency(args.latency), seed=args.seed).install()
+    from app import app as api
+    from workflows.Jokestruc import graph
+
+    transport = httpx.ASGITransport(app=api)
+    client = httpx.AsyncClient(
+        transport=transport, base_url="http://loadtest", timeout=timeout
+    )
+    return client, graph._memory
+
+
+async def run_load(args: argparse.Namespace, corpus: List[Path]) -> Dict[str, Any]:
+    """Start sessions as Poisson arrivals, let them finish, and build the report."""
+    rng = random.Random(args.seed)
+    stats = LoadStats()
+    render_options: Dict[str, Any] = {"mode": args.mode}
+    if args.packaging:
+        render_options["packaging"] = True
+
+    client, saver = _client(args)
+    started = time.perf_counter()
+    sampling = asyncio.ensure_future(sampler(stats, started, args.server_pid, saver))
+    sessions: List["asyncio.Task[None]"] = []
+    async with client:
+        while time.perf_counter() - started < args.duration:
+            clip = rng.choice(corpus)
+            sessions.append(
+                asyncio.ensure_future(
+                    session(client, stats, clip, args.think_sec, render_options, rng)
+                )
+            )
+            await asyncio.sleep(rng.expovariate(args.rate))
+        arrivals_done = time.perf_counter() - started
+        await asyncio.gather(*sessions)
+    wall = time.perf_counter() - started
+    sampling.cancel()
+    await asyncio.gather(sampling, return_exceptions=True)
+
+    requests = sum(len(values) for values in stats.latency.values())
+    errors = sum(sum(counter.values()) for counter in stats.errors.values())
+    rss = [s["rss_mb"] for s in stats.samples if s["rss_mb"] is not None]
+    return {
+        "config": {
+            "target": args.base_url or "in-process",
+            "rate_per_sec": args.rate,
+            "duration_sec": args.duration,
+            "think_sec": args.think_sec,
+            "clips": [clip.name for clip in corpus],
+            "mode": args.mode,
+        },
+        "wall_sec": round(wall, 2),
+        "arrival_window_sec": round(arrivals_done, 2),
+        "sessions": {
+            "started": stats.sessions_started,
+            "completed": stats.sessions_completed,
+        },
+        "throughput": {
+            "sessions_per_sec": round(stats.sessions_completed / wall, 3),
+            "requests_per_sec": round(requests / wall, 3),
+        },
+        "latency_ms": {
+            endpoint: _latency_ms(values) for endpoint, values in stats.latency.items()
+        },
+        "errors": {
+            "rate": round(errors / requests, 4) if requests else 0.0,
+            "by_endpoint": {
+                endpoint: dict(counter) for endpoint, counter in stats.errors.items()
+            },
+        },
+        "memory": {
+            "start_mb": rss[0] if rss else None,
+            "end_mb": rss[-1] if rss else None,
+            "peak_mb": max(rss) if rss else None,
+            "growth_mb_per_session": (
+                round((rss[-1] - rss[0]) / stats.sessions_completed, 3)
+                if len(rss) > 1 and stats.sessions_completed
+                else None
+            ),
+            "samples": stats.samples,
+        },
+    }
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    sessions, throughput = report["sessions"], report["throughput"]
+    print(
+        f"sessions {sessions['completed']}/{sessions['started']} in "
+        f"{report['wall_sec']}s; {throughput['sessions_per_sec']} sessions/s, "
+        f"{throughput['requests_per_sec']} req/s; "
+        f"error rate {report['errors']['rate']:.2%}"
+    )
+    for endpoint, stats in report["latency_ms"].items():
+        print(
+            f"  {endpoint:<9} n={stats['count']:<4} p50 {stats['p50']}ms "
+            f"p95 {stats['p95']}ms p99 {stats['p99']}ms max {stats['max']}ms"
+        )
+    memory = report["memory"]
+    print(
+        f"  memory {memory['start_mb']} -> {memory['end_mb']} MB "
+        f"(peak {memory['peak_mb']}, {memory['growth_mb_per_session']} MB/session)"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="Target a running server instead")
+    parser.add_argument("--server-pid", type=int, help="Sample this PID's RSS")
+    parser.add_argument("--rate", type=float, default=0.5, help="Sessions/second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    parser.add_argument("--think-sec", type=float, default=5.0, help="Mean think time")
+    parser.add_argument("--clips", type=Path, nargs="*", default=[])
+    parser.add_argument("--sizes", nargs="+", default=["640x360", "1280x720"])
+    parser.add_argument("--durations", type=float, nargs="+", default=[6.0, 15.0])
+    parser.add_argument("--mode", default="burn_in", help="render_options.mode")
+    parser.add_argument("--packaging", action="store_true")
+    parser.add_argument(
+        "--latency",
+        nargs="*",
+        default=[],
+        metavar="KIND=SEC",
+        help=f"In-process stub latency; kinds: {', '.join(DEFAULT_STUB_LATENCY)}",
+    )
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="memevid-load-") as tmp:
+        if not args.base_url:
+            os.environ.setdefault("ARTIFACT_ROOT", str(Path(tmp) / "artifacts"))
+        corpus = _make_corpus(args, Path(tmp))
+        report = asyncio.run(run_load(args, corpus))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    _print_summary(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 """Streamlit UI for human-in-the-loop caption selection and rendering."""
 
 import asyncio
+import base64
+import sys
 from pathlib import Path
 
 import httpx
 import streamlit as st
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from workflows.Jokestruc.artifact_store import get_artifact_store  # noqa: E402
+
 API_BASE = "http://localhost:8000"  # FastAPI server URL
 
 
@@ -32,6 +39,43 @@ async def resume_workflow(thread_id: str, user_selected_caption: str) -> dict:
         return resp.json()
 
 
+async def fetch_caption_previews(thread_id: str) -> dict:
+    """Fetch a captioned still for every candidate of a paused thread."""
+    async with httpx.AsyncClient(timeout=30) as client:
+        resp = await client.get(f"{API_BASE}/jokestruc/preview/{thread_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def fetch_timeline_thumbnails(thread_id: str) -> dict:
+    """Fetch the sprite sheet and thumbnail map for a thread's clip."""
+    async with httpx.AsyncClient(timeout=120) as client:
+        resp = await client.get(f"{API_BASE}/jokestruc/thumbnails/{thread_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def fetch_execution_log(thread_id: str) -> list:
+    """Fetch every execution event of a thread, one page at a time."""
+    events: list = []
+    after = 0
+    async with httpx.AsyncClient(timeout=30) as client:
+        while True:
+            resp = await client.get(
+                f"{API_BASE}/jokestruc/logs/{thread_id}", params={"after": after}
+            )
+            resp.raise_for_status()
+            page = resp.json()
+            events.extend(page["events"])
+            if page["next_after"] is None:
+                return events
+            after = page["next_after"]
+
+
+def _event_lines(events: list) -> list:
+    return [event["message"] for event in events]
+
+
 def main() -> None:
     """Run the Streamlit app."""
     st.set_page_config(page_title="MemeVid Human Review", layout="wide")
@@ -44,18 +88,21 @@ def main() -> None:
         st.session_state.scene_map = None
         st.session_state.logs = []
         st.session_state.output = None
+        st.session_state.previews = []
+        st.session_state.thumbnails = None
 
     uploaded_file = st.file_uploader("Upload video", type=["mp4", "mov", "mkv"])
     if uploaded_file and st.button("Run Workflow"):
-        # Persist temp file
-        tmp_path = Path("tmp_upload.mp4")
-        tmp_path.write_bytes(uploaded_file.read())
+        # Content-addressed, so concurrent sessions never overwrite each other.
+        upload_path = get_artifact_store().save_upload(
+            uploaded_file.name, uploaded_file.read()
+        )
 
         with st.spinner("Running analysis..."):
             loop = asyncio.new_event_loop()
             try:
                 result = loop.run_until_complete(
-                    start_workflow(str(tmp_path.resolve()))
+                    start_workflow(str(upload_path.resolve()))
                 )
             finally:
                 loop.close()
@@ -72,19 +119,57 @@ def main() -> None:
                 candidates = raw_candidates
 
             st.session_state.candidates = candidates
+            loop = asyncio.new_event_loop()
+            try:
+                previews = loop.run_until_complete(
+                    fetch_caption_previews(result["thread_id"])
+                )
+                st.session_state.previews = previews.get("stills", [])
+            except httpx.HTTPError:
+                st.session_state.previews = []
+            try:
+                st.session_state.thumbnails = loop.run_until_complete(
+                    fetch_timeline_thumbnails(result["thread_id"])
+                )
+            except httpx.HTTPError:
+                st.session_state.thumbnails = None
+            finally:
+                loop.close()
         elif result.get("status") == "completed":
             state = result.get("state", {})
             st.session_state.video_insight = state.get("video_insights")
-            st.session_state.logs = state.get("logs", [])
+            loop = asyncio.new_event_loop()
+            try:
+                st.session_state.logs = _event_lines(
+                    loop.run_until_complete(fetch_execution_log(result["thread_id"]))
+                )
+            finally:
+                loop.close()
 
     if st.session_state.thread_id:
         st.subheader("Video Insight")
         st.json(st.session_state.video_insight or {})
 
+        thumbnails = st.session_state.thumbnails
+        if thumbnails and Path(thumbnails["sprite"]).exists():
+            st.subheader("Timeline")
+            st.image(thumbnails["sprite"])
+            st.caption(
+                " · ".join(f"{frame['time']:.1f}s" for frame in thumbnails["frames"])
+            )
+
         st.subheader("Candidate Captions")
         for i, caption in enumerate(st.session_state.candidates, start=1):
             st.markdown(f"{i}. {caption}")
 
+        if st.session_state.previews:
+            columns = st.columns(min(len(st.session_state.previews), 3))
+            for i, still in enumerate(st.session_state.previews):
+                columns[i % len(columns)].image(
+                    base64.b64decode(still["jpeg_base64"]),
+                    caption=f"{i + 1}. {still['caption']}",
+                )
+
         # st.text_area("Scene map", st.session_state.scene_map or "", height=150)
 
         st.subheader("Select Caption")
@@ -111,6 +196,11 @@ def main() -> None:
                             # reason or "Selected via Streamlit UI",
                         )
                     )
+                    st.session_state.logs = _event_lines(
+                        loop.run_until_complete(
+                            fetch_execution_log(st.session_state.thread_id)
+                        )
+                    )
                 finally:
                     loop.close()
 
@@ -130,7 +220,7 @@ def main() -> None:
         st.json(output_state.get("timing_plan"))
 
         st.subheader("Logs")
-        st.json(output_state.get("logs"))
+        st.json(st.session_state.logs)
 
 
 if __name__ == "__main__":
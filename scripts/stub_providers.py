@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Offline stand-ins for the Gemini and OpenAI providers, with simulated latency.
+
+Used by ``bench_pipeline.py`` and ``load_test.py`` to drive the whole graph
+without network access or API keys. The stubs mirror the real call shapes:
+Gemini calls block (the nodes run them in threads), OpenAI completions are
+awaited. Run directly to serve the API with stubs installed, as a target
+for ``load_test.py --base-url``:
+
+    python scripts/stub_providers.py --port 8000 --latency openai=0.5 upload=1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import google.generativeai as genai
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from workflows.Jokestruc import llm_provider  # noqa: E402
+from workflows.Jokestruc.humor_config import load_humor_levers  # noqa: E402
+
+# Seconds per call kind; ``processing`` is how long an upload stays PROCESSING.
+DEFAULT_STUB_LATENCY: Dict[str, float] = {
+    "upload": 1.0,
+    "processing": 4.0,
+    "get_file": 0.15,
+    "gemini_insight": 3.0,
+    "gemini_text": 1.5,
+    "openai": 1.2,
+}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?) seconds")
+
+
+def parse_latency(items: Iterable[str]) -> Dict[str, float]:
+    """Parse ``kind=seconds`` overrides such as ``openai=0.5``."""
+    latency: Dict[str, float] = {}
+    for item in items:
+        if not item.strip():
+            continue
+        kind, _, value = item.partition("=")
+        if kind.strip() not in DEFAULT_STUB_LATENCY:
+            raise ValueError(f"Unknown stub latency kind {kind!r}")
+        latency[kind.strip()] = float(value)
+    return latency
+
+
+class StubStats:
+    """Per-kind call durations recorded by the stubs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, kind: str, elapsed: float) -> None:
+        """Add one call's simulated duration."""
+        with self._lock:
+            self.calls[kind].append(elapsed)
+
+    def snapshot(self) -> Dict[str, List[float]]:
+        """Return a copy of the recorded durations per call kind."""
+        with self._lock:
+            return {kind: list(values) for kind, values in self.calls.items()}
+
+
+class _StubState:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class _StubFile:
+    def __init__(self, name: str, ready_at: float) -> None:
+        self.name = name
+        self.uri = f"https://stub.invalid/files/{name}"
+        self.ready_at = ready_at
+
+    @property
+    def state(self) -> _StubState:
+        done = time.monotonic() >= self.ready_at
+        return _StubState("ACTIVE" if done else "PROCESSING")
+
+
+class _StubResponse:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+def _clip_duration(prompt: str) -> float:
+    match = _DURATION_RE.search(prompt)
+    return float(match.group(1)) if match else 10.0
+
+
+def _insight_json(prompt: str) -> str:
+    duration = _clip_duration(prompt)
+    step = duration / 3
+    timeline = [
+        {
+            "start": round(step * idx, 2),
+            "end": round(step * (idx + 1), 2),
+            "description": f"Synthetic scene {idx + 1}",
+        }
+        for idx in range(3)
+    ]
+    return json.dumps(
+        {
+            "raw_description": "A synthetic test pattern with a steady tone.",
+            "tags": ["synthetic", "benchmark"],
+            "timeline": timeline,
+        }
+    )
+
+
+def _framer_json() -> str:
+    lever = load_humor_levers()[0]
+    return json.dumps(
+        {
+            "lever": lever,
+            "matched_segment": {
+                "start": 0.5,
+                "end": 2.5,
+                "description": "Synthetic scene 1",
+                "emotional_tone": "deadpan",
+            },
+            "framing": {"angle": "benchmark", "punchline": "it is all test bars"},
+        }
+    )
+
+
+def _openai_reply(prompt: str) -> str:
+    if "timing" in prompt and '"start"' in prompt:
+        return json.dumps({"start": 0.5, "end": 2.5, "reason": "stub"})
+    if "candidate" in prompt.lower() and "select" in prompt.lower():
+        return json.dumps({"selected_caption": "Stub caption one", "reason": "stub"})
+    return "\n".join(f"{idx}. Stub caption {idx}" for idx in range(1, 5))
+
+
+class StubProviders:
+    """Patches ``google.generativeai`` and the OpenAI client in place."""
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, float]] = None,
+        jitter: float = 0.2,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = {**DEFAULT_STUB_LATENCY, **(latency or {})}
+        self.jitter = jitter
+        self.stats = StubStats()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._files: Dict[str, _StubFile] = {}
+        self._restore: List[Callable[[], None]] = []
+
+    def _delay(self, kind: str) -> float:
+        with self._random_lock:
+            spread = self._random.uniform(-self.jitter, self.jitter)
+        return max(self.latency[kind] * (1 + spread), 0.0)
+
+    def _blocking(self, kind: str) -> None:
+        delay = self._delay(kind)
+        time.sleep(delay)
+        self.stats.record(kind, delay)
+
+    async def _awaitable(self, kind: str) -> None:
+        delay = self._delay(kind)
+        await asyncio.sleep(delay)
+        self.stats.record(kind, delay)
+
+    # -- google.generativeai ------------------------------------------------
+
+    def _upload_file(self, path: str, display_name: str = "", **_: Any) -> _StubFile:
+        self._blocking("upload")
+        name = f"files/stub-{len(self._files)}"
+        stub = _StubFile(name, time.monotonic() + self._delay("processing"))
+        self._files[name] = stub
+        return stub
+
+    def _get_file(self, name: str) -> _StubFile:
+        self._blocking("get_file")
+        return self._files[name if name.startswith("files/") else f"files/{name}"]
+
+    def _model_factory(self) -> Callable[..., Any]:
+        providers = self
+
+        class _StubModel:
+            def __init__(self, model_name: str, **kwargs: Any) -> None:
+                self.model_name = model_name
+                self.generation_config = kwargs.get("generation_config") or {}
+
+            def generate_content(self, contents: Any, **_: Any) -> _StubResponse:
+                if isinstance(contents, list):
+                    providers._blocking("gemini_insight")
+                    return _StubResponse(_insight_json(str(contents[-1])))
+                providers._blocking("gemini_text")
+                if "matched_segment" in contents:
+                    return _StubResponse(_framer_json())
+                return _StubResponse("1. Stub caption 1 -> 0.5-2.5 (seconds) - stub")
+
+        return _StubModel
+
+    # -- OpenAI --------------------------------------------------------------
+
+    def _openai_client(self) -> Any:
+        providers = self
+
+        class _Completions:
+            async def create(self, messages: List[Dict[str, str]], **_: Any) -> Any:
+                await providers._awaitable("openai")
+                reply = _openai_reply(messages[-1]["content"])
+                message = type("Message", (), {"content": reply})
+                choice = type("Choice", (), {"message": message})
+                return type("Completion", (), {"choices": [choice]})
+
+        chat = type("Chat", (), {"completions": _Completions()})
+        return type("Client", (), {"chat": chat})()
+
+    def _patch(self, owner: Any, name: str, value: Any) -> None:
+        original = getattr(owner, name)
+        setattr(owner, name, value)
+        self._restore.append(lambda: setattr(owner, name, original))
+
+    def install(self) -> "StubProviders":
+        """Replace the provider entry points until :meth:`uninstall`."""
+        client = self._openai_client()
+        self._patch(genai, "configure", lambda **_: None)
+        self._patch(genai, "upload_file", self._upload_file)
+        self._patch(genai, "get_file", self._get_file)
+        self._patch(genai, "GenerativeModel", self._model_factory())
+        self._patch(llm_provider, "get_openai_client", lambda: client)
+        if not any(os.getenv(key) for key in llm_provider.API_KEY_ENV_VARS):
+            key = llm_provider.API_KEY_ENV_VARS[0]
+            os.environ[key] = "stub"
+            self._restore.append(lambda: os.environ.pop(key, None))
+        return self
+
+    def uninstall(self) -> None:
+        """Restore every patched provider entry point."""
+        while self._restore:
+            self._restore.pop()()
+
+
+def main() -> None:
+    """Serve the API with stub providers installed."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--latency",
+        nargs="*",
+        default=[],
+        metavar="KIND=SEC",
+        help=f"Override stub latency; kinds: {', '.join(DEFAULT_STUB_LATENCY)}",
+    )
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    StubProviders(
+        parse_latency(args.latency), jitter=args.jitter, seed=args.seed
+    ).install()
+    from app import app
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
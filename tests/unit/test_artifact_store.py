@@ -0,0 +1,106 @@
+"""
+Unit tests for the artifact store quotas and GC
+"""
+
+import os
+
+from workflows.Jokestruc.artifact_store import ArtifactStore
+
+QUOTAS = {"uploads": 100, "proxies": 100, "renders": 100, "caches": 100}
+OLD = 1_000_000.0
+
+
+def _entry(path, size, mtime=OLD):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestCollect:
+    """Test quota GC"""
+
+    def test_collects_oldest_until_under_quota(self, tmp_path):
+        """Test the least recently modified entries go first"""
+        store = ArtifactStore(tmp_path, QUOTAS, grace_sec=0)
+        old = _entry(tmp_path / "proxies" / "old.mp4", 80, OLD)
+        new = _entry(tmp_path / "proxies" / "new.mp4", 80, OLD + 10)
+
+        freed = store.collect()
+
+        assert freed["proxies"] == 80
+        assert not old.exists()
+        assert new.exists()
+
+    def test_keeps_referenced_entries(self, tmp_path):
+        """Test files a paused thread still needs survive over quota"""
+        store = ArtifactStore(tmp_path, QUOTAS, grace_sec=0)
+        upload = _entry(tmp_path / "uploads" / "abc" / "clip.mp4", 80, OLD)
+        other = _entry(tmp_path / "uploads" / "def" / "other.mp4", 80, OLD + 10)
+        proxy = _entry(tmp_path / "proxies" / "clip_mezz.mp4", 150, OLD)
+        store.add_reference_source(lambda: [str(upload), str(proxy)])
+
+        freed = store.collect()
+
+        assert upload.exists()
+        assert proxy.exists()
+        assert not other.exists()
+        assert freed == {"uploads": 80, "proxies": 0, "renders": 0, "caches": 0}
+
+    def test_failing_reference_source_skips_gc(self, tmp_path):
+        """Test nothing is deleted when live references cannot be listed"""
+        store = ArtifactStore(tmp_path, QUOTAS, grace_sec=0)
+        proxy = _entry(tmp_path / "proxies" / "clip.mp4", 150, OLD)
+
+        def broken():
+            raise RuntimeError("checkpointer unavailable")
+
+        store.add_reference_source(broken)
+
+        assert sum(store.collect().values()) == 0
+        assert proxy.exists()
+
+    def test_grace_period_protects_recent_entries(self, tmp_path):
+        """Test freshly written entries are never collected"""
+        store = ArtifactStore(tmp_path, QUOTAS, grace_sec=3600)
+        fresh = tmp_path / "renders" / "thread"
+        fresh.mkdir(parents=True)
+        (fresh / "out.mp4").write_bytes(b"x" * 500)
+
+        store.collect()
+
+        assert fresh.exists()
+
+    def test_hard_links_count_once_across_categories(self, tmp_path):
+        """Test a render linked from the render cache does not overfill caches"""
+        store = ArtifactStore(tmp_path, {**QUOTAS, "caches": 80}, grace_sec=0)
+        cached = _entry(tmp_path / "caches" / "render_cache" / "key.mp4", 60)
+        render = tmp_path / "renders" / "thread" / "out.mp4"
+        render.parent.mkdir(parents=True)
+        os.link(cached, render)
+        _entry(tmp_path / "caches" / "preview_frames" / "frame.png", 30)
+
+        freed = store.collect()
+
+        assert freed == {"uploads": 0, "proxies": 0, "renders": 0, "caches": 0}
+        assert cached.exists() and render.exists()
+
+
+class TestUsage:
+    """Test usage reporting"""
+
+    def test_hard_links_counted_once(self, tmp_path):
+        """Test a render cache entry linked into renders is not double counted"""
+        store = ArtifactStore(tmp_path, QUOTAS)
+        cached = _entry(tmp_path / "caches" / "render_cache" / "key.mp4", 60)
+        render = tmp_path / "renders" / "thread" / "out.mp4"
+        render.parent.mkdir(parents=True)
+        os.link(cached, render)
+        _entry(tmp_path / "uploads" / "abc" / "clip.mp4", 10)
+
+        report = store.usage()
+
+        assert report["bytes"] == 70
+        assert report["categories"]["renders"]["bytes"] == 60
+        assert report["categories"]["caches"]["bytes"] == 0
+        assert report["categories"]["caches"]["entries"] == 1
@@ -0,0 +1,105 @@
+"""
+Unit tests for checkpoint blob offloading and collection
+"""
+
+import asyncio
+import threading
+from typing import TypedDict
+from unittest.mock import patch
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from workflows.Jokestruc.checkpoint_blobs import (
+    BlobCollectingSaver,
+    BlobStore,
+    MissingBlobError,
+    OffloadingSerializer,
+    blob_refs,
+)
+
+
+class BlobState(TypedDict, total=False):
+    """State with one field large enough to offload"""
+
+    payload: str
+
+
+def _graph(store: BlobStore):
+    builder = StateGraph(BlobState)
+    builder.add_node("echo", lambda state: {"payload": state["payload"] * 2})
+    builder.set_entry_point("echo")
+    builder.add_edge("echo", END)
+    saver = BlobCollectingSaver(
+        serde=OffloadingSerializer(store, 64), store=store, grace_sec=0.0
+    )
+    return builder.compile(checkpointer=saver), saver
+
+
+class TestBlobStore:
+    """Test sweeping unreferenced blobs"""
+
+    def test_sweep_keeps_live_and_recent_blobs(self):
+        """Test only old blobs outside the live set are dropped"""
+        store = BlobStore()
+        live = store.put(b"live" * 100)
+        dead = store.put(b"dead" * 100)
+
+        assert store.sweep(set()) == 0
+        assert store.sweep({live}, grace_sec=0) == 1
+        assert store.get(live) == b"live" * 100
+        with pytest.raises(MissingBlobError):
+            store.get(dead)
+        assert store.stats()["raw_bytes"] == 400
+
+
+class TestBlobCollectingSaver:
+    """Test blobs are freed with the checkpoints that reference them"""
+
+    def test_delete_thread_frees_only_unshared_blobs(self):
+        """Test a blob shared with a remaining thread survives the sweep"""
+        store = BlobStore()
+        graph, saver = _graph(store)
+        graph.invoke({"payload": "x" * 100}, {"configurable": {"thread_id": "a"}})
+        graph.invoke({"payload": "y" * 100}, {"configurable": {"thread_id": "b"}})
+        graph.invoke({"payload": "x" * 100}, {"configurable": {"thread_id": "c"}})
+        before = store.stats()["blobs"]
+
+        saver.delete_thread("a")
+        saver.delete_thread("b")
+
+        live = {
+            *blob_refs(saver.storage),
+            *blob_refs(saver.writes),
+            *blob_refs(saver.blobs),
+        }
+        assert store.stats()["blobs"] == len(live) < before
+        for digest in live:
+            store.get(digest)
+        history = list(graph.get_state_history({"configurable": {"thread_id": "c"}}))
+        assert history[0].values["payload"] == "x" * 200
+
+        saver.delete_thread("c")
+        assert store.stats()["blobs"] == 0
+
+    def test_async_delete_sweeps_in_a_worker_thread(self):
+        """Test adelete_thread collects blobs away from the loop thread"""
+        store = BlobStore()
+        graph, saver = _graph(store)
+        graph.invoke({"payload": "z" * 100}, {"configurable": {"thread_id": "a"}})
+        sweeps = []
+        collect = saver.collect_blobs
+
+        def record():
+            sweeps.append(threading.get_ident())
+            return collect()
+
+        async def delete():
+            with patch.object(saver, "collect_blobs", record):
+                await saver.adelete_thread("a")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(delete())
+        assert sweeps and sweeps[0] != loop_thread
+        assert "a" not in saver.storage
+        assert store.stats()["blobs"] == 0
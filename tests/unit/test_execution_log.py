@@ -0,0 +1,86 @@
+"""
+Unit tests for the execution event log
+"""
+
+from unittest.mock import patch
+
+from workflows.Jokestruc.execution_log import MAX_PAGE_SIZE, ExecutionLog
+
+
+def _messages(events):
+    return [event["message"] for event in events]
+
+
+class TestMemoryLog:
+    """Test the in-memory backend"""
+
+    def test_paging_by_cursor(self):
+        """Test pages resume after the last seen seq"""
+        log = ExecutionLog(None, 10)
+        for index in range(5):
+            log.append("t-1", "node", f"event {index}")
+        log.append("t-2", "node", "other thread")
+
+        first = log.page("t-1", limit=2)
+        second = log.page("t-1", after=first[-1]["seq"], limit=10)
+        assert _messages(first) == ["event 0", "event 1"]
+        assert _messages(second) == ["event 2", "event 3", "event 4"]
+
+    def test_limit_is_clamped(self):
+        """Test page sizes stay between 1 and MAX_PAGE_SIZE"""
+        log = ExecutionLog(None, 10)
+        for index in range(MAX_PAGE_SIZE + 5):
+            log.append("t-1", None, str(index))
+        assert len(log.page("t-1", limit=0)) == 1
+        assert len(log.page("t-1", limit=MAX_PAGE_SIZE * 2)) == MAX_PAGE_SIZE
+
+    def test_least_recent_threads_are_dropped(self):
+        """Test only max_threads threads are kept"""
+        log = ExecutionLog(None, 2)
+        log.append("old", None, "a")
+        log.append("mid", None, "b")
+        log.append("old", None, "c")
+        log.append("new", None, "d")
+        assert log.page("mid") == []
+        assert _messages(log.page("old")) == ["a", "c"]
+
+
+class TestSqliteLog:
+    """Test the SQLite backend"""
+
+    def test_events_persist_and_page(self, tmp_path):
+        """Test written events are paged back in order from the file"""
+        db_path = tmp_path / "events.sqlite"
+        log = ExecutionLog(db_path, 10)
+        for index in range(4):
+            log.append("t-1", "renderer", f"event {index}")
+        log.flush()
+
+        reopened = ExecutionLog(db_path, 10)
+        first = reopened.page("t-1", limit=3)
+        rest = reopened.page("t-1", after=first[-1]["seq"])
+        assert _messages(first) == ["event 0", "event 1", "event 2"]
+        assert _messages(rest) == ["event 3"]
+        assert first[0]["node"] == "renderer"
+
+    def test_workers_sharing_a_file_do_not_collide(self, tmp_path):
+        """Test two logs with overlapping local counters keep every event"""
+        db_path = tmp_path / "events.sqlite"
+        worker_a = ExecutionLog(db_path, 10)
+        worker_b = ExecutionLog(db_path, 10)
+        assert worker_a.append("t-1", None, "from a") == 1
+        assert worker_b.append("t-1", None, "from b") == 1
+        worker_a.flush()
+        worker_b.flush()
+
+        events = worker_a.page("t-1")
+        assert sorted(_messages(events)) == ["from a", "from b"]
+        assert len({event["seq"] for event in events}) == 2
+
+    def test_page_does_not_wait_for_the_writer(self, tmp_path):
+        """Test paging reads committed rows without flushing the queue"""
+        log = ExecutionLog(tmp_path / "events.sqlite", 10)
+        log.append("t-1", None, "committed")
+        log.flush()
+        with patch.object(log, "flush", side_effect=AssertionError("blocked")):
+            assert _messages(log.page("t-1")) == ["committed"]
@@ -0,0 +1,139 @@
+"""
+Unit tests for the local ffmpeg runner
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from workflows.Jokestruc.utils import ffmpeg_runner
+from workflows.Jokestruc.utils.ffmpeg_runner import (
+    FFmpegError,
+    FFmpegTimeoutError,
+    run_ffmpeg_local,
+)
+
+# Spawns a grandchild in the same process group and reports its pid on stdout.
+SPAWN_AND_HANG = (
+    "import subprocess, sys, time\n"
+    "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+    "open(sys.argv[1], 'w').write(str(child.pid))\n"
+    "time.sleep(60)\n"
+)
+
+
+def _python(*args):
+    return [sys.executable, "-c", *args]
+
+
+def _wait_for_pid(pid_file):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if pid_file.exists() and pid_file.read_text():
+            return int(pid_file.read_text())
+        time.sleep(0.02)
+    raise AssertionError("child never reported its pid")
+
+
+def _assert_dead(pid):
+    """Wait until ``pid`` has exited (a zombie awaiting reaping counts)"""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                if stat.read().split(")")[-1].split()[0] in ("Z", "X"):
+                    return
+        except FileNotFoundError:
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"process {pid} survived")
+
+
+class TestOutputs:
+    """Test output detection for span attributes"""
+
+    def test_every_output_is_found(self, tmp_path):
+        """Test multi-output commands report every output file"""
+        first, second = tmp_path / "a.mp4", tmp_path / "poster.jpg"
+        first.write_bytes(b"12345")
+        second.write_bytes(b"678")
+        command = [
+            "ffmpeg",
+            "-y",
+            "-i",
+            "in.mp4",
+            "-filter_complex",
+            "[0:v]split=2[a][b]",
+            "-map",
+            "[a]",
+            "-c:v",
+            "libx264",
+            str(first),
+            "-map",
+            "[b]",
+            "-frames:v",
+            "1",
+            str(second),
+        ]
+        assert ffmpeg_runner._output_paths(command) == [str(first), str(second)]
+        assert ffmpeg_runner._output_name(command) == "poster.jpg"
+        assert ffmpeg_runner._output_bytes(command) == 8
+
+    def test_null_muxer_has_no_output_file(self):
+        """Test ``-f null -`` analysis passes report no output"""
+        command = ["ffmpeg", "-i", "in.mp4", "-an", "-f", "null", "-"]
+        assert ffmpeg_runner._output_paths(command) == []
+        assert ffmpeg_runner._output_name(command) == ""
+        assert ffmpeg_runner._output_bytes(command) is None
+
+    def test_unnamed_signals_fall_back_to_the_number(self):
+        """Test real-time signals without an enum name still get a message"""
+        assert ffmpeg_runner._signal_name(9) == "SIGKILL"
+        assert ffmpeg_runner._signal_name(40) == "signal 40"
+
+
+class TestRunLocal:
+    """Test exit handling, timeouts and cancellation of local children"""
+
+    def test_nonzero_exit_keeps_stderr_tail(self):
+        """Test a failing command raises with its last stderr lines"""
+        with pytest.raises(FFmpegError) as error:
+            asyncio.run(run_ffmpeg_local(_python("import sys; sys.exit('bad input')")))
+        assert error.value.returncode == 1
+        assert error.value.stderr_tail == ["bad input"]
+
+    def test_killed_by_unnamed_signal(self):
+        """Test a death by a signal outside the enum is reported by number"""
+        command = _python("import os; os.kill(os.getpid(), 40)")
+        with pytest.raises(FFmpegError, match="killed by signal 40"):
+            asyncio.run(run_ffmpeg_local(command))
+
+    def test_timeout_kills_the_process_group(self, tmp_path):
+        """Test a timed-out step takes its grandchildren down with it"""
+        pid_file = tmp_path / "child.pid"
+        started = time.monotonic()
+        with pytest.raises(FFmpegTimeoutError):
+            asyncio.run(
+                run_ffmpeg_local([*_python(SPAWN_AND_HANG), str(pid_file)], timeout=1.0)
+            )
+        assert time.monotonic() - started < 10
+        _assert_dead(_wait_for_pid(pid_file))
+
+    def test_cancellation_kills_the_process_group(self, tmp_path):
+        """Test cancelling the awaiting task kills the child and grandchild"""
+        pid_file = tmp_path / "child.pid"
+
+        async def run_then_cancel():
+            task = asyncio.ensure_future(
+                run_ffmpeg_local([*_python(SPAWN_AND_HANG), str(pid_file)])
+            )
+            while not (pid_file.exists() and pid_file.read_text()):
+                await asyncio.sleep(0.02)
+            task.cancel()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run_then_cancel())
+        _assert_dead(_wait_for_pid(pid_file))
@@ -0,0 +1,74 @@
+"""
+Unit tests for the blocking-call audit
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from workflows.Jokestruc import loop_monitor
+from workflows.Jokestruc.loop_monitor import BlockingCallError, install_blocking_audit
+
+
+@pytest.fixture
+def strict_audit():
+    """Run the test in strict audit mode, then switch the audit off"""
+    install_blocking_audit("strict")
+    yield
+    install_blocking_audit("off")
+
+
+class TestStrictAudit:
+    """Test strict mode fails fast on the loop thread only"""
+
+    def test_sleep_on_loop_raises(self, strict_audit):
+        """Test time.sleep inside a coroutine raises"""
+
+        async def stall():
+            time.sleep(0.001)
+
+        with pytest.raises(BlockingCallError, match="time.sleep"):
+            asyncio.run(stall())
+
+    def test_config_open_on_loop_raises(self, strict_audit, tmp_path):
+        """Test a synchronous config read inside a coroutine raises"""
+        config = tmp_path / "caption_style.yaml"
+        config.write_text("font_size: 40\n")
+
+        async def read():
+            return config.read_text()
+
+        with pytest.raises(BlockingCallError, match="caption_style.yaml"):
+            asyncio.run(read())
+
+    def test_asyncio_subprocess_is_exempt(self, strict_audit):
+        """Test asyncio spawning a child process is not flagged"""
+
+        async def spawn():
+            proc = await asyncio.create_subprocess_exec(sys.executable, "-c", "")
+            return await proc.wait()
+
+        assert asyncio.run(spawn()) == 0
+
+    def test_calls_off_the_loop_are_allowed(self, strict_audit, tmp_path):
+        """Test the same calls in a worker thread are not flagged"""
+        config = tmp_path / "levers.yaml"
+        config.write_text("[]\n")
+
+        def work():
+            time.sleep(0.001)
+            return config.read_text()
+
+        async def offload():
+            return await asyncio.to_thread(work)
+
+        assert asyncio.run(offload()) == "[]\n"
+
+    def test_imports_and_pseudo_files_are_exempt(self):
+        """Test opens made by imports and of /proc paths are not described"""
+        assert loop_monitor._blocking_open("/proc/self/stat") is None
+        assert loop_monitor._blocking_open("/app/module.py") is None
+        assert loop_monitor._blocking_open(3) is None
+        assert loop_monitor._blocking_open("/app/x.yaml") == "open(x.yaml)"
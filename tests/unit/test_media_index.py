@@ -0,0 +1,96 @@
+"""
+Unit tests for the MVIX keyframe/scene-cut index
+"""
+
+import pytest
+
+from workflows.Jokestruc.media_index import MediaIndex, MediaIndexStore
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.5, 10.0]
+CUTS = [3.1, 7.9]
+
+
+class TestRoundTrip:
+    """Test the binary format"""
+
+    def test_round_trip_with_scenes(self):
+        """Test an index with scene cuts survives serialization"""
+        index = MediaIndex(12.5, KEYFRAMES, CUTS, 0.3)
+        loaded = MediaIndex.from_bytes(index.to_bytes())
+        assert loaded.duration_sec == 12.5
+        assert list(loaded.keyframes) == KEYFRAMES
+        assert list(loaded.cuts) == CUTS
+        assert loaded.has_scenes is True
+        assert loaded.scene_threshold == 0.3
+
+    def test_round_trip_without_scenes(self):
+        """Test a keyframe-only index stays marked as lacking scene data"""
+        loaded = MediaIndex.from_bytes(MediaIndex(None, KEYFRAMES).to_bytes())
+        assert loaded.duration_sec is None
+        assert list(loaded.keyframes) == KEYFRAMES
+        assert loaded.has_scenes is False
+        assert loaded.scene_threshold is None
+
+    def test_empty_scene_list_is_kept(self):
+        """Test a scene pass that found no cuts is not re-run"""
+        loaded = MediaIndex.from_bytes(MediaIndex(5.0, [0.0], [], 0.3).to_bytes())
+        assert loaded.has_scenes is True
+        assert list(loaded.cuts) == []
+
+    def test_keyframes_are_sorted(self):
+        """Test unsorted input is stored sorted for bisect lookups"""
+        assert list(MediaIndex(None, [4.0, 0.0, 2.0]).keyframes) == [0.0, 2.0, 4.0]
+
+    def test_rejects_bad_magic(self):
+        """Test foreign data is rejected"""
+        data = bytearray(MediaIndex(1.0, KEYFRAMES).to_bytes())
+        data[:4] = b"XXXX"
+        with pytest.raises(ValueError, match="Unsupported"):
+            MediaIndex.from_bytes(bytes(data))
+
+    def test_rejects_truncated_data(self):
+        """Test a partially written index is rejected"""
+        data = MediaIndex(1.0, KEYFRAMES, CUTS, 0.3).to_bytes()
+        with pytest.raises(ValueError, match="Truncated"):
+            MediaIndex.from_bytes(data[:-8])
+
+    def test_store_discards_unreadable_file(self, tmp_path):
+        """Test a corrupt index file on disk is treated as missing"""
+        store = MediaIndexStore(tmp_path)
+        (tmp_path / "abc.idx").write_bytes(b"MVIX")
+        assert store._load("abc") is None
+
+
+class TestLookups:
+    """Test bisect-based keyframe and cut queries"""
+
+    index = MediaIndex(12.0, KEYFRAMES, CUTS, 0.3)
+
+    @pytest.mark.parametrize(
+        "t, expected",
+        [(-1.0, 0.0), (0.9, 0.0), (1.1, 2.0), (5.0, 4.0), (5.5, 6.5), (99.0, 10.0)],
+    )
+    def test_nearest_keyframe(self, t, expected):
+        """Test the closest keyframe is returned on either side of ``t``"""
+        assert self.index.nearest_keyframe(t) == expected
+
+    def test_nearest_keyframe_empty(self):
+        """Test an index without keyframes has no nearest keyframe"""
+        assert MediaIndex(None, []).nearest_keyframe(1.0) is None
+
+    @pytest.mark.parametrize(
+        "t, expected", [(0.0, 0.0), (3.99, 2.0), (4.0, 4.0), (6.4999995, 6.5), (50.0, 10.0)]
+    )
+    def test_keyframe_at_or_before(self, t, expected):
+        """Test the last keyframe not after ``t`` is returned, with float slack"""
+        assert self.index.keyframe_at_or_before(t) == expected
+
+    def test_keyframe_at_or_before_without_keyframes(self):
+        """Test an empty index falls back to the clip start"""
+        assert MediaIndex(None, []).keyframe_at_or_before(3.0) == 0.0
+
+    def test_nearest_cut_respects_tolerance(self):
+        """Test cuts beyond ``max_distance`` are ignored"""
+        assert self.index.nearest_cut(3.0) == 3.1
+        assert self.index.nearest_cut(5.0, max_distance=1.0) is None
+        assert self.index.nearest_cut(7.5, max_distance=1.0) == 7.9
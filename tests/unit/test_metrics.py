@@ -0,0 +1,114 @@
+"""
+Unit tests for Prometheus metric helpers
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import openai
+import pytest
+
+from workflows.Jokestruc import llm_provider, metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class TestAwaitingReview:
+    """Test the awaiting-review gauge"""
+
+    def test_mark_is_idempotent_and_clear_drops_thread(self):
+        """Test a thread re-interrupted on resume is counted once"""
+        metrics.mark_awaiting_review("t-1")
+        metrics.mark_awaiting_review("t-1")
+        metrics.mark_awaiting_review("t-2")
+        assert {"t-1", "t-2"} <= metrics._awaiting_review
+
+        metrics.clear_awaiting_review("t-1")
+        metrics.clear_awaiting_review("t-2")
+        assert not {"t-1", "t-2"} & metrics._awaiting_review
+
+
+class TestProviderRetries:
+    """Test retries are counted at the provider call sites"""
+
+    def test_openai_retries_are_counted_then_succeed(self):
+        """Test a rate-limited attempt is retried and counted once"""
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        rate_limited = openai.RateLimitError(
+            "Rate limit reached",
+            response=httpx.Response(429, request=request),
+            body=None,
+        )
+        reply = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=None,
+        )
+        calls = []
+
+        async def create(**_):
+            calls.append(1)
+            if len(calls) == 1:
+                raise rate_limited
+            return reply
+
+        client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        counter = metrics.PROVIDER_RETRIES.labels("openai", "rate_limited")
+        before = counter._value.get()
+        with patch.object(llm_provider, "get_openai_client", return_value=client):
+            with patch.object(llm_provider, "OPENAI_BACKOFF_SEC", 0.0):
+                assert asyncio.run(llm_provider.run_openai_completion("hi")) == "ok"
+
+        assert len(calls) == 2
+        assert counter._value.get() == before + 1
+
+    def test_openai_gives_up_after_max_retries(self):
+        """Test the last transient error is raised once retries run out"""
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+        async def create(**_):
+            raise openai.APITimeoutError(request)
+
+        client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        with patch.object(llm_provider, "get_openai_client", return_value=client):
+            with patch.object(llm_provider, "OPENAI_BACKOFF_SEC", 0.0):
+                with pytest.raises(openai.APITimeoutError):
+                    asyncio.run(llm_provider.run_openai_completion("hi"))
+
+    def test_gemini_retry_hook_counts_errors(self):
+        """Test the Gemini retry policy reports each retried error"""
+        counter = metrics.PROVIDER_RETRIES.labels("gemini", "other")
+        before = counter._value.get()
+        retry = llm_provider.gemini_request_options()["retry"]
+        retry._on_error(RuntimeError("503 Service Unavailable"))
+        assert counter._value.get() == before + 1
+
+
+class TestConfig:
+    """Test metrics settings come from the app config"""
+
+    def test_graph_imports_in_production(self):
+        """Test production config validation does not run on import"""
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key not in ("DATABASE_URL", "SECRET_KEY", "JWT_SECRET_KEY")
+        }
+        env["ENVIRONMENT"] = "production"
+        result = subprocess.run(
+            [sys.executable, "-c", "import workflows.Jokestruc.graph"],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,106 @@
+"""
+Unit tests for mezzanine normalization decisions
+"""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+from workflows.Jokestruc import mezzanine_cache
+from workflows.Jokestruc.mezzanine_cache import MezzanineCache
+from workflows.Jokestruc.utils.mezzanine import (
+    audio_only,
+    build_mezzanine_command,
+    mezzanine_fps,
+    normalization_reasons,
+)
+
+
+def _streams(video=None, audio=None):
+    stream = {
+        "codec_type": "video",
+        "codec_name": "h264",
+        "pix_fmt": "yuv420p",
+        "r_frame_rate": "30/1",
+        "avg_frame_rate": "30/1",
+        **(video or {}),
+    }
+    return [stream, {"codec_type": "audio", "codec_name": "aac", **(audio or {})}]
+
+
+class TestNormalizationReasons:
+    """Test which probed inputs are sent to the mezzanine"""
+
+    def test_conforming_input_passes_through(self):
+        """Test H.264 yuv420p CFR with AAC needs no mezzanine"""
+        assert normalization_reasons(_streams()) == []
+        assert normalization_reasons([{"codec_type": "audio"}]) == []
+
+    def test_each_video_reason(self):
+        """Test codec, bit depth, VFR and rotation are each reported"""
+        assert normalization_reasons(_streams({"codec_name": "hevc"})) == ["codec:hevc"]
+        assert normalization_reasons(_streams({"pix_fmt": "yuv420p10le"})) == [
+            "pix_fmt:yuv420p10le"
+        ]
+        assert normalization_reasons(_streams({"avg_frame_rate": "2997/125"})) == [
+            "vfr"
+        ]
+        rotated = _streams({"side_data_list": [{"rotation": -90}]})
+        assert normalization_reasons(rotated) == ["rotation:270"]
+
+    def test_audio_only_reason(self):
+        """Test a non-AAC track on good video is an audio-only fix"""
+        reasons = normalization_reasons(_streams(audio={"codec_name": "opus"}))
+        assert reasons == ["audio:opus"]
+        assert audio_only(reasons)
+        assert not audio_only(["codec:hevc", "audio:opus"])
+        assert not audio_only([])
+
+    def test_fps_is_rounded_and_capped(self):
+        """Test the mezzanine rate follows the source average within limits"""
+        assert mezzanine_fps(_streams({"avg_frame_rate": "30000/1001"})) == 30
+        assert mezzanine_fps(_streams({"avg_frame_rate": "240/1"})) == 60
+        assert mezzanine_fps([]) == 30
+
+
+class TestMezzanineCommand:
+    """Test the transcode command for each decision"""
+
+    def test_full_transcode(self):
+        """Test video is re-encoded to CFR H.264 with a fixed GOP"""
+        command = build_mezzanine_command(Path("in.mov"), Path("out.mp4"), 24)
+        assert command[command.index("-c:v") + 1] == "libx264"
+        assert "fps=24,format=yuv420p" in command
+        assert command[command.index("-g") + 1] == "48"
+
+    def test_audio_only_copies_video(self):
+        """Test the video stream is copied and only audio is encoded"""
+        command = build_mezzanine_command(Path("in.mp4"), Path("out.mp4"), 30, True)
+        assert command[command.index("-c:v") + 1] == "copy"
+        assert "-vf" not in command and "-g" not in command
+        assert command[command.index("-c:a") + 1] == "aac"
+
+
+class TestMezzanineCache:
+    """Test cache hits and the command used on a miss"""
+
+    def test_miss_transcodes_once_then_hits(self, tmp_path):
+        """Test an audio-only input is remuxed, then served from the cache"""
+        source = tmp_path / "clip.mp4"
+        source.write_bytes(b"source")
+        commands = []
+
+        async def fake_ffmpeg(command, **_):
+            commands.append(command)
+            Path(command[-1]).write_bytes(b"mezzanine")
+
+        cache = MezzanineCache(tmp_path / "proxies")
+        streams = _streams(audio={"codec_name": "mp3"})
+        with patch.object(mezzanine_cache, "run_ffmpeg", fake_ffmpeg):
+            first = asyncio.run(cache.get(source, streams))
+            second = asyncio.run(cache.get(source, streams))
+
+        assert first == second and first.name == "clip.mp4"
+        assert first.read_bytes() == b"mezzanine"
+        assert len(commands) == 1
+        assert commands[0][commands[0].index("-c:v") + 1] == "copy"
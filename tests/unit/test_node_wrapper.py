@@ -0,0 +1,122 @@
+"""
+Unit tests for node instrumentation and state delta logging
+"""
+
+import asyncio
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc import state_logging, tracing
+from workflows.Jokestruc.node_wrapper import config_thread_id, instrument_node
+from workflows.Jokestruc.state_logging import StateDelta, log_state_update
+
+CONFIG = {"configurable": {"thread_id": "t-1"}}
+
+
+class TestStateDelta:
+    """Test the compact delta rendering"""
+
+    def test_type_and_size_without_digests(self):
+        """Test INFO deltas list type and size and never serialize values"""
+        with patch.object(state_logging, "_digest") as digest:
+            rendered = str(StateDelta({"captions": ["a", "b"], "done": True}))
+        assert rendered == "captions=list[2] done=bool"
+        digest.assert_not_called()
+
+    def test_digests_are_stable(self):
+        """Test DEBUG deltas add a content hash that ignores key order"""
+        first = str(StateDelta({"plan": {"a": 1, "b": 2}}, digests=True))
+        second = str(StateDelta({"plan": {"b": 2, "a": 1}}, digests=True))
+        assert first == second
+        assert first.startswith("plan=dict[2]#") and len(first.split("#")[1]) == 8
+        assert str(StateDelta({})) == "(none)"
+
+
+class TestLogStateUpdate:
+    """Test which records are emitted at each level"""
+
+    def test_info_logs_only_the_delta(self, caplog):
+        """Test INFO gets one compact line and no payload"""
+        with caplog.at_level(logging.INFO, logger=state_logging.__name__):
+            log_state_update("renderer", {"output_path": "/x.mp4"}, "t-1")
+        assert [record.getMessage() for record in caplog.records] == [
+            "node=renderer thread=t-1 delta=output_path=str[6]"
+        ]
+
+    def test_debug_adds_hash_and_payload(self, caplog):
+        """Test DEBUG hashes the delta and logs the full update"""
+        with caplog.at_level(logging.DEBUG, logger=state_logging.__name__):
+            log_state_update("renderer", {"output_path": "/x.mp4"}, "t-1")
+        messages = [record.getMessage() for record in caplog.records]
+        assert "#" in messages[0]
+        assert '"output_path": "/x.mp4"' in messages[1]
+
+    def test_sampled_payload_at_info(self, caplog, monkeypatch):
+        """Test a sample rate of 1 logs every payload at INFO"""
+        monkeypatch.setenv(state_logging.SAMPLE_RATE_ENV_VAR, "1")
+        with caplog.at_level(logging.INFO, logger=state_logging.__name__):
+            log_state_update("renderer", {"done": True})
+            log_state_update("renderer", None)
+        assert len(caplog.records) == 2
+        assert caplog.records[1].levelno == logging.INFO
+
+
+class TestInstrumentNode:
+    """Test the wrapper shared by every graph node"""
+
+    def test_async_node_is_traced_and_gets_config(self):
+        """Test config reaches nodes that declare it and spans carry the thread"""
+        spans = []
+        seen = []
+
+        async def composer(state, config=None):
+            seen.append(config)
+            return {"dag_composer_done": True}
+
+        wrapped = instrument_node("dag_composer", composer)
+        with patch.object(tracing, "_listeners", [spans.append]):
+            update = asyncio.run(wrapped({}, CONFIG))
+
+        assert update == {"dag_composer_done": True}
+        assert seen == [CONFIG]
+        assert [span.name for span in spans] == ["node.dag_composer"]
+        assert spans[0].thread_id == "t-1"
+        assert spans[0].attributes["node"] == "dag_composer"
+
+    def test_sync_node_without_config(self):
+        """Test nodes without a config parameter are called with state only"""
+        calls = []
+
+        def router(state):
+            calls.append(state)
+            return {"routed": True}
+
+        wrapped = instrument_node("router", router)
+        assert wrapped({"x": 1}, CONFIG) == {"routed": True}
+
+        assert calls == [{"x": 1}]
+        assert wrapped.__name__ == "router"
+        assert not hasattr(wrapped, "__wrapped__")
+
+    def test_errors_mark_the_span_failed(self):
+        """Test an exception is recorded on the span and re-raised"""
+        spans = []
+
+        async def broken(state):
+            raise ValueError("no beats")
+
+        wrapped = instrument_node("broken", broken)
+        with patch.object(tracing, "_listeners", [spans.append]):
+            with pytest.raises(ValueError):
+                asyncio.run(wrapped({}, CONFIG))
+
+        assert spans[0].status == "ERROR"
+        assert spans[0].status_message == "ValueError: no beats"
+
+    def test_config_thread_id(self):
+        """Test thread ids are read from configurable, if present"""
+        assert config_thread_id(CONFIG) == "t-1"
+        assert config_thread_id(None) is None
+        assert config_thread_id({"configurable": {}}) is None
@@ -0,0 +1,34 @@
+"""
+Unit tests for output target resolution
+"""
+
+import pytest
+
+from workflows.Jokestruc.utils.output_targets import resolve_output_targets
+
+
+class TestResolveOutputTargets:
+    """Test preset expansion and target validation"""
+
+    def test_expands_presets(self):
+        """Test preset names resolve to full target dictionaries"""
+        (target,) = resolve_output_targets(["square_1080"])
+        assert target == {"name": "square_1080", "width": 1080, "height": 1080}
+
+    def test_defaults_name_from_dimensions(self):
+        """Test unnamed targets are named after their size"""
+        (target,) = resolve_output_targets([{"width": 320, "height": 240}])
+        assert target["name"] == "320x240"
+
+    @pytest.mark.parametrize(
+        "name", ["../../x", "a/b", "..", ".hidden", "with space", "x\\y"]
+    )
+    def test_rejects_unsafe_names(self, name):
+        """Test names that are not a single safe path component are rejected"""
+        with pytest.raises(ValueError, match="Invalid output target name"):
+            resolve_output_targets([{"name": name, "width": 320, "height": 240}])
+
+    def test_rejects_duplicate_names(self):
+        """Test two targets cannot write the same file"""
+        with pytest.raises(ValueError, match="unique"):
+            resolve_output_targets(["preview", {"name": "preview", "width": 1, "height": 1}])
@@ -0,0 +1,183 @@
+"""
+Unit tests for web packaging commands and background packaging jobs
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc import packaging_jobs
+from workflows.Jokestruc.packaging_jobs import PackagingJobs
+from workflows.Jokestruc.render_scheduler import DEFAULT_PRIORITY
+from workflows.Jokestruc.utils.packaging import (
+    build_packaging_command,
+    package_dir_for,
+    resolve_packaging_options,
+)
+
+
+def _render(tmp_path, name="clip_captioned.mp4"):
+    video = tmp_path / name
+    video.write_bytes(b"render")
+    return video
+
+
+async def _fake_ffmpeg(command, **_):
+    """Write a small file for every output path of a packaging command"""
+    for arg in command:
+        if "_package" in arg and "%" not in arg:
+            Path(arg).write_bytes(b"artifact")
+
+
+class TestPackagingOptions:
+    """Test render_options['packaging'] resolution"""
+
+    def test_true_means_defaults_and_overrides_merge(self):
+        """Test booleans and partial objects resolve over the defaults"""
+        assert resolve_packaging_options(True)["layout"] == "faststart"
+        resolved = resolve_packaging_options({"hls": True, "preview": False})
+        assert resolved["hls"] is True and resolved["preview"] is False
+        assert resolved["poster"] is True
+
+    @pytest.mark.parametrize(
+        "options", ["yes", {"layout": "dash"}, {"preview_format": "mp4"}]
+    )
+    def test_invalid_options_raise(self, options):
+        """Test unknown layouts, formats and types are rejected"""
+        with pytest.raises(ValueError):
+            resolve_packaging_options(options)
+
+
+class TestPackagingCommand:
+    """Test the single-pass packaging command"""
+
+    def test_defaults_share_one_decode(self):
+        """Test poster and preview split one decode next to the stream copy"""
+        video = Path("/renders/clip.mp4")
+        command, artifacts = build_packaging_command(
+            video, package_dir_for(video), resolve_packaging_options(True)
+        )
+        graph = command[command.index("-filter_complex") + 1]
+        assert graph.startswith("[0:v]split=2[poster_in][preview_in]")
+        assert set(artifacts) == {"mp4", "poster", "preview"}
+        assert artifacts["mp4"] == "/renders/clip_package/clip.mp4"
+        assert command.count("-i") == 1
+        assert command[command.index("-movflags") + 1] == "+faststart"
+
+    def test_hls_without_stills(self):
+        """Test HLS is a second stream-copy output with no filtergraph"""
+        video = Path("/renders/clip.mp4")
+        options = resolve_packaging_options(
+            {"hls": True, "poster": False, "preview": False, "layout": "fragmented"}
+        )
+        command, artifacts = build_packaging_command(
+            video, package_dir_for(video), options
+        )
+        assert "-filter_complex" not in command
+        assert artifacts["hls"].endswith("clip_package/hls/index.m3u8")
+        assert command[command.index("-hls_time") + 1] == "4"
+        assert "+frag_keyframe+empty_moov+default_base_moof" in command
+
+
+class TestPackagingJobs:
+    """Test background job status and manifests"""
+
+    def test_job_runs_to_done_with_manifest(self, tmp_path):
+        """Test a submitted job writes its manifest and reports done"""
+        video = _render(tmp_path)
+        jobs = PackagingJobs()
+
+        async def run():
+            job = jobs.submit(
+                "t-1",
+                {"default": video},
+                resolve_packaging_options(True),
+                DEFAULT_PRIORITY,
+            )
+            await jobs._tasks["t-1"]
+            return job
+
+        with patch.object(packaging_jobs, "run_ffmpeg", _fake_ffmpeg):
+            submitted = asyncio.run(run())
+
+        status = jobs.status("t-1")
+        assert submitted["status"] == "pending"
+        assert status["status"] == "done"
+        manifest_path = Path(status["manifest_path"])
+        assert json.loads(manifest_path.read_text()) == status["manifest"]
+        assert status["manifest"]["artifacts"]["mp4"]["bytes"] == len(b"artifact")
+
+    def test_failed_job_records_error(self, tmp_path):
+        """Test an ffmpeg failure marks the job failed with its message"""
+        video = _render(tmp_path)
+        jobs = PackagingJobs()
+
+        async def broken(command, **_):
+            raise RuntimeError("ffmpeg exited 1")
+
+        async def run():
+            jobs.submit(
+                "t-1",
+                {"default": video},
+                resolve_packaging_options(True),
+                DEFAULT_PRIORITY,
+            )
+            await jobs._tasks["t-1"]
+
+        with patch.object(packaging_jobs, "run_ffmpeg", broken):
+            asyncio.run(run())
+
+        assert jobs.status("t-1")["status"] == "failed"
+        assert jobs.status("t-1")["error"] == "ffmpeg exited 1"
+
+    def test_resubmit_cancels_and_finished_jobs_are_pruned(self, tmp_path):
+        """Test a new job replaces a running one and old jobs are forgotten"""
+        video = _render(tmp_path)
+        jobs = PackagingJobs(max_finished=1)
+        options = resolve_packaging_options(True)
+
+        async def stall(command, **_):
+            await asyncio.sleep(10)
+
+        async def run():
+            with patch.object(packaging_jobs, "run_ffmpeg", stall):
+                jobs.submit("t-1", {"default": video}, options, DEFAULT_PRIORITY)
+                await asyncio.sleep(0)
+                first = jobs._tasks["t-1"]
+            with patch.object(packaging_jobs, "run_ffmpeg", _fake_ffmpeg):
+                jobs.submit("t-1", {"default": video}, options, DEFAULT_PRIORITY)
+                await asyncio.gather(first, return_exceptions=True)
+                await jobs._tasks["t-1"]
+                jobs.submit("t-2", {"default": video}, options, DEFAULT_PRIORITY)
+                await jobs._tasks["t-2"]
+                jobs._prune()
+
+        asyncio.run(run())
+        assert jobs.status("t-1") is None
+        assert jobs.status("t-2")["status"] == "done"
+
+    def test_multi_target_jobs_list_each_manifest(self, tmp_path):
+        """Test every target gets its own manifest under targets"""
+        videos = {
+            "default": _render(tmp_path, "clip_16x9.mp4"),
+            "vertical": _render(tmp_path, "clip_9x16.mp4"),
+        }
+        jobs = PackagingJobs()
+
+        async def run():
+            jobs.submit(
+                "t-1", videos, resolve_packaging_options(True), DEFAULT_PRIORITY
+            )
+            await jobs._tasks["t-1"]
+
+        with patch.object(packaging_jobs, "run_ffmpeg", _fake_ffmpeg):
+            asyncio.run(run())
+
+        status = jobs.status("t-1")
+        assert status["source"] == str(videos["default"])
+        assert set(status["targets"]) == {"default", "vertical"}
+        for name, entry in status["targets"].items():
+            assert entry["manifest"]["source"] == str(videos[name])
@@ -0,0 +1,105 @@
+"""
+Unit tests for per-request sampling profiles
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc import profiling
+from workflows.Jokestruc.artifact_store import ArtifactStore
+
+
+@pytest.fixture
+def profile_store(tmp_path):
+    """Point profile storage at a temporary artifact store"""
+    store = ArtifactStore(tmp_path, {})
+    with patch.object(profiling, "get_artifact_store", return_value=store):
+        yield store
+
+
+def _http_scope(path="/jokestruc/generate", headers=()):
+    return {"type": "http", "method": "POST", "path": path, "headers": list(headers)}
+
+
+async def _call(middleware, scope):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(scope, receive, send)
+    return sent
+
+
+async def _slow_app(scope, receive, send):
+    # Blocking on purpose so the loop thread is sampled inside this frame.
+    time.sleep(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class TestProfilingEnabled:
+    """Test the profiling switch"""
+
+    def test_config_flag_is_default(self, monkeypatch):
+        """Test the development config enables profiling without the env var"""
+        monkeypatch.delenv(profiling.PROFILING_ENV_VAR, raising=False)
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        assert profiling.profiling_enabled() is True
+        monkeypatch.setenv("ENVIRONMENT", "production")
+        assert profiling.profiling_enabled() is False
+
+    def test_env_var_overrides_config(self, monkeypatch):
+        """Test ENABLE_PROFILING wins over the config flag either way"""
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        monkeypatch.setenv(profiling.PROFILING_ENV_VAR, "false")
+        assert profiling.profiling_enabled() is False
+        monkeypatch.setenv("ENVIRONMENT", "production")
+        monkeypatch.setenv(profiling.PROFILING_ENV_VAR, "true")
+        assert profiling.profiling_enabled() is True
+
+
+class TestProfilingMiddleware:
+    """Test requests chosen for profiling are sampled and saved"""
+
+    def test_header_profiles_request(self, profile_store):
+        """Test X-Profile saves folded stacks and returns the profile id"""
+        middleware = profiling.ProfilingMiddleware(_slow_app)
+        middleware.interval = 0.005
+        scope = _http_scope(headers=[(profiling.PROFILE_HEADER, b"1")])
+
+        sent = asyncio.run(_call(middleware, scope))
+
+        headers = dict(sent[0]["headers"])
+        profile_id = headers[profiling.PROFILE_ID_HEADER].decode()
+        [meta] = profiling.list_profiles()
+        assert meta["profile_id"] == profile_id
+        assert meta["request"] == "POST /jokestruc/generate"
+        assert meta["samples"] > 0
+        folded = profiling.load_profile(profile_id)
+        assert folded.startswith(profiling.LOOP_ROOT)
+        assert "_slow_app" in folded
+        assert profiling._running is None
+
+    def test_unmarked_and_excluded_requests_pass_through(self, profile_store):
+        """Test requests without the header, or to excluded paths, are not profiled"""
+        middleware = profiling.ProfilingMiddleware(_slow_app)
+        asyncio.run(_call(middleware, _http_scope()))
+        asyncio.run(
+            _call(
+                middleware,
+                _http_scope("/metrics", headers=[(profiling.PROFILE_HEADER, b"1")]),
+            )
+        )
+        assert profiling.list_profiles() == []
+
+    def test_profile_ids_are_validated(self, profile_store):
+        """Test unknown or malformed profile ids return None"""
+        assert profiling.load_profile("../etc/passwd") is None
+        assert profiling.load_profile("0123456789ab") is None
@@ -0,0 +1,196 @@
+"""
+Unit tests for the render result cache
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from workflows.Jokestruc.render_cache import RenderCache, render_cache_key
+
+BEATS = [
+    {"start": 0.0, "end": 1.5, "caption": "when the build"},
+    {"start": 1.5, "end": 3.0, "caption": "finally passes"},
+]
+
+
+def _key(**overrides):
+    args = {
+        "input_fingerprint": "abc123",
+        "beats": BEATS,
+        "font_fingerprint": "font1",
+        "style": {"fontsize": 48, "position": "bottom"},
+        "encoder_args": ["-c:v", "libx264", "-crf", "23"],
+    }
+    args.update(overrides)
+    return render_cache_key(**args)
+
+
+class TestRenderCacheKey:
+    """Test cache key stability"""
+
+    def test_key_is_deterministic(self):
+        """Test identical specs hash to the same key"""
+        assert _key() == _key()
+
+    def test_key_ignores_irrelevant_beat_differences(self):
+        """Test whitespace, float noise and extra beat fields do not change the key"""
+        noisy = [
+            {"start": 0.0001, "end": 1.5, "caption": "  when the   build ", "id": 1},
+            {"start": 1.5, "end": 3.0002, "caption": "finally passes", "note": "x"},
+        ]
+        assert _key(beats=noisy) == _key()
+
+    def test_key_ignores_style_dict_order(self):
+        """Test style key ordering does not change the key"""
+        assert _key(style={"position": "bottom", "fontsize": 48}) == _key()
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"input_fingerprint": "other"},
+            {"font_fingerprint": "font2"},
+            {"style": {"fontsize": 50, "position": "bottom"}},
+            {"encoder_args": ["-c:v", "libx264", "-crf", "20"]},
+            {"beats": [{"start": 0.0, "end": 1.5, "caption": "different"}]},
+        ],
+    )
+    def test_key_changes_with_render_inputs(self, overrides):
+        """Test every pixel-affecting input changes the key"""
+        assert _key(**overrides) != _key()
+
+
+class TestSingleFlight:
+    """Test concurrent render deduplication"""
+
+    def test_concurrent_requests_share_one_render(self, tmp_path):
+        """Test identical concurrent requests render once"""
+        cache = RenderCache(tmp_path / "cache", max_bytes=10**9)
+        calls = []
+
+        async def run():
+            async def render_to(path):
+                calls.append(path)
+                await asyncio.sleep(0.05)
+                path.write_bytes(b"video")
+
+            outputs = [tmp_path / f"out{i}.mp4" for i in range(3)]
+            return outputs, await asyncio.gather(
+                *(cache.get_or_render("k", out, lambda o=out: render_to(o)) for out in outputs)
+            )
+
+        outputs, results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert sorted(results) == [False, True, True]
+        assert all(out.read_bytes() == b"video" for out in outputs)
+        assert cache.misses == 1
+        assert cache.hits == 2
+
+    def test_failed_flight_is_not_counted_as_hit(self, tmp_path):
+        """Test callers joining a failed render see the error and no hit"""
+        cache = RenderCache(tmp_path / "cache", max_bytes=10**9)
+
+        async def failing_render():
+            await asyncio.sleep(0.05)
+            raise RuntimeError("ffmpeg exploded")
+
+        async def run():
+            return await asyncio.gather(
+                cache.get_or_render("k", tmp_path / "a.mp4", failing_render),
+                cache.get_or_render("k", tmp_path / "b.mp4", failing_render),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.hits == 0
+        assert cache.misses == 1
+
+    def test_cached_entry_skips_render(self, tmp_path):
+        """Test a stored entry is served without rendering again"""
+        cache = RenderCache(tmp_path / "cache", max_bytes=10**9)
+
+        async def render():
+            (tmp_path / "first.mp4").write_bytes(b"video")
+
+        async def never():
+            raise AssertionError("render should not run on a hit")
+
+        async def run():
+            first = await cache.get_or_render("k", tmp_path / "first.mp4", render)
+            second = await cache.get_or_render("k", tmp_path / "second.mp4", never)
+            return first, second
+
+        assert asyncio.run(run()) == (False, True)
+        assert (tmp_path / "second.mp4").read_bytes() == b"video"
+
+    def test_multi_output_render_is_cached_per_output(self, tmp_path):
+        """Test a multi-target render is served only when every output is cached"""
+        cache = RenderCache(tmp_path / "cache", max_bytes=10**9)
+        outputs = [tmp_path / "a.mp4", tmp_path / "b.mp4"]
+        calls = []
+
+        async def render():
+            calls.append(1)
+            for out in outputs:
+                out.write_bytes(out.name.encode())
+
+        async def run():
+            first = await cache.get_or_render_many(["ka", "kb"], outputs, render)
+            for out in outputs:
+                out.unlink()
+            second = await cache.get_or_render_many(["ka", "kb"], outputs, render)
+            partial = await cache.get_or_render_many(["ka", "kc"], outputs, render)
+            return first, second, partial
+
+        assert asyncio.run(run()) == (False, True, False)
+        assert len(calls) == 2
+        assert [out.read_bytes() for out in outputs] == [b"a.mp4", b"b.mp4"]
+
+
+class TestEviction:
+    """Test LRU quota eviction"""
+
+    def test_evicts_least_recently_used_first(self, tmp_path):
+        """Test the oldest entries go first until the cache fits"""
+        root = tmp_path / "cache"
+        root.mkdir()
+        cache = RenderCache(root, max_bytes=250)
+        for age, name in enumerate(["old", "mid", "new"]):
+            path = root / f"{name}.mp4"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + age, 1000 + age))
+
+        cache._evict()
+
+        assert sorted(p.name for p in root.iterdir()) == ["mid.mp4", "new.mp4"]
+
+    def test_lookup_refreshes_recency(self, tmp_path):
+        """Test a looked-up entry survives eviction over newer ones"""
+        root = tmp_path / "cache"
+        root.mkdir()
+        cache = RenderCache(root, max_bytes=250)
+        for age, name in enumerate(["old", "mid", "new"]):
+            path = root / f"{name}.mp4"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + age, 1000 + age))
+
+        assert cache.lookup("old") is not None
+        cache._evict()
+
+        assert sorted(p.name for p in root.iterdir()) == ["new.mp4", "old.mp4"]
+
+    def test_ignores_temp_files(self, tmp_path):
+        """Test in-progress dotfiles are never evicted or counted"""
+        root = tmp_path / "cache"
+        root.mkdir()
+        (root / ".partial.tmp").write_bytes(b"x" * 1000)
+        (root / "entry.mp4").write_bytes(b"x" * 100)
+
+        RenderCache(root, max_bytes=150)._evict()
+
+        assert (root / ".partial.tmp").exists()
+        assert (root / "entry.mp4").exists()
@@ -0,0 +1,122 @@
+"""
+Unit tests for the render scheduler
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc.render_scheduler import RenderScheduler, apply_thread_budget
+from workflows.Jokestruc.utils import sandbox
+
+
+async def _hold(scheduler, priority, order, release):
+    async with scheduler.slot(priority):
+        order.append(priority)
+        await release.wait()
+
+
+class TestRenderScheduler:
+    """Test admission order and cancellation"""
+
+    def test_admits_by_priority_then_fifo(self):
+        """Test queued encodes are admitted by priority, FIFO within a priority"""
+        scheduler = RenderScheduler(max_concurrent=1, cores=4)
+        order = []
+
+        async def run():
+            release = asyncio.Event()
+            blocker = asyncio.create_task(_hold(scheduler, "batch", order, release))
+            await asyncio.sleep(0)
+            waiters = []
+            for priority in ["speculative", "batch", "interactive", "batch"]:
+                waiters.append(
+                    asyncio.create_task(_hold(scheduler, priority, order, release))
+                )
+                await asyncio.sleep(0)
+            assert scheduler.queue_depth == 4
+            release.set()
+            await asyncio.gather(blocker, *waiters)
+
+        asyncio.run(run())
+
+        assert order == ["batch", "interactive", "batch", "batch", "speculative"]
+        assert scheduler.stats()["active"] == 0
+
+    def test_cancel_while_queued_skips_waiter(self):
+        """Test a cancelled queued encode never runs and leaks no slot"""
+        scheduler = RenderScheduler(max_concurrent=1, cores=4)
+        order = []
+
+        async def run():
+            release = asyncio.Event()
+            blocker = asyncio.create_task(_hold(scheduler, "batch", order, release))
+            await asyncio.sleep(0)
+            cancelled = asyncio.create_task(
+                _hold(scheduler, "interactive", order, release)
+            )
+            queued = asyncio.create_task(_hold(scheduler, "speculative", order, release))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.sleep(0)
+            assert scheduler.queue_depth == 1
+            release.set()
+            await asyncio.gather(blocker, queued)
+            with pytest.raises(asyncio.CancelledError):
+                await cancelled
+
+        asyncio.run(run())
+
+        assert order == ["batch", "speculative"]
+        assert scheduler.stats()["active"] == 0
+
+    def test_rejects_unknown_priority(self):
+        """Test unknown priorities fail before queueing"""
+        scheduler = RenderScheduler(max_concurrent=1, cores=4)
+
+        async def run():
+            async with scheduler.slot("urgent"):
+                pass
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+    def test_budget_splits_cores(self):
+        """Test each encode gets an equal share of the cores"""
+        assert RenderScheduler(2, 8).budget() == {"threads": 4, "filter_threads": 2}
+        assert RenderScheduler(4, 2).budget() == {"threads": 1, "filter_threads": 1}
+
+
+class TestThreadBudget:
+    """Test ffmpeg thread flag injection"""
+
+    def test_places_flags(self):
+        """Test -filter_threads follows the binary and -threads precedes each output"""
+        argv = apply_thread_budget(
+            ["ffmpeg", "-i", "in.mp4", "a.mp4", "b.mp4"],
+            ["a.mp4", "b.mp4"],
+            {"threads": 2, "filter_threads": 1},
+        )
+        assert argv == [
+            "ffmpeg", "-filter_threads", "1", "-i", "in.mp4",
+            "-threads", "2", "a.mp4", "-threads", "2", "b.mp4",
+        ]
+
+
+class TestRenderCpuCount:
+    """Test CPU counting under affinity restrictions"""
+
+    def test_uses_configured_ffmpeg_affinity(self):
+        """Test FFMPEG_CPU_AFFINITY bounds the cores renders may use"""
+        config = {**sandbox.load_sandbox_config(), "cpus": "2-4,7"}
+        with patch.object(sandbox, "load_sandbox_config", return_value=config):
+            assert sandbox.render_cpu_count() == 4
+
+    def test_falls_back_to_process_affinity(self):
+        """Test the inherited affinity mask is used when no list is configured"""
+        config = {**sandbox.load_sandbox_config(), "cpus": None}
+        with patch.object(sandbox, "load_sandbox_config", return_value=config), patch.object(
+            sandbox.os, "sched_getaffinity", return_value={0, 1}, create=True
+        ):
+            assert sandbox.render_cpu_count() == 2
@@ -0,0 +1,49 @@
+"""
+Unit tests for the out-of-process render worker handle
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc.utils.ffmpeg_runner import FFmpegError
+from workflows.Jokestruc.utils.render_worker import RenderWorker
+
+
+class TestWorkerRestart:
+    """Test that a dead worker only fails its own jobs"""
+
+    def test_dead_worker_fails_only_its_generation(self):
+        """Test jobs queued to a restarted worker survive the old reader's cleanup"""
+        worker = RenderWorker()
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            old, new = loop.create_future(), loop.create_future()
+            worker._waiters["old"] = (1, loop, old, None)
+            worker._waiters["new"] = (2, loop, new, None)
+            await asyncio.to_thread(worker._fail_generation, 1, "worker died")
+            await asyncio.sleep(0)
+            return old, new
+
+        old, new = asyncio.run(run())
+
+        assert isinstance(old.exception(), FFmpegError)
+        assert "worker died" in str(old.exception())
+        assert not new.done()
+        assert worker._exited == {1}
+
+    def test_run_rejects_exited_generation(self):
+        """Test a job is not queued to a worker already known to be dead"""
+        worker = RenderWorker()
+        worker._generation = 3
+        worker._exited.add(3)
+
+        async def run():
+            with patch.object(worker, "_ensure_started"):
+                await worker.run(["ffmpeg", "-version"])
+
+        with pytest.raises(FFmpegError, match="render worker exited"):
+            asyncio.run(run())
+        assert worker._waiters == {}
@@ -0,0 +1,131 @@
+"""
+Unit tests for segment-parallel render planning
+"""
+
+import pytest
+
+from workflows.Jokestruc.utils.segment_render import (
+    MAX_CHUNKS,
+    build_segment_parallel_plan,
+    choose_chunk_count,
+    offset_beats,
+    plan_chunks,
+)
+
+
+class TestChooseChunkCount:
+    """Test chunk count selection"""
+
+    def test_limited_by_cores(self):
+        """Test long clips use one chunk per core"""
+        assert choose_chunk_count(120.0, cores=4) == 4
+
+    def test_limited_by_length(self):
+        """Test short clips are not split below the minimum chunk length"""
+        assert choose_chunk_count(10.0, cores=16, min_chunk_sec=4.0) == 2
+
+    def test_never_below_one(self):
+        """Test clips shorter than one chunk still render"""
+        assert choose_chunk_count(1.0, cores=8) == 1
+
+    def test_capped(self):
+        """Test the chunk count never exceeds MAX_CHUNKS"""
+        assert choose_chunk_count(10_000.0, cores=256) == MAX_CHUNKS
+
+
+class TestPlanChunks:
+    """Test keyframe-aligned chunk boundaries"""
+
+    def test_boundaries_snap_to_nearest_keyframe(self):
+        """Test each interior boundary is the keyframe nearest the even split"""
+        keyframes = [0.0, 2.0, 4.5, 6.0, 9.8, 12.0]
+        chunks = plan_chunks(15.0, keyframes, 3)
+        assert chunks == [(0.0, 4.5), (4.5, 9.8), (9.8, 15.0)]
+
+    def test_chunks_cover_clip_contiguously(self):
+        """Test chunks start at zero, end at the duration and leave no gaps"""
+        keyframes = [i * 2.0 for i in range(30)]
+        chunks = plan_chunks(60.0, keyframes, 7)
+        assert chunks[0][0] == 0.0
+        assert chunks[-1][1] == 60.0
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            assert end == start
+        assert all(start in keyframes for start, _ in chunks)
+
+    def test_merges_chunks_sharing_a_keyframe(self):
+        """Test sparse keyframes yield fewer chunks instead of empty ones"""
+        chunks = plan_chunks(20.0, [0.0, 10.0], 4)
+        assert chunks == [(0.0, 10.0), (10.0, 20.0)]
+
+    def test_no_interior_keyframes(self):
+        """Test a clip without usable keyframes renders as one chunk"""
+        assert plan_chunks(8.0, [0.0, 8.0], 4) == [(0.0, 8.0)]
+
+    def test_ignores_unsorted_and_out_of_range_keyframes(self):
+        """Test keyframe order and stray values do not break boundaries"""
+        chunks = plan_chunks(10.0, [12.0, 5.0, -1.0, 0.0], 2)
+        assert chunks == [(0.0, 5.0), (5.0, 10.0)]
+
+
+class TestOffsetBeats:
+    """Test rebasing beats onto chunk-local time"""
+
+    BEATS = [
+        {"start": 0.0, "end": 3.0, "caption": "first"},
+        {"start": 3.0, "end": 7.0, "caption": "spans"},
+        {"start": 8.0, "end": 9.0, "caption": "last"},
+    ]
+
+    def test_beat_spanning_boundary_is_split(self):
+        """Test a beat crossing a boundary appears, clipped, in both chunks"""
+        left = offset_beats(self.BEATS, 0.0, 5.0)
+        right = offset_beats(self.BEATS, 5.0, 10.0)
+        assert [b["caption"] for b in left] == ["first", "spans"]
+        assert left[1]["start"] == 3.0 and left[1]["end"] == 5.0
+        assert right[0]["caption"] == "spans"
+        assert right[0]["start"] == 0.0 and right[0]["end"] == 2.0
+
+    def test_clipped_pieces_add_up_to_original(self):
+        """Test the split pieces of a beat cover its full duration"""
+        pieces = [
+            b
+            for start, end in [(0.0, 4.0), (4.0, 6.0), (6.0, 10.0)]
+            for b in offset_beats(self.BEATS, start, end)
+            if b["caption"] == "spans"
+        ]
+        assert sum(b["end"] - b["start"] for b in pieces) == pytest.approx(4.0)
+
+    def test_beats_touching_edges_are_excluded(self):
+        """Test beats ending at the chunk start or starting at its end are dropped"""
+        assert [b["caption"] for b in offset_beats(self.BEATS, 7.0, 8.0)] == []
+
+    def test_preserves_extra_fields(self):
+        """Test non-timing beat fields survive rebasing"""
+        (beat,) = offset_beats([{"start": 1, "end": 2, "caption": "x", "id": 7}], 0.5, 3)
+        assert beat == {"start": 0.5, "end": 1.5, "caption": "x", "id": 7}
+
+
+class TestBuildSegmentParallelPlan:
+    """Test the chunk and concat step layout"""
+
+    def test_plan_layout(self, tmp_path):
+        """Test chunk steps run in one parallel group and concat runs last"""
+        output = tmp_path / "clip_captioned.mp4"
+        steps = build_segment_parallel_plan(
+            tmp_path / "clip.mp4",
+            output,
+            [{"start": 1.0, "end": 6.0, "caption": "hello"}],
+            "/fonts/font.ttf",
+            duration_sec=10.0,
+            keyframes=[0.0, 5.0],
+            chunk_count=2,
+        )
+
+        chunk_steps, concat = steps[:-1], steps[-1]
+        assert len(chunk_steps) == 2
+        assert {s["parallel_group"] for s in chunk_steps} == {"segments"}
+        assert concat["outputs"] == [str(output)]
+        assert "parallel_group" not in concat
+        concat_list = tmp_path / ".clip_captioned_segments" / "concat.txt"
+        assert concat_list.read_text() == "file 'chunk_000.mp4'\nfile 'chunk_001.mp4'\n"
+        assert chunk_steps[1]["command"][3] == "5.000000"
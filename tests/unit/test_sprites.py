@@ -0,0 +1,152 @@
+"""
+Unit tests for timeline sprite sheets and WebVTT thumbnail maps
+"""
+
+import asyncio
+import math
+from pathlib import Path
+from unittest.mock import patch
+
+from workflows.Jokestruc import thumbnails
+from workflows.Jokestruc.media_index import MediaIndex
+from workflows.Jokestruc.thumbnails import SpriteSheetCache, timeline_boundaries
+from workflows.Jokestruc.utils import sprites
+from workflows.Jokestruc.utils.sprites import (
+    MAX_SPRITE_FRAMES,
+    SPRITE_COLUMNS,
+    build_sprite_command,
+    build_thumbnail_vtt,
+    effective_stride,
+    parse_frame_times,
+    sprite_rows,
+    tile_rect,
+)
+
+FRAMECRC = """#software: Lavf60.16.100
+#tb 0: 1/30
+#media_type 0: video
+#codec_id 0: rawvideo
+#dimensions 0: 160x90
+#sar 0: 1/1
+0,          0,          0,        1,    43200, 0x1f9e5c3a
+0,         60,         60,        1,    43200, 0x2a7b1c4d
+0,         75,         75,        1,    43200, 0x3c8d2e5f
+"""
+
+
+def _selected_times(boundaries, stride_sec, fps=10, duration=6.0):
+    """Evaluate the select expression the way ffmpeg does, frame by frame"""
+    expression = sprites._select_expression(boundaries, stride_sec)
+    expression = expression.replace("\\,", ",").replace("prev_pts*TB", "prev_t")
+    functions = {
+        "eq": lambda a, b: float(a == b),
+        "gt": lambda a, b: float(a > b),
+        "gte": lambda a, b: float(a >= b),
+        "lt": lambda a, b: float(a < b),
+        "floor": lambda x: x if math.isnan(x) else math.floor(x),
+    }
+    selected = []
+    prev_t = float("nan")
+    for n in range(int(duration * fps)):
+        t = round(n / fps, 3)
+        scope = {**functions, "n": n, "t": t, "prev_t": prev_t}
+        if eval(expression, {"__builtins__": {}}, scope):
+            selected.append(t)
+        prev_t = t
+    return selected
+
+
+class TestStrideSelection:
+    """Test which frames become tiles"""
+
+    def test_first_frame_and_one_per_stride(self):
+        """Test the first frame and the first frame of each stride bucket"""
+        assert _selected_times([], 2.0) == [0.0, 2.0, 4.0]
+
+    def test_boundaries_add_their_first_frame(self):
+        """Test each timeline boundary adds the first frame at or after it"""
+        times = _selected_times([0.0, 1.25, 4.0, 4.0], 2.0)
+        assert times == [0.0, 1.3, 2.0, 4.0]
+
+    def test_long_clips_widen_the_stride(self):
+        """Test the stride grows so the sheet stays within the frame budget"""
+        assert effective_stride(60.0, 4) == 2.0
+        stride = effective_stride(3600.0, 9)
+        assert stride > 2.0
+        assert round(3600.0 / stride) + 9 + 1 <= MAX_SPRITE_FRAMES
+
+    def test_rows_fit_every_selectable_frame(self):
+        """Test the tile grid has room for boundaries plus stride frames"""
+        assert sprite_rows(0.0, 0, 2.0) == 1
+        assert sprite_rows(60.0, 4, 2.0) == math.ceil((4 + 30 + 1) / SPRITE_COLUMNS)
+
+    def test_command_tiles_and_logs_one_decode(self):
+        """Test one input feeds both the sheet and the framecrc log"""
+        command = build_sprite_command(
+            Path("clip.mp4"), Path("s.jpg"), Path("f.crc"), 20.0, [5.0], 2.0
+        )
+        graph = command[command.index("-filter_complex") + 1]
+        assert command.count("-i") == 1
+        assert "tile=10x2[sheet]" in graph
+        assert "gte(t\\,5.0)*lt(prev_pts*TB\\,5.0)" in graph
+        assert command[-3:] == ["-f", "framecrc", "f.crc"]
+
+
+class TestThumbnailVtt:
+    """Test the WebVTT map from times to tiles"""
+
+    def test_frame_times_use_the_stream_time_base(self):
+        """Test framecrc PTS are scaled by the #tb header"""
+        assert parse_frame_times(FRAMECRC) == [0.0, 2.0, 2.5]
+
+    def test_cues_point_at_tiles(self):
+        """Test each cue spans until the next tile and names its #xywh"""
+        vtt = build_thumbnail_vtt("sprite.jpg", [0.0, 2.0, 2.5] + [2.5], 3.0)
+        assert vtt.startswith("WEBVTT\n\n")
+        assert "00:00:00.000 --> 00:00:02.000\nsprite.jpg#xywh=0,0,160,90" in vtt
+        assert "00:00:02.000 --> 00:00:02.500\nsprite.jpg#xywh=160,0,160,90" in vtt
+        assert "00:00:02.500 --> 00:00:03.000\nsprite.jpg#xywh=480,0,160,90" in vtt
+        assert "#xywh=320,0" not in vtt
+
+    def test_tiles_wrap_to_the_next_row(self):
+        """Test tile rectangles run left to right, then down"""
+        assert tile_rect(SPRITE_COLUMNS) == (0, 90, 160, 90)
+        assert tile_rect(SPRITE_COLUMNS + 3) == (480, 90, 160, 90)
+
+
+class TestSpriteSheetCache:
+    """Test sheets are built once and served from disk"""
+
+    def test_build_then_hit(self, tmp_path):
+        """Test the manifest, VTT and sheet are published and reused"""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        commands = []
+
+        async def fake_ffmpeg(command, **_):
+            commands.append(command)
+            Path(command[command.index("[sheet]") + 5]).write_bytes(b"jpeg")
+            Path(command[-1]).write_text(FRAMECRC)
+
+        async def fake_index(video_path):
+            return MediaIndex(3.0, [])
+
+        cache = SpriteSheetCache(tmp_path / "sprites")
+        boundaries = timeline_boundaries([{"start": 0, "end": "2.5"}, {"end": None}])
+        with patch.object(thumbnails, "run_ffmpeg", fake_ffmpeg):
+            with patch.object(thumbnails, "get_media_index", fake_index):
+                built = asyncio.run(cache.get(clip, boundaries))
+                cached = asyncio.run(cache.get(clip, boundaries))
+
+        assert boundaries == [0.0, 2.5]
+        assert built == cached
+        assert len(commands) == 1
+        assert [frame["time"] for frame in built["frames"]] == [0.0, 2.0, 2.5]
+        assert built["frames"][2]["xywh"] == [320, 0, 160, 90]
+        sheet_dir = Path(built["sprite"]).parent
+        assert sorted(path.name for path in sheet_dir.iterdir()) == [
+            "sprite.jpg",
+            "sprite.json",
+            "thumbnails.vtt",
+        ]
+        assert "#xywh=320,0,160,90" in (sheet_dir / "thumbnails.vtt").read_text()
@@ -0,0 +1,136 @@
+"""
+Unit tests for captioned preview stills
+"""
+
+import asyncio
+import base64
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc import preview_stills
+from workflows.Jokestruc.preview_stills import (
+    FrameCache,
+    candidate_captions,
+    render_caption_stills,
+    segment_midpoint,
+)
+from workflows.Jokestruc.utils.ffmpeg_runner import FFmpegError
+from workflows.Jokestruc.utils.stills import (
+    build_caption_stills_command,
+    build_frame_grab_command,
+)
+
+
+def _clip(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"video")
+    return clip
+
+
+async def _write_outputs(command, **_):
+    """Stand in for ffmpeg by writing each command's image outputs"""
+    for arg in command:
+        if arg.endswith((".png", ".jpg")) and arg != command[command.index("-i") + 1]:
+            Path(arg).write_bytes(f"image:{Path(arg).name}".encode())
+
+
+class TestStillHelpers:
+    """Test caption and timestamp normalization"""
+
+    def test_candidate_captions_from_text_or_list(self):
+        """Test numbered text and lists both become clean caption lists"""
+        assert candidate_captions("one\n\n two \n") == ["one", "two"]
+        assert candidate_captions([" a ", "", 3]) == ["a", "3"]
+        assert candidate_captions(None) == []
+
+    def test_segment_midpoint(self):
+        """Test the middle of the window, or zero without a usable one"""
+        assert segment_midpoint({"start": 2, "end": "5"}) == 3.5
+        assert segment_midpoint({"start": 2}) == 0.0
+        assert segment_midpoint(None) == 0.0
+
+
+class TestStillCommands:
+    """Test the frame grab and compositing commands"""
+
+    def test_frame_grab_seeks_before_input(self):
+        """Test -ss comes before -i and negative offsets clamp to zero"""
+        command = build_frame_grab_command(Path("in.mp4"), -1.0, Path("f.png"))
+        assert command.index("-ss") < command.index("-i")
+        assert command[command.index("-ss") + 1] == "0.000"
+        assert command[command.index("-frames:v") + 1] == "1"
+
+    def test_captions_share_one_split(self, tmp_path):
+        """Test every caption is one labelled output of a single filtergraph"""
+        command, outputs = build_caption_stills_command(
+            Path("frame.png"), ["first", "second"], "font.ttf", tmp_path
+        )
+        graph = command[command.index("-filter_complex") + 1]
+        assert graph.startswith("[0:v]split=2[in0][in1]")
+        assert command.count("-i") == 1
+        assert [path.name for path in outputs] == ["still_00.jpg", "still_01.jpg"]
+        assert command.count("-map") == 2
+
+
+class TestFrameCache:
+    """Test frame decoding is cached and cleaned up"""
+
+    def test_concurrent_callers_decode_once(self, tmp_path):
+        """Test two requests for the same frame share one decode"""
+        clip = _clip(tmp_path)
+        cache = FrameCache(tmp_path / "frames")
+        commands = []
+
+        async def decode(command, **kwargs):
+            commands.append(command)
+            await asyncio.sleep(0.01)
+            await _write_outputs(command)
+
+        async def run():
+            return await asyncio.gather(cache.get(clip, 1.5), cache.get(clip, 1.5))
+
+        with patch.object(preview_stills, "run_ffmpeg", decode):
+            first, second = asyncio.run(run())
+            again = asyncio.run(cache.get(clip, 1.5))
+
+        assert first == second == again
+        assert first.name.endswith("_1500.png")
+        assert len(commands) == 1
+
+    def test_failed_decode_removes_temp_frame(self, tmp_path):
+        """Test a failing ffmpeg leaves no temporary PNG behind"""
+        clip = _clip(tmp_path)
+        cache = FrameCache(tmp_path / "frames")
+
+        async def fail(command, **_):
+            Path(command[-1]).write_bytes(b"partial")
+            raise FFmpegError("FFmpeg failed", command, 1, ["Invalid data found"])
+
+        with patch.object(preview_stills, "run_ffmpeg", fail):
+            with pytest.raises(FFmpegError):
+                asyncio.run(cache.get(clip, 0.0))
+
+        assert list((tmp_path / "frames").iterdir()) == []
+
+
+class TestRenderCaptionStills:
+    """Test stills are returned as base64 JPEGs"""
+
+    def test_one_still_per_caption(self, tmp_path):
+        """Test each caption maps to its own encoded still"""
+        clip = _clip(tmp_path)
+        with patch.object(preview_stills, "run_ffmpeg", _write_outputs):
+            with patch.object(
+                preview_stills, "get_frame_cache", return_value=FrameCache(tmp_path)
+            ):
+                with patch.object(preview_stills, "pick_font_path", return_value="f"):
+                    stills = asyncio.run(
+                        render_caption_stills(clip, 1.0, ["top", "bottom"])
+                    )
+
+        assert [still["caption"] for still in stills] == ["top", "bottom"]
+        decoded = base64.b64decode(stills[1]["jpeg_base64"])
+        assert decoded == b"image:still_01.jpg"
+        assert asyncio.run(render_caption_stills(clip, 1.0, [])) == []
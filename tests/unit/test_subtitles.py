@@ -0,0 +1,109 @@
+"""
+Unit tests for subtitle documents and their frame geometry
+"""
+
+import asyncio
+import re
+from unittest.mock import patch
+
+from workflows.Jokestruc.Nodes import dag_composer as composer
+from workflows.Jokestruc.utils.mezzanine import display_size
+from workflows.Jokestruc.utils.subtitles import (
+    build_ass_document,
+    build_overlay_manifest,
+)
+
+BEATS = [{"start": 0.0, "end": 2.0, "caption": "When the build passes first try"}]
+VERTICAL_STREAMS = [{"codec_type": "video", "width": 1080, "height": 1920}]
+
+
+def _positions(document):
+    return [(int(x), int(y)) for x, y in re.findall(r"\\pos\((\d+),(\d+)\)", document)]
+
+
+class TestDisplaySize:
+    """Test upright frame size from probed streams"""
+
+    def test_rotation_swaps_dimensions(self):
+        """Test a 90 degree phone clip is laid out portrait"""
+        streams = [
+            {
+                "codec_type": "video",
+                "width": 1920,
+                "height": 1080,
+                "side_data_list": [{"rotation": -90}],
+            }
+        ]
+        assert display_size(streams) == (1080, 1920)
+
+    def test_missing_video_or_dimensions(self):
+        """Test unusable probes return None"""
+        assert display_size([{"codec_type": "audio"}]) is None
+        assert display_size([{"codec_type": "video"}]) is None
+
+
+class TestAssGeometry:
+    """Test ASS scripts use the real frame as their canvas"""
+
+    def test_vertical_frame_play_res_and_positions(self):
+        """Test a 9:16 frame gets its own PlayRes and bottom-centred lines"""
+        document = build_ass_document(BEATS, 1080, 1920)
+
+        assert "PlayResX: 1080" in document
+        assert "PlayResY: 1920" in document
+        positions = _positions(document)
+        assert positions
+        assert all(x == 540 for x, _ in positions)
+        assert all(1920 - 200 < y < 1920 for _, y in positions)
+
+    def test_square_frame_wraps_to_its_width(self):
+        """Test a narrow frame wraps into more lines than the 1280 default"""
+        caption = {"start": 0.0, "end": 1.0, "caption": "word " * 20}
+        square = _positions(build_ass_document([caption], 480, 480))
+        default = _positions(build_ass_document([caption]))
+        assert len(square) > len(default)
+
+    def test_composer_passes_probed_frame_size(self, tmp_path):
+        """Test ass mode writes the probed vertical size into the script"""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        font = tmp_path / "font.ttf"
+        font.write_bytes(b"font")
+
+        with patch.object(composer, "probe_streams", return_value=VERTICAL_STREAMS):
+            step = asyncio.run(
+                composer._ass_step(
+                    clip,
+                    tmp_path,
+                    BEATS,
+                    str(font),
+                    {},
+                    asyncio.run(composer._frame_size(clip)),
+                )
+            )
+
+        document = (tmp_path / "clip_captions.ass").read_text()
+        assert step["subtitles"].endswith("clip_captions.ass")
+        assert "PlayResX: 1080" in document
+        assert "PlayResY: 1920" in document
+
+
+class TestOverlayManifest:
+    """Test client overlay positions use the source canvas"""
+
+    def test_vertical_canvas_and_positions(self):
+        """Test a 9:16 source reports its own canvas and line anchors"""
+        manifest = build_overlay_manifest(BEATS, 1080, 1920)
+
+        assert manifest["canvas"] == {"width": 1080, "height": 1920}
+        for line in manifest["cues"][0]["lines"]:
+            assert line["x"] == 540
+            assert 1920 - 200 < line["y"] < 1920
+
+    def test_sidecars_use_probed_size(self, tmp_path):
+        """Test sidecar mode writes the probed canvas into the manifest"""
+        written = composer._write_sidecars(tmp_path, "clip", BEATS, (1080, 1920))
+        manifest = (tmp_path / "clip_overlay.json").read_text()
+        assert '"width": 1080' in manifest
+        assert "PlayResY: 1920" in (tmp_path / "clip_captions.ass").read_text()
+        assert set(written) == {"srt", "vtt", "ass", "overlay"}
@@ -0,0 +1,157 @@
+"""
+Unit tests for spans, trace ids and span export
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from workflows.Jokestruc import tracing
+from workflows.Jokestruc.tracing import SpanExporter, span, trace_id_for
+
+
+@pytest.fixture
+def finished():
+    """Collect finished spans through a listener, with no exporter"""
+    spans = []
+    with (
+        patch.object(tracing, "_exporter", None),
+        patch.object(tracing, "_exporter_checked", True),
+        patch.object(tracing, "_listeners", [spans.append]),
+    ):
+        yield spans
+
+
+class TestTraceIds:
+    """Test trace ids derived from thread ids"""
+
+    def test_stable_per_thread(self):
+        """Test a thread always maps to the same 128-bit hex id"""
+        assert trace_id_for("t-1") == trace_id_for("t-1")
+        assert trace_id_for("t-1") != trace_id_for("t-2")
+        assert len(trace_id_for("t-1")) == 32
+        int(trace_id_for("t-1"), 16)
+
+
+class TestSpanNesting:
+    """Test parent links and trace inheritance"""
+
+    def test_children_join_the_thread_trace(self, finished):
+        """Test nested spans share the trace and point at their parent"""
+        with span("node.renderer", "t-1", node="renderer") as parent:
+            with span("ffmpeg", output="out.mp4") as child:
+                child.set_attribute("bytes", None)
+
+        assert [item.name for item in finished] == ["ffmpeg", "node.renderer"]
+        assert child.trace_id == parent.trace_id == trace_id_for("t-1")
+        assert child.parent_id == parent.span_id
+        assert child.thread_id == "t-1"
+        assert parent.parent_id is None
+        assert "bytes" not in child.attributes
+        assert parent.end_ns >= child.end_ns >= child.start_ns
+
+    def test_nesting_follows_awaits_and_threads(self, finished):
+        """Test spans opened in gathered tasks and to_thread keep their parent"""
+
+        def in_thread():
+            with span("gemini.generate_content"):
+                pass
+
+        async def run():
+            with span("node.video_insight", "t-1") as parent:
+                await asyncio.gather(asyncio.to_thread(in_thread), in_task())
+            return parent
+
+        async def in_task():
+            with span("openai.chat"):
+                await asyncio.sleep(0)
+
+        parent = asyncio.run(run())
+        children = [item for item in finished if item is not parent]
+        assert {item.name for item in children} == {
+            "gemini.generate_content",
+            "openai.chat",
+        }
+        assert all(item.parent_id == parent.span_id for item in children)
+
+    def test_other_thread_starts_a_new_trace(self, finished):
+        """Test a span for another thread is a root in that thread's trace"""
+        with span("node.a", "t-1"):
+            with span("node.b", "t-2") as other:
+                pass
+        assert other.parent_id is None
+        assert other.trace_id == trace_id_for("t-2")
+
+    def test_errors_and_interrupts(self, finished):
+        """Test failures set ERROR while graph interrupts are only flagged"""
+        GraphInterrupt = type("GraphInterrupt", (Exception,), {})
+        with pytest.raises(RuntimeError):
+            with span("node.failing", "t-1"):
+                raise RuntimeError("boom")
+        with pytest.raises(GraphInterrupt):
+            with span("node.human_review", "t-1"):
+                raise GraphInterrupt()
+
+        failed, paused = finished
+        assert failed.status == "ERROR"
+        assert failed.status_message == "RuntimeError: boom"
+        assert paused.status == "UNSET"
+        assert paused.attributes["interrupted"] is True
+
+    def test_noop_without_exporter_or_listener(self):
+        """Test spans cost nothing when tracing is not configured"""
+        with (
+            patch.object(tracing, "_exporter", None),
+            patch.object(tracing, "_exporter_checked", True),
+            patch.object(tracing, "_listeners", []),
+        ):
+            with span("node.x", "t-1") as current:
+                current.set_attribute("ignored", 1)
+        assert current is tracing._NOOP_SPAN
+
+
+class TestExport:
+    """Test the file exporter and the OTLP payload"""
+
+    def test_file_export_writes_json_lines(self, tmp_path):
+        """Test finished spans are flushed as OTLP-shaped records on shutdown"""
+        trace_file = tmp_path / "traces" / "spans.jsonl"
+        exporter = SpanExporter(trace_file, None)
+        with (
+            patch.object(tracing, "_exporter", exporter),
+            patch.object(tracing, "_exporter_checked", True),
+            patch.object(tracing, "_listeners", []),
+        ):
+            with span("node.renderer", "t-1", node="renderer"):
+                with span("ffmpeg"):
+                    pass
+        exporter.shutdown()
+
+        records = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert [record["name"] for record in records] == ["ffmpeg", "node.renderer"]
+        assert records[0]["parentSpanId"] == records[1]["spanId"]
+        assert records[1]["attributes"] == {"node": "renderer", "thread_id": "t-1"}
+        assert records[1]["resource"] == {"service.name": "memevid"}
+
+    def test_otlp_payload_shape(self, finished):
+        """Test records become typed OTLP attributes inside resourceSpans"""
+        with pytest.raises(ValueError):
+            with span("node.x", "t-1", retries=2, cached=True, speed=1.5):
+                raise ValueError("bad")
+
+        payload = tracing._otlp_payload([finished[0].to_record()])
+        resource = payload["resourceSpans"][0]
+        exported = resource["scopeSpans"][0]["spans"][0]
+        attributes = {item["key"]: item["value"] for item in exported["attributes"]}
+        assert resource["resource"]["attributes"][0]["value"] == {
+            "stringValue": "memevid"
+        }
+        assert exported["traceId"] == trace_id_for("t-1")
+        assert isinstance(exported["startTimeUnixNano"], str)
+        assert exported["status"] == {"code": 2}
+        assert attributes["retries"] == {"intValue": "2"}
+        assert attributes["cached"] == {"boolValue": True}
+        assert attributes["speed"] == {"doubleValue": 1.5}
+        assert attributes["thread_id"] == {"stringValue": "t-1"}
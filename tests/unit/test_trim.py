@@ -0,0 +1,83 @@
+"""
+Unit tests for trim window computation
+"""
+
+import pytest
+
+from workflows.Jokestruc.utils.trim import seek_input_args, trim_window
+
+BEATS = [
+    {"start": 4.0, "end": 6.0, "caption": "setup"},
+    {"start": 6.0, "end": 9.0, "caption": "punchline"},
+]
+SEGMENT = {"start": 3.0, "end": 8.0}
+
+
+class TestTrimWindow:
+    """Test window sources, lead-in/lead-out padding and clamping"""
+
+    def test_beats_source_spans_beats_only(self):
+        """Test the beats source ignores the selected segment"""
+        assert trim_window("beats", SEGMENT, BEATS, 0.5, 0.5) == (3.5, 9.5)
+
+    def test_beats_source_needs_no_segment(self):
+        """Test the beats source works without a selected segment"""
+        assert trim_window("beats", None, BEATS, 0.0, 0.0) == (4.0, 9.0)
+
+    def test_segment_source_widens_to_cover_beats(self):
+        """Test a beat spilling past the segment extends the window"""
+        assert trim_window("segment", SEGMENT, BEATS, 0.5, 0.5) == (2.5, 9.5)
+
+    def test_segment_source_covers_segment_beyond_beats(self):
+        """Test a segment wider than the beats keeps its own bounds"""
+        wide = {"start": 1.0, "end": 12.0}
+        assert trim_window("segment", wide, BEATS, 0.0, 0.0) == (1.0, 12.0)
+
+    def test_segment_source_requires_segment(self):
+        """Test trimming to a missing segment is an error"""
+        with pytest.raises(ValueError, match="selected_segment"):
+            trim_window("segment", {"start": 1.0}, BEATS)
+
+    def test_clamps_lead_in_at_clip_start(self):
+        """Test the lead-in never seeks before zero"""
+        beats = [{"start": 0.2, "end": 2.0, "caption": "early"}]
+        assert trim_window("beats", None, beats, 1.0, 0.0) == (0.0, 2.0)
+
+    def test_clamps_lead_out_at_clip_end(self):
+        """Test the lead-out stops at the clip duration"""
+        assert trim_window("beats", None, BEATS, 0.0, 2.0, duration_sec=10.0) == (
+            4.0,
+            10.0,
+        )
+
+    def test_unknown_duration_is_not_clamped(self):
+        """Test the lead-out is kept when the duration is unknown"""
+        assert trim_window("beats", None, BEATS, 0.0, 2.0) == (4.0, 11.0)
+
+    def test_negative_leads_are_ignored(self):
+        """Test negative padding cannot shrink the window"""
+        assert trim_window("beats", None, BEATS, -1.0, -1.0) == (4.0, 9.0)
+
+    def test_rejects_window_past_clip_end(self):
+        """Test beats that start after the clip ends yield an error"""
+        with pytest.raises(ValueError, match="Empty trim window"):
+            trim_window("beats", None, BEATS, 0.0, 0.0, duration_sec=3.0)
+
+    def test_rejects_unknown_source(self):
+        """Test only known trim sources are accepted"""
+        with pytest.raises(ValueError, match="Unknown trim source"):
+            trim_window("scene", SEGMENT, BEATS)
+
+
+class TestSeekInputArgs:
+    """Test fast input seeking arguments"""
+
+    def test_no_window(self):
+        """Test untrimmed renders read the whole input"""
+        assert seek_input_args("in.mp4", None) == ["-i", "in.mp4"]
+
+    def test_window_seeks_before_input(self):
+        """Test -ss/-t come before -i so seeking happens at the demuxer"""
+        assert seek_input_args("in.mp4", (2.5, 7.0)) == [
+            "-ss", "2.500000", "-t", "4.500000", "-i", "in.mp4",
+        ]
@@ -6,6 +6,7 @@ from typing import Any, Dict, Optional
 
 import google.generativeai as genai
 
+from ..execution_log import log_event
 from ..humor_config import load_humor_levers
 from ..llm_provider import configure_genai, run_openai_completion
 from ..prompts.caption_generator_prompt import CAPTION_GENERATOR_PROMPT
@@ -13,8 +14,7 @@ from ..prompts.caption_generator_prompt import CAPTION_GENERATOR_PROMPT
 
 async def caption_generator(state: Dict[str, Any]) -> Dict[str, Any]:
     """Create short meme captions aligned with the current humor lever."""
-    logs = state.get("logs", [])
-    logs.append("caption_generator:start")
+    log_event("caption_generator:start")
 
     video_insights = state.get("video_insights") or {}
     raw_description = video_insights.get("raw_description", "")
@@ -24,7 +24,7 @@ async def caption_generator(state: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError("video_insights['raw_description'] is required")
 
     configure_genai()
-    HUMOR_LEVERS = load_humor_levers()
+    HUMOR_LEVERS = await asyncio.to_thread(load_humor_levers)
 
     lever = state.get("selected_lever") or {}
     lever_hint = ""
@@ -61,9 +61,8 @@ async def caption_generator(state: Dict[str, Any]) -> Dict[str, Any]:
     # captions_text = await asyncio.to_thread(_generate)
     captions_text = await run_openai_completion(prompt)
 
-    logs.append("caption_generator:done")
     return {
-        "logs": logs,
+        "log_cursor": log_event("caption_generator:done"),
         "caption_generator_done": True,
         "captions": captions_text,
     }
@@ -1,9 +1,11 @@
 """LLM-based caption selection node."""
 
+import asyncio
 import json
 import re
 from typing import Any, Dict, List
 
+from ..execution_log import log_event
 from ..humor_config import load_humor_levers
 from ..llm_provider import run_openai_completion  # or Gemini equivalent
 from ..prompts.caption_selector_prompt import CAPTION_SELECTOR_PROMPT
@@ -11,8 +13,7 @@ from ..prompts.caption_selector_prompt import CAPTION_SELECTOR_PROMPT
 
 async def caption_selector(state: Dict[str, Any]) -> Dict[str, Any]:
     """Ask an LLM judge to select the best caption."""
-    logs = state.get("logs", [])
-    logs.append("caption_selector:start")
+    log_event("caption_selector:start")
 
     raw = state.get("captions", "")
     selected_lever = state.get("selected_lever") or {}
@@ -34,7 +35,7 @@ async def caption_selector(state: Dict[str, Any]) -> Dict[str, Any]:
     # Levers are stored as full dict now; ensure we have description/example
     lever_info = selected_lever
     if not lever_info:
-        lever_info = next(iter(load_humor_levers()), {})
+        lever_info = next(iter(await asyncio.to_thread(load_humor_levers)), {})
 
     segment_hint = ""
     if selected_segment:
@@ -75,9 +76,8 @@ async def caption_selector(state: Dict[str, Any]) -> Dict[str, Any]:
             selected_scene_line = line
             break
 
-    logs.append("caption_selector:done")
     return {
-        "logs": logs,
+        "log_cursor": log_event("caption_selector:done"),
         "caption_selector_done": True,
         "selected_caption": selected_caption,
         "selected_scene_segment": selected_scene_line or scene_map_text,
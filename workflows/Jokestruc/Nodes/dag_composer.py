@@ -1,10 +1,54 @@
 """Construct FFmpeg commands to render captions onto the video."""
 import asyncio
+import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from ..utils.ffmpeg_util import build_drawtext_filters, pick_font_path
+from langchain_core.runnables import RunnableConfig
+
+from ..artifact_store import atomic_write_text, get_artifact_store
+from ..execution_log import log_event
+from ..media_index import get_media_index
+from ..node_wrapper import config_thread_id
+from ..render_cache import render_cache_key
+from ..utils.ffmpeg_util import (
+    ENCODER_ARGS,
+    build_drawtext_filters,
+    caption_style,
+    pick_font_path,
+)
+from ..utils.mezzanine import display_size
+from ..utils.output_targets import (
+    build_multi_target_filtergraph,
+    resolve_output_targets,
+    target_encoder_args,
+)
+from ..utils.segment_render import build_segment_parallel_plan, offset_beats
+from ..utils.subtitles import (
+    build_ass_document,
+    build_overlay_manifest,
+    build_srt_document,
+    build_webvtt_document,
+    DEFAULT_VIDEO_HEIGHT,
+    DEFAULT_VIDEO_WIDTH,
+    escape_filter_path,
+    load_caption_style,
+)
+from ..utils.trim import (
+    DEFAULT_LEAD_IN_SEC,
+    DEFAULT_LEAD_OUT_SEC,
+    seek_input_args,
+    trim_window,
+)
+from ..video_io import content_fingerprint, probe_streams
+
+RENDER_MODES = ("burn_in", "parallel", "ass", "soft", "sidecar")
+SOFT_SUBTITLE_CODECS = {".mkv": "ass", ".mp4": "mov_text", ".mov": "mov_text"}
+TRIMMABLE_MODES = ("burn_in", "ass", "soft", "targets")
+
+Window = Optional[Tuple[float, float]]
+FrameSize = Tuple[int, int]
 
 # from dotenv import load_dotenv
 
@@ -18,49 +62,417 @@ from ..utils.ffmpeg_util import build_drawtext_filters, pick_font_path
 # ]
 
 
-async def dag_composer(state: Dict[str, Any]) -> Dict[str, Any]:
-    """Compile the caption timing plan into FFmpeg commands."""
-    logs = state.get("logs", [])
-    logs.append("dag_composer:start")
+async def _frame_size(input_video: Path) -> FrameSize:
+    """Return the upright frame size captions are laid out on.
 
-    timing_plan = state.get("timing_plan") or {}
-    beats = timing_plan.get("beats") or []
-    if not beats:
-        raise ValueError("timing_plan['beats'] is required for DAG composition")
+    Falls back to 1280x720 when the input cannot be probed.
+    """
+    streams = await asyncio.to_thread(probe_streams, input_video)
+    return display_size(streams or []) or (DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT)
 
-    input_data = state.get("input") or {}
-    media_path = input_data.get("media_path")
-    if not media_path:
-        raise ValueError("input['media_path'] is required for DAG composition")
-
-    font_path = pick_font_path()
 
+async def _caption_step(
+    input_video: Path,
+    output_dir: Path,
+    beats: Sequence[Dict[str, Any]],
+    font_path: str,
+    window: Window = None,
+    frame_size: FrameSize = (DEFAULT_VIDEO_WIDTH, DEFAULT_VIDEO_HEIGHT),
+) -> Dict[str, Any]:
+    """Build the single-output caption overlay step."""
+    video_width = frame_size[0]
     draw_filters = []
     for beat in beats:
-        draw_filters.extend(build_drawtext_filters(beat, font_path))
+        draw_filters.extend(
+            build_drawtext_filters(beat, font_path, video_width=video_width)
+        )
     filter_complex = ",".join(draw_filters)
 
-    input_video = Path(media_path)
-    output_dir = input_video.parent / "renders"
-    output_dir.mkdir(exist_ok=True)
     output_path = output_dir / f"{input_video.stem}_captioned.mp4"
 
     command = [
         "ffmpeg",
         "-y",
-        "-i",
-        str(input_video),
+        *seek_input_args(str(input_video), window),
         "-vf",
         filter_complex,
+        *ENCODER_ARGS,
         "-c:a",
         "copy",
         str(output_path),
     ]
 
-    logs.append("dag_composer:done")
+    input_fingerprint, font_fingerprint = await asyncio.gather(
+        asyncio.to_thread(content_fingerprint, input_video),
+        asyncio.to_thread(content_fingerprint, Path(font_path)),
+    )
+    cache_key = render_cache_key(
+        input_fingerprint,
+        beats,
+        font_fingerprint,
+        {**caption_style(), "video_width": video_width, "window": window},
+        ENCODER_ARGS,
+    )
+    return {
+        "step": "overlay_caption",
+        "command": command,
+        "outputs": [str(output_path)],
+        "cache_key": cache_key,
+    }
+
+
+async def _ass_step(
+    input_video: Path,
+    output_dir: Path,
+    beats: Sequence[Dict[str, Any]],
+    font_path: str,
+    render_options: Dict[str, Any],
+    frame_size: FrameSize,
+    window: Window = None,
+) -> Dict[str, Any]:
+    """Burn the whole timing plan in through one ``ass`` filter.
+
+    With ``subtitle_track`` set, the same script is also muxed as a soft
+    subtitle stream when the output container supports one.
+    """
+    container = "." + str(render_options.get("container") or "mp4").lstrip(".")
+    output_path = output_dir / f"{input_video.stem}_captioned{container}"
+    ass_path = output_dir / f"{input_video.stem}_captions.ass"
+    document = build_ass_document(beats, *frame_size)
+    await asyncio.to_thread(atomic_write_text, ass_path, document)
+
+    ass_filter = (
+        f"ass={escape_filter_path(str(ass_path))}"
+        f":fontsdir={escape_filter_path(str(Path(font_path).parent))}"
+    )
+    command = ["ffmpeg", "-y", *seek_input_args(str(input_video), window)]
+    subtitle_codec = SOFT_SUBTITLE_CODECS.get(container)
+    soft_track = bool(render_options.get("subtitle_track")) and subtitle_codec
+    if soft_track:
+        command.extend(["-i", str(ass_path), "-map", "0:v", "-map", "0:a?"])
+        command.extend(["-map", "1:0", "-c:s", str(subtitle_codec)])
+    command.extend(["-vf", ass_filter, *ENCODER_ARGS, "-c:a", "copy"])
+    command.append(str(output_path))
+
+    input_fingerprint, font_fingerprint = await asyncio.gather(
+        asyncio.to_thread(content_fingerprint, input_video),
+        asyncio.to_thread(content_fingerprint, Path(font_path)),
+    )
+    cache_key = render_cache_key(
+        input_fingerprint,
+        beats,
+        font_fingerprint,
+        {
+            "renderer": "ass",
+            "soft_track": bool(soft_track),
+            "container": container,
+            "window": window,
+            "frame_size": frame_size,
+            **load_caption_style(),
+        },
+        ENCODER_ARGS,
+    )
+    return {
+        "step": "burn_ass_subtitles",
+        "command": command,
+        "outputs": [str(output_path)],
+        "cache_key": cache_key,
+        "subtitles": str(ass_path),
+    }
+
+
+def _write_sidecars(
+    output_dir: Path,
+    stem: str,
+    beats: Sequence[Dict[str, Any]],
+    frame_size: FrameSize,
+) -> Dict[str, str]:
+    """Write SRT/WebVTT/ASS captions and the JSON overlay manifest."""
+    width, height = frame_size
+    manifest = build_overlay_manifest(beats, width, height)
+    documents = {
+        "srt": (f"{stem}_captions.srt", build_srt_document(beats, width)),
+        "vtt": (f"{stem}_captions.vtt", build_webvtt_document(beats, width)),
+        "ass": (f"{stem}_captions.ass", build_ass_document(beats, width, height)),
+        "overlay": (
+            f"{stem}_overlay.json",
+            json.dumps(manifest, indent=2, ensure_ascii=False),
+        ),
+    }
+    paths: Dict[str, str] = {}
+    for kind, (name, content) in documents.items():
+        path = output_dir / name
+        atomic_write_text(path, content)
+        paths[kind] = str(path)
+    return paths
+
+
+def _soft_subtitle_step(
+    input_video: Path, output_dir: Path, srt_path: str, window: Window = None
+) -> Dict[str, Any]:
+    """Remux the source with a ``mov_text`` caption track; no video encode.
+
+    A trimmed remux can only start on a keyframe, so ``window`` must already
+    be snapped to one.
+    """
+    output_path = output_dir / f"{input_video.stem}_captioned.mp4"
+    command = [
+        "ffmpeg",
+        "-y",
+        *seek_input_args(str(input_video), window),
+        "-i",
+        srt_path,
+        "-map",
+        "0:v",
+        "-map",
+        "0:a?",
+        "-map",
+        "1:0",
+        "-c",
+        "copy",
+        "-c:s",
+        "mov_text",
+        "-metadata:s:s:0",
+        "language=eng",
+        str(output_path),
+    ]
+    return {
+        "step": "mux_soft_subtitles",
+        "command": command,
+        "outputs": [str(output_path)],
+    }
+
+
+async def _multi_target_step(
+    input_video: Path,
+    output_dir: Path,
+    beats: Sequence[Dict[str, Any]],
+    font_path: str,
+    targets: Sequence[Dict[str, Any]],
+    window: Window = None,
+) -> Dict[str, Any]:
+    """Build one ffmpeg invocation that renders every output target."""
+    filter_complex, out_labels = build_multi_target_filtergraph(
+        beats, font_path, targets
+    )
+    command = [
+        "ffmpeg",
+        "-y",
+        *seek_input_args(str(input_video), window),
+        "-filter_complex",
+        filter_complex,
+    ]
+    outputs: Dict[str, str] = {}
+    for target, label in zip(targets, out_labels):
+        output_path = output_dir / f"{input_video.stem}_{target['name']}.mp4"
+        command.extend(
+            [
+                "-map",
+                label,
+                "-map",
+                "0:a?",
+                *target_encoder_args(target),
+                "-c:a",
+                "copy",
+                str(output_path),
+            ]
+        )
+        outputs[target["name"]] = str(output_path)
+
+    input_fingerprint, font_fingerprint = await asyncio.gather(
+        asyncio.to_thread(content_fingerprint, input_video),
+        asyncio.to_thread(content_fingerprint, Path(font_path)),
+    )
+    cache_keys = [
+        render_cache_key(
+            input_fingerprint,
+            beats,
+            font_fingerprint,
+            {**caption_style(), "target": target, "window": window},
+            target_encoder_args(target),
+        )
+        for target in targets
+    ]
+    return {
+        "step": "overlay_caption_multi",
+        "command": command,
+        "outputs": list(outputs.values()),
+        "targets": outputs,
+        "cache_keys": cache_keys,
+    }
+
+
+async def _segment_parallel_steps(
+    input_video: Path,
+    output_dir: Path,
+    beats: Sequence[Dict[str, Any]],
+    font_path: str,
+    duration_sec: Optional[float],
+    chunk_count: Optional[int],
+) -> List[Dict[str, Any]]:
+    """Build keyframe-aligned chunk renders plus the final concat step."""
+    index = await get_media_index(input_video)
+    duration_sec = duration_sec or index.duration_sec
+    keyframes = index.keyframes
+    if not duration_sec or not keyframes:
+        return [await _caption_step(input_video, output_dir, beats, font_path)]
+
+    return await asyncio.to_thread(
+        build_segment_parallel_plan,
+        input_video,
+        output_dir / f"{input_video.stem}_captioned.mp4",
+        beats,
+        font_path,
+        duration_sec,
+        keyframes,
+        chunk_count,
+    )
+
+
+async def _resolve_trim(
+    state: Dict[str, Any],
+    render_options: Dict[str, Any],
+    beats: Sequence[Dict[str, Any]],
+    input_video: Path,
+    mode: str,
+) -> Window:
+    """Work out the render window for ``render_options['trim']``, if set.
+
+    Stream-copy modes snap the window start back to a keyframe; encoding
+    modes keep the exact start since input seeking is frame-accurate there.
+    """
+    trim = render_options.get("trim")
+    if not trim:
+        return None
+    if mode not in TRIMMABLE_MODES:
+        raise ValueError(f"trim is not supported in {mode!r} mode")
+
+    lead_in = render_options.get("lead_in_sec")
+    lead_out = render_options.get("lead_out_sec")
+    start, end = trim_window(
+        trim,
+        state.get("selected_segment"),
+        beats,
+        DEFAULT_LEAD_IN_SEC if lead_in is None else float(lead_in),
+        DEFAULT_LEAD_OUT_SEC if lead_out is None else float(lead_out),
+        (state.get("input") or {}).get("duration_sec"),
+    )
+    if mode == "soft":
+        index = await get_media_index(input_video)
+        if index.keyframes:
+            start = index.keyframe_at_or_before(start)
+    return start, end
+
+
+def _output_dir(input_data: Dict[str, Any], config: Optional[RunnableConfig]) -> Path:
+    """Return the per-thread render directory, or ``renders/`` beside the input."""
+    thread_id = config_thread_id(config)
+    if thread_id:
+        return get_artifact_store().path("renders", str(thread_id))
+    # Renders sit next to the uploaded file even when reading a mezzanine.
+    source = input_data.get("source_path") or input_data["media_path"]
+    return Path(source).parent / "renders"
+
+
+async def dag_composer(
+    state: Dict[str, Any], config: Optional[RunnableConfig] = None
+) -> Dict[str, Any]:
+    """Compile the caption timing plan into FFmpeg commands."""
+    log_event("dag_composer:start")
+
+    timing_plan = state.get("timing_plan") or {}
+    beats = timing_plan.get("beats") or []
+    if not beats:
+        raise ValueError("timing_plan['beats'] is required for DAG composition")
+
+    input_data = state.get("input") or {}
+    media_path = input_data.get("media_path")
+    if not media_path:
+        raise ValueError("input['media_path'] is required for DAG composition")
+
+    render_options = state.get("render_options") or {}
+    targets = resolve_output_targets(render_options.get("targets") or [])
+    mode = render_options.get("mode") or "burn_in"
+    if mode not in RENDER_MODES:
+        raise ValueError(
+            f"Unknown render mode {mode!r}; expected one of {RENDER_MODES}"
+        )
+
+    font_path = pick_font_path()
+    # Caption builders read the cached style on the loop; load it off it once
+    await asyncio.to_thread(load_caption_style)
+
+    input_video = Path(media_path)
+    output_dir = _output_dir(input_data, config)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    window = await _resolve_trim(
+        state, render_options, beats, input_video, "targets" if targets else mode
+    )
+    if window is not None:
+        beats = offset_beats(beats, *window)
+        log_event(f"dag_composer:trim {window[0]:.3f}-{window[1]:.3f}s")
+
+    if targets:
+        step = await _multi_target_step(
+            input_video, output_dir, beats, font_path, targets, window
+        )
+        plan = [step]
+        output_paths = {"default": step["outputs"][0], **step["targets"]}
+    elif mode == "parallel":
+        plan = await _segment_parallel_steps(
+            input_video,
+            output_dir,
+            beats,
+            font_path,
+            input_data.get("duration_sec"),
+            render_options.get("segments"),
+        )
+        output_paths = {"default": plan[-1]["outputs"][0]}
+    elif mode in ("soft", "sidecar"):
+        sidecars = await asyncio.to_thread(
+            _write_sidecars,
+            output_dir,
+            input_video.stem,
+            beats,
+            await _frame_size(input_video),
+        )
+        if mode == "soft":
+            plan = [
+                _soft_subtitle_step(input_video, output_dir, sidecars["srt"], window)
+            ]
+            output_paths = {"default": plan[0]["outputs"][0], **sidecars}
+        else:
+            plan = []
+            output_paths = {"default": str(input_video), **sidecars}
+    elif mode == "ass":
+        step = await _ass_step(
+            input_video,
+            output_dir,
+            beats,
+            font_path,
+            render_options,
+            await _frame_size(input_video),
+            window,
+        )
+        plan = [step]
+        output_paths = {"default": step["outputs"][0], "subtitles": step["subtitles"]}
+    else:
+        frame_size = await _frame_size(input_video)
+        plan = [
+            await _caption_step(
+                input_video, output_dir, beats, font_path, window, frame_size
+            )
+        ]
+        output_paths = {"default": plan[0]["outputs"][0]}
+
     return {
-        "logs": logs,
+        "log_cursor": log_event("dag_composer:done"),
         "dag_composer_done": True,
-        "dag_plan": [{"step": "overlay_caption", "command": command}],
-        "output_target": str(output_path),
+        "dag_plan": plan,
+        "output_target": output_paths["default"],
+        "output_paths": output_paths,
+        "render_window": (
+            {"start": window[0], "end": window[1]} if window is not None else None
+        ),
     }
@@ -19,12 +19,16 @@ def human_caption_review(state: Dict[str, Any]) -> Dict[str, Any]:
 
     update = interrupt(payload)
 
+    render_options = None
     if isinstance(update, dict):
         caption = update.get("user_selected_caption") or update.get("caption")
+        render_options = update.get("render_options")
     else:
         caption = str(update).strip()
 
     if not caption:
         raise ValueError("Human review did not supply a caption.")
 
+    if render_options:
+        return {"user_selected_caption": caption, "render_options": render_options}
     return {"user_selected_caption": caption}
@@ -6,16 +6,17 @@ from typing import Any, Dict, List, cast
 
 import google.generativeai as genai
 
+from ..execution_log import log_event
 from ..humor_config import load_humor_levers
-from ..llm_provider import configure_genai
+from ..llm_provider import configure_genai, gemini_request_options, gemini_usage
 from ..prompts.humor_framer_prompt import HUMOR_FRAMER_PROMPT
 from ..state import SelectedSegmentDict
+from ..tracing import span
 
 
 async def humor_framer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Choose the best humor lever and produce framing guidance."""
-    logs = state.get("logs", [])
-    logs.append("humor_framer:start")
+    log_event("humor_framer:start")
 
     video_insights = state.get("video_insights") or {}
     raw_description = video_insights.get("raw_description", "")
@@ -40,7 +41,11 @@ async def humor_framer(state: Dict[str, Any]) -> Dict[str, Any]:
             tag_line=tag_line,
             lever_json=lever_json,
         )
-        response = model.generate_content(prompt)
+        with span("gemini.generate_content", model=model.model_name) as current:
+            response = model.generate_content(
+                prompt, request_options=gemini_request_options()
+            )
+            current.set_attributes(gemini_usage(response))
 
         raw = (response.text or "").strip()
         if raw.startswith("```"):
@@ -61,9 +66,8 @@ async def humor_framer(state: Dict[str, Any]) -> Dict[str, Any]:
     result = await asyncio.to_thread(_generate)
     framing_text, lever_name, segment = result
 
-    logs.append("humor_framer:done")
     return {
-        "logs": logs,
+        "log_cursor": log_event("humor_framer:done"),
         "humor_framer_done": True,
         "humor_framing": framing_text,
         "selected_lever": lever_name,
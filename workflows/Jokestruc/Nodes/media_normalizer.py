@@ -0,0 +1,51 @@
+"""Swap awkward inputs for a cached, normalized mezzanine."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict
+
+from ..execution_log import log_event
+from ..mezzanine_cache import get_mezzanine_cache, mezzanine_enabled
+from ..render_scheduler import DEFAULT_PRIORITY
+from ..utils.mezzanine import normalization_reasons
+from ..video_io import probe_duration_seconds, probe_streams
+
+
+async def media_normalizer(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Point ``input['media_path']`` at a CFR 8-bit H.264/AAC file when needed."""
+    log_event("media_normalizer:start")
+
+    input_data = dict(state.get("input") or {})
+    render_options = state.get("render_options") or {}
+    if not mezzanine_enabled() or render_options.get("normalize") is False:
+        return {
+            "log_cursor": log_event("media_normalizer:skipped"),
+            "media_normalizer_done": True,
+        }
+
+    video_path = Path(input_data["media_path"])
+    streams = await asyncio.to_thread(probe_streams, video_path)
+    reasons = normalization_reasons(streams or [])
+    if not reasons:
+        return {
+            "log_cursor": log_event("media_normalizer:passthrough"),
+            "media_normalizer_done": True,
+        }
+
+    mezzanine = await get_mezzanine_cache().get(
+        video_path, streams or [], render_options.get("priority") or DEFAULT_PRIORITY
+    )
+    input_data.update(
+        {
+            "media_path": str(mezzanine),
+            "source_path": str(video_path),
+            "normalized": reasons,
+            "duration_sec": await asyncio.to_thread(probe_duration_seconds, mezzanine)
+            or input_data.get("duration_sec"),
+        }
+    )
+    return {
+        "log_cursor": log_event(f"media_normalizer:done ({', '.join(reasons)})"),
+        "input": input_data,
+        "media_normalizer_done": True,
+    }
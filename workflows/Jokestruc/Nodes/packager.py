@@ -0,0 +1,72 @@
+"""Package the rendered video for streaming playback."""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from ..execution_log import log_event
+from ..node_wrapper import config_thread_id
+from ..packaging_jobs import describe_packaging, get_packaging_jobs, package_renders
+from ..utils.packaging import resolve_packaging_options
+
+BACKGROUND_PRIORITY = "batch"
+
+
+def _videos_to_package(state: Dict[str, Any]) -> Dict[str, Path]:
+    """Return every render to package, keyed by output target name."""
+    render_options = state.get("render_options") or {}
+    output_paths = state.get("output_paths") or {}
+    if render_options.get("targets"):
+        return {
+            name: Path(path)
+            for name, path in output_paths.items()
+            if name != "default"
+        }
+    # Sidecar mode leaves the upload untouched, so there is nothing to package.
+    if render_options.get("mode") == "sidecar" or not state.get("output_path"):
+        return {}
+    return {"default": Path(state["output_path"])}
+
+
+async def packager(
+    state: Dict[str, Any], config: Optional[RunnableConfig] = None
+) -> Dict[str, Any]:
+    """Remux, segment, and thumbnail the renders when packaging is requested."""
+    log_event("packager:start")
+
+    render_options = state.get("render_options") or {}
+    packaging = render_options.get("packaging")
+    videos = _videos_to_package(state) if packaging not in (None, False) else {}
+    if not videos:
+        return {
+            "log_cursor": log_event("packager:skipped"),
+            "packager_done": True,
+            "packaging": None,
+        }
+
+    options = resolve_packaging_options(packaging)
+    priority = render_options.get("priority") or BACKGROUND_PRIORITY
+    if options["background"]:
+        thread_id = config_thread_id(config)
+        job = get_packaging_jobs().submit(
+            thread_id or str(next(iter(videos.values()))),
+            videos,
+            options,
+            priority,
+        )
+        return {
+            "log_cursor": log_event("packager:queued"),
+            "packager_done": True,
+            "packaging": job,
+        }
+
+    started = time.monotonic()
+    job = {"status": "done", **describe_packaging(videos)}
+    await package_renders(job, videos, options, priority)
+    return {
+        "log_cursor": log_event(f"packager:done in {time.monotonic() - started:.2f}s"),
+        "packager_done": True,
+        "packaging": job,
+    }
@@ -1,31 +1,177 @@
 """Execute FFmpeg commands generated by the DAG composer."""
 
 import asyncio
-import subprocess
-from typing import Any, Dict, List
+import itertools
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langgraph.config import get_stream_writer
+
+from ..artifact_store import get_artifact_store, temp_sibling
+from ..execution_log import log_event
+from ..metrics import observe_render, record_cache
+from ..render_cache import get_render_cache, render_cache_enabled
+from ..render_scheduler import (
+    DEFAULT_PRIORITY,
+    apply_thread_budget,
+    get_render_scheduler,
+)
+from ..tracing import span
+from ..utils.ffmpeg_runner import (
+    FFmpegProgress,
+    ProgressCallback,
+    default_step_timeout,
+    run_ffmpeg,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _stream_writer() -> Callable[[Any], None]:
+    """Return the graph's custom stream writer, or a no-op outside a graph run."""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda _: None
+
+
+def _progress_reporter(
+    step_name: str, write_event: Callable[[Any], None]
+) -> ProgressCallback:
+    """Log ffmpeg progress and forward it to the graph's custom stream."""
+
+    def _report(event: FFmpegProgress) -> None:
+        logger.debug(
+            "%s: frame=%d time=%.2fs speed=%s",
+            step_name,
+            event["frame"],
+            event["out_time_sec"],
+            event["speed"],
+        )
+        write_event({"render_progress": {"step": step_name, **event}})
+
+    return _report
+
+
+def _with_temp_outputs(
+    command: Sequence[str], outputs: Sequence[str]
+) -> Tuple[List[str], Dict[str, str]]:
+    """Point each output at a hidden temp sibling so readers never see partials."""
+    renames = {str(temp_sibling(Path(output))): output for output in outputs}
+    temp_for = {output: temp for temp, output in renames.items()}
+    return [temp_for.get(arg, arg) for arg in command], renames
+
+
+async def _execute_step(
+    step: Dict[str, Any], write_event: Callable[[Any], None], priority: str
+) -> bool:
+    """Run one DAG step, going through the render cache when it is cacheable.
+
+    Returns ``True`` when ffmpeg ran, ``False`` when the cache served it.
+    """
+    step_name = step.get("step", "ffmpeg")
+    on_progress = _progress_reporter(step_name, write_event)
+    outputs = step.get("outputs") or []
+
+    async def _run() -> None:
+        command, renames = _with_temp_outputs(step["command"], outputs)
+        try:
+            async with get_render_scheduler().slot(priority) as budget:
+                await run_ffmpeg(
+                    apply_thread_budget(command, list(renames), budget),
+                    timeout=step.get("timeout_sec") or default_step_timeout(),
+                    on_progress=on_progress,
+                )
+            for temp, output in renames.items():
+                os.replace(temp, output)
+        finally:
+            for temp in renames:
+                Path(temp).unlink(missing_ok=True)
+
+    cache_keys = step.get("cache_keys") or (
+        [step["cache_key"]] if step.get("cache_key") else []
+    )
+    hit = False
+    with span("render.step", step=step_name, outputs=len(outputs)) as current:
+        if cache_keys and len(cache_keys) == len(outputs) and render_cache_enabled():
+            hit = await get_render_cache().get_or_render_many(
+                cache_keys, [Path(output) for output in outputs], _run
+            )
+            current.set_attribute("cache_hit", hit)
+            record_cache("render", hit)
+            logger.info("%s: render cache %s", step_name, "hit" if hit else "miss")
+        else:
+            await _run()
+
+    for path in step.get("cleanup") or []:
+        await asyncio.to_thread(shutil.rmtree, path, ignore_errors=True)
+    return not hit
+
+
+async def _execute_parallel(
+    steps: List[Dict[str, Any]], write_event: Callable[[Any], None], priority: str
+) -> List[bool]:
+    """Run independent steps concurrently, cancelling the rest if one fails."""
+    tasks = [
+        asyncio.create_task(_execute_step(step, write_event, priority))
+        for step in steps
+    ]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _media_seconds(state: Dict[str, Any]) -> Optional[float]:
+    """Length of the rendered media: the trim window, else the whole clip."""
+    window = state.get("render_window")
+    if window:
+        return window["end"] - window["start"]
+    return (state.get("input") or {}).get("duration_sec")
 
 
 async def renderer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Run rendering steps and return the final output path."""
-    logs = state.get("logs", [])
-    logs.append("renderer:start")
+    log_event("renderer:start")
 
-    dag_plan: List[Dict[str, Any]] = state.get("dag_plan") or []
-    if not dag_plan:
+    dag_plan: Optional[List[Dict[str, Any]]] = state.get("dag_plan")
+    if dag_plan is None:
         raise ValueError("dag_plan is required for rendering")
 
-    for step in dag_plan:
-        command = step["command"]
-        await asyncio.to_thread(
-            subprocess.run,
-            command,
-            check=True,
-        )
+    write_event = _stream_writer()
+    render_options = state.get("render_options") or {}
+    priority = render_options.get("priority") or DEFAULT_PRIORITY
+    started = time.perf_counter()
+    rendered: List[bool] = []
+    for group, grouped in itertools.groupby(
+        dag_plan, key=lambda step: step.get("parallel_group")
+    ):
+        steps = list(grouped)
+        if group:
+            rendered += await _execute_parallel(steps, write_event, priority)
+        else:
+            for step in steps:
+                rendered.append(await _execute_step(step, write_event, priority))
 
+    # Cache hits would report absurd speeds, so only count runs that encoded
+    if any(rendered):
+        mode = (
+            "targets" if render_options.get("targets") else render_options.get("mode")
+        )
+        observe_render(
+            mode or "burn_in", _media_seconds(state), time.perf_counter() - started
+        )
     output_path = state.get("output_target") or ""
-    logs.append("renderer:done")
+    await asyncio.to_thread(get_artifact_store().maybe_collect)
     return {
-        "logs": logs,
+        "log_cursor": log_event("renderer:done"),
         "renderer_done": True,
         "output_path": output_path,
     }
@@ -5,7 +5,9 @@ from typing import Any, Dict, List
 
 import google.generativeai as genai
 
-from ..llm_provider import configure_genai
+from ..execution_log import log_event
+from ..llm_provider import configure_genai, gemini_request_options, gemini_usage
+from ..tracing import span
 
 
 def timeline_to_text(timeline: List[Dict[str, Any]]) -> str:
@@ -18,8 +20,7 @@ def timeline_to_text(timeline: List[Dict[str, Any]]) -> str:
 
 async def scene_mapper(state: Dict[str, Any]) -> Dict[str, Any]:
     """Align candidate captions with their most relevant scene segments."""
-    logs = state.get("logs", [])
-    logs.append("scene_mapper:start")
+    log_event("scene_mapper:start")
 
     video_insights = state.get("video_insights") or {}
     timeline = video_insights.get("timeline") or []
@@ -53,14 +54,17 @@ async def scene_mapper(state: Dict[str, Any]) -> Dict[str, Any]:
             "Return a numbered list where each line is:\n"
             "Caption -> start-end (seconds) – brief justification."
         )
-        response = model.generate_content(prompt)
+        with span("gemini.generate_content", model=model.model_name) as current:
+            response = model.generate_content(
+                prompt, request_options=gemini_request_options()
+            )
+            current.set_attributes(gemini_usage(response))
         return response.text
 
     scene_map_text = await asyncio.to_thread(_generate)
 
-    logs.append("scene_mapper:done")
     return {
-        "logs": logs,
+        "log_cursor": log_event("scene_mapper:done"),
         "scene_mapper_done": True,
         "scene_map": scene_map_text,
     }
@@ -4,6 +4,7 @@ import json
 import logging
 from typing import Any, Dict
 
+from ..execution_log import log_event
 from ..llm_provider import run_openai_completion
 from ..prompts.timing_composer_prompt import TIMING_COMPOSER_PROMPT
 from .timing_schema import TimingBeat, TimingPlan
@@ -25,9 +26,7 @@ def _strip_code_fences(text: str) -> str:
 async def timing_composer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Calculate the overlay window for the selected caption."""
     """Composes caption timing beats from the selected scene segment."""
-    logger.info("timing_composer input state: %s", json.dumps(state, indent=2))
-    logs = state.get("logs", [])
-    logs.append("timing_composer:start")
+    log_event("timing_composer:start")
 
     selected_caption = state.get("user_selected_caption", "")
     selected_segment = state.get("selected_segment", "")
@@ -57,9 +56,8 @@ async def timing_composer(state: Dict[str, Any]) -> Dict[str, Any]:
     )
     plan = TimingPlan(beats=[beat])
 
-    logs.append("timing_composer:done")
     return {
-        "logs": logs,
+        "log_cursor": log_event("timing_composer:done"),
         "timing_composer_done": True,
         "timing_plan": plan.dict(),
     }
@@ -7,8 +7,15 @@ from typing import Any, Dict, List
 
 import google.generativeai as genai
 
-from ...llm_provider import MissingAPIKeyError, configure_genai
+from ...execution_log import log_event
+from ...llm_provider import (
+    MissingAPIKeyError,
+    configure_genai,
+    gemini_request_options,
+    gemini_usage,
+)
 from ...prompts.video_insight_prompt import VIDEO_INSIGHT_PROMPT
+from ...tracing import span
 from ...video_io import upload_video_file
 from .video_insight_schema import VideoInsightModel
 
@@ -36,8 +43,7 @@ VIDEO_INSIGHT_SCHEMA = {
 
 async def video_insight(state: Dict[str, Any]) -> Dict[str, Any]:
     """Generate raw description, tags, and timeline segments for a clip."""
-    logs = state.get("logs", [])
-    logs.append("video_insight:start")
+    log_event("video_insight:start")
 
     input_data = state.get("input") or {}
     media_path = input_data.get("media_path")
@@ -73,7 +79,11 @@ async def video_insight(state: Dict[str, Any]) -> Dict[str, Any]:
         )
         file_ref = genai.get_file(file_id)
         prompt = VIDEO_INSIGHT_PROMPT.format(duration_hint=duration_hint)
-        response = model.generate_content([file_ref, prompt])
+        with span("gemini.generate_content", model=model.model_name) as current:
+            response = model.generate_content(
+                [file_ref, prompt], request_options=gemini_request_options()
+            )
+            current.set_attributes(gemini_usage(response))
         return response.text
 
     result_json = await asyncio.to_thread(_generate)
@@ -87,9 +97,8 @@ async def video_insight(state: Dict[str, Any]) -> Dict[str, Any]:
         end = max(start, min(float(seg.end), dur))
         clamped.append({"start": start, "end": end, "description": seg.description})
 
-    logs.append("video_insight:done")
     return {
-        "logs": logs,
+        "log_cursor": log_event("video_insight:done"),
         "video_insight_done": True,
         "video_insights": {
             "raw_description": insight.raw_description,
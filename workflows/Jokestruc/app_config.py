@@ -0,0 +1,28 @@
+"""Environment-specific app config classes, read without validating them.
+
+``config_loader`` validates the selected class when it is imported, and
+the production class requires database and JWT settings this service never
+uses. The workflow only reads a few flags, so it picks the class for
+``ENVIRONMENT`` directly and reads its attributes.
+"""
+
+import os
+from typing import Type
+
+from ..undefined.config import Config
+from ..undefined.config_development import DevelopmentConfig
+from ..undefined.config_production import ProductionConfig
+
+ENVIRONMENT_ENV_VAR = "ENVIRONMENT"
+
+_CONFIG_CLASSES = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "staging": ProductionConfig,
+}
+
+
+def app_config() -> Type[Config]:
+    """Return the config class ``config_loader`` would pick, unvalidated."""
+    env = os.getenv(ENVIRONMENT_ENV_VAR, "development").lower()
+    return _CONFIG_CLASSES.get(env, DevelopmentConfig)
@@ -0,0 +1,260 @@
+"""Managed on-disk layout, atomic writes, quotas and GC for workflow artifacts."""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_ROOT_ENV_VAR = "ARTIFACT_ROOT"
+GC_GRACE_ENV_VAR = "ARTIFACT_GC_GRACE_SEC"
+DEFAULT_ARTIFACT_ROOT = Path(tempfile.gettempdir()) / "memevid"
+DEFAULT_GC_GRACE_SEC = 600.0
+GC_INTERVAL_SEC = 60.0
+
+# Category -> depth below the category directory at which LRU entries live.
+CATEGORIES = {"uploads": 1, "proxies": 1, "renders": 1, "caches": 2}
+DEFAULT_QUOTAS = {
+    "uploads": 10 * 1024**3,
+    "proxies": 10 * 1024**3,
+    "renders": 20 * 1024**3,
+    "caches": 10 * 1024**3,
+}
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+# Returns paths that live workflow threads still need; GC never deletes them.
+ReferenceSource = Callable[[], Iterable[str]]
+
+
+def quota_env_var(category: str) -> str:
+    """Return the environment variable that overrides ``category``'s quota."""
+    return f"ARTIFACT_QUOTA_{category.upper()}_BYTES"
+
+
+def safe_name(name: str) -> str:
+    """Reduce an untrusted file or thread name to a single safe path component."""
+    cleaned = _UNSAFE_CHARS.sub("_", Path(name).name).strip("._")
+    return cleaned or "artifact"
+
+
+def temp_sibling(path: Path) -> Path:
+    """Return a unique hidden temp path beside ``path`` with the same suffix."""
+    return path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp{path.suffix}")
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[Path]:
+    """Yield a temp path to write, then rename it over ``path`` on success."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_sibling(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> Path:
+    """Write ``data`` to ``path`` so readers never see a partial file."""
+    with atomic_output(path) as tmp:
+        tmp.write_bytes(data)
+    return path
+
+
+def atomic_write_text(path: Path, text: str) -> Path:
+    """Write UTF-8 ``text`` to ``path`` atomically."""
+    return atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def _tree_stats(path: Path, seen: Set[Tuple[int, int]]) -> Tuple[float, int]:
+    """Return the newest mtime and total size of a file or directory tree.
+
+    Files whose ``(st_dev, st_ino)`` is already in ``seen`` add no bytes, so
+    hard links (such as render cache entries) are only counted once.
+    """
+
+    def _size(stat: os.stat_result) -> int:
+        inode = (stat.st_dev, stat.st_ino)
+        if inode in seen:
+            return 0
+        seen.add(inode)
+        return stat.st_size
+
+    stat = path.stat()
+    if not path.is_dir():
+        return stat.st_mtime, _size(stat)
+    newest, total = stat.st_mtime, 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                file_stat = os.stat(os.path.join(dirpath, filename))
+            except FileNotFoundError:
+                continue
+            newest = max(newest, file_stat.st_mtime)
+            total += _size(file_stat)
+    return newest, total
+
+
+def _holds_any(path: Path, referenced: Set[Path]) -> bool:
+    """Return whether ``path`` is, or is a directory containing, a referenced path."""
+    resolved = path.resolve()
+    return any(ref == resolved or resolved in ref.parents for ref in referenced)
+
+
+class ArtifactStore:
+    """Lays out artifacts by category and keeps each category under its quota."""
+
+    def __init__(
+        self,
+        root: Path,
+        quotas: Dict[str, int],
+        grace_sec: float = DEFAULT_GC_GRACE_SEC,
+    ) -> None:
+        self.root = root
+        self.quotas = quotas
+        self.grace_sec = grace_sec
+        self._gc_lock = threading.Lock()
+        self._last_gc = 0.0
+        self._reference_sources: List[ReferenceSource] = []
+
+    def add_reference_source(self, source: ReferenceSource) -> None:
+        """Register a callable listing paths that :meth:`collect` must keep."""
+        self._reference_sources.append(source)
+
+    def _referenced(self) -> Optional[Set[Path]]:
+        """Resolve every referenced path, or ``None`` if a source failed."""
+        referenced: Set[Path] = set()
+        for source in self._reference_sources:
+            try:
+                referenced.update(Path(path).resolve() for path in source())
+            except Exception:
+                logger.exception("Artifact reference source failed; skipping GC")
+                return None
+        return referenced
+
+    def path(self, category: str, *parts: str) -> Path:
+        """Return ``<root>/<category>/<parts...>`` with each part sanitized."""
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown artifact category {category!r}")
+        return self.root.joinpath(category, *(safe_name(part) for part in parts))
+
+    def save_upload(self, name: str, data: bytes) -> Path:
+        """Store uploaded bytes content-addressed, keeping the original file name."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path("uploads", digest, name)
+        if not path.exists():
+            atomic_write_bytes(path, data)
+        return path
+
+    def _entries(
+        self, category: str, seen: Optional[Set[Tuple[int, int]]] = None
+    ) -> List[Tuple[float, int, Path]]:
+        seen = set() if seen is None else seen
+        base = self.root / category
+        entries: List[Tuple[float, int, Path]] = []
+        level = [base] if base.is_dir() else []
+        for _ in range(CATEGORIES[category]):
+            level = [
+                child
+                for parent in level
+                if parent.is_dir()
+                for child in parent.iterdir()
+            ]
+        for path in level:
+            try:
+                mtime, size = _tree_stats(path, seen)
+            except FileNotFoundError:
+                continue
+            entries.append((mtime, size, path))
+        return entries
+
+    def usage(self) -> Dict[str, Any]:
+        """Report bytes, entry counts and quotas per category.
+
+        A hard-linked file is counted once, under the first category that
+        holds it, so ``bytes`` adds up to the real disk usage.
+        """
+        report: Dict[str, Any] = {"root": str(self.root), "categories": {}}
+        seen: Set[Tuple[int, int]] = set()
+        for category in CATEGORIES:
+            entries = self._entries(category, seen)
+            report["categories"][category] = {
+                "bytes": sum(size for _, size, _ in entries),
+                "entries": len(entries),
+                "quota_bytes": self.quotas[category],
+            }
+        report["bytes"] = sum(
+            usage["bytes"] for usage in report["categories"].values()
+        )
+        return report
+
+    def collect(self) -> Dict[str, int]:
+        """Delete least-recently-modified entries until each category fits.
+
+        Entries touched within ``grace_sec`` are never removed, so in-flight
+        renders and uploads survive a collection. Neither are entries holding
+        a path from a reference source, such as the upload or proxy of a
+        thread paused for human review. Hard links are sized once across
+        categories, as in :meth:`usage`, so a render cache entry linked into
+        ``renders/`` does not push both categories over quota.
+        """
+        freed: Dict[str, int] = {category: 0 for category in CATEGORIES}
+        with self._gc_lock:
+            referenced = self._referenced()
+            if referenced is None:
+                self._last_gc = time.monotonic()
+                return freed
+            cutoff = time.time() - self.grace_sec
+            seen: Set[Tuple[int, int]] = set()
+            for category in CATEGORIES:
+                entries = sorted(self._entries(category, seen))
+                total = sum(size for _, size, _ in entries)
+                for mtime, size, path in entries:
+                    if total <= self.quotas[category] or mtime > cutoff:
+                        break
+                    if _holds_any(path, referenced):
+                        continue
+                    if path.is_dir():
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        path.unlink(missing_ok=True)
+                    total -= size
+                    freed[category] += size
+                    logger.info("Collected %s artifact %s", category, path.name)
+            self._last_gc = time.monotonic()
+        return freed
+
+    def maybe_collect(self) -> Optional[Dict[str, int]]:
+        """Run :meth:`collect` unless one ran within ``GC_INTERVAL_SEC``."""
+        if time.monotonic() - self._last_gc < GC_INTERVAL_SEC:
+            return None
+        return self.collect()
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the shared artifact store, creating it if needed."""
+    global _store
+    if _store is None:
+        quotas = {
+            category: int(os.getenv(quota_env_var(category)) or default)
+            for category, default in DEFAULT_QUOTAS.items()
+        }
+        _store = ArtifactStore(
+            Path(os.getenv(ARTIFACT_ROOT_ENV_VAR) or DEFAULT_ARTIFACT_ROOT),
+            quotas,
+            float(os.getenv(GC_GRACE_ENV_VAR) or DEFAULT_GC_GRACE_SEC),
+        )
+    return _store
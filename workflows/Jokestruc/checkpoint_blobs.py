@@ -0,0 +1,226 @@
+"""Content-addressed offloading of large checkpoint values.
+
+The checkpointer serializes every changed channel into the new checkpoint
+and every node output into its pending writes, so the same
+``video_insights``, ``captions`` or ``dag_plan`` bytes end up stored several
+times per thread (and again in every thread that produced identical data).
+:class:`OffloadingSerializer` wraps LangGraph's ``JsonPlusSerializer``: any
+serialized value of at least ``CHECKPOINT_OFFLOAD_MIN_BYTES`` is stored once,
+zlib-compressed, under its SHA-256, and the checkpoint keeps a short
+reference instead. References are resolved eagerly when a checkpoint is
+read: LangGraph copies the deserialized values straight into its channels
+and hands them to nodes and ``get_state`` callers as plain dicts and lists,
+so a lazy proxy would leak into node code and JSON responses. A small LRU of
+decompressed blobs keeps replaying a thread's history from inflating the
+same blob repeatedly.
+
+Blobs live as long as some checkpoint references them:
+:class:`BlobCollectingSaver` sweeps the ones no remaining checkpoint,
+pending write or channel value points to whenever a thread is deleted. The
+async delete runs that sweep in a worker thread, since it walks every saved
+checkpoint.
+"""
+
+import asyncio
+import collections
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+OFFLOAD_ENV_VAR = "CHECKPOINT_OFFLOAD"
+MIN_BYTES_ENV_VAR = "CHECKPOINT_OFFLOAD_MIN_BYTES"
+DEFAULT_MIN_BYTES = 1024
+REHYDRATE_CACHE_SIZE = 256
+BLOB_REF_TYPE = "blobref"
+# Blobs stored this recently survive a sweep; their checkpoint may not be saved yet.
+SWEEP_GRACE_SEC = 60.0
+
+
+class MissingBlobError(RuntimeError):
+    """A checkpoint references a blob the store no longer holds."""
+
+
+class BlobStore:
+    """Compressed, deduplicated blobs keyed by content digest."""
+
+    def __init__(self, cache_size: int = REHYDRATE_CACHE_SIZE) -> None:
+        self._lock = threading.Lock()
+        self._blobs: Dict[str, bytes] = {}
+        self._raw_sizes: Dict[str, int] = {}
+        self._stored_at: Dict[str, float] = {}
+        self._cache: "collections.OrderedDict[str, bytes]" = collections.OrderedDict()
+        self._cache_size = cache_size
+        self.raw_bytes = 0
+        self.offloaded = 0
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` unless an identical blob exists; return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.offloaded += 1
+            self._stored_at[digest] = time.monotonic()
+            if digest in self._blobs:
+                return digest
+        compressed = zlib.compress(data, 1)
+        with self._lock:
+            if digest not in self._blobs:
+                self._blobs[digest] = compressed
+                self._raw_sizes[digest] = len(data)
+                self.raw_bytes += len(data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return a blob's bytes, decompressing it unless recently read."""
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+            compressed = self._blobs.get(digest) if data is None else None
+        record_cache("checkpoint_blobs", data is not None)
+        if data is not None:
+            return data
+        if compressed is None:
+            raise MissingBlobError(f"Checkpoint blob {digest} is not in the store")
+        data = zlib.decompress(compressed)
+        with self._lock:
+            self._cache[digest] = data
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return data
+
+    def sweep(self, live: Set[str], grace_sec: float = SWEEP_GRACE_SEC) -> int:
+        """Drop blobs outside ``live`` not stored within ``grace_sec``; return count."""
+        cutoff = time.monotonic() - grace_sec
+        with self._lock:
+            dead = [
+                digest
+                for digest in self._blobs
+                if digest not in live and self._stored_at.get(digest, 0.0) < cutoff
+            ]
+            for digest in dead:
+                del self._blobs[digest]
+                self.raw_bytes -= self._raw_sizes.pop(digest)
+                self._stored_at.pop(digest, None)
+                self._cache.pop(digest, None)
+        if dead:
+            logger.info("Swept %d unreferenced checkpoint blobs", len(dead))
+        return len(dead)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report unique blobs, their raw and stored sizes, and offload count."""
+        with self._lock:
+            return {
+                "blobs": len(self._blobs),
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": sum(len(blob) for blob in self._blobs.values()),
+                "offloaded_values": self.offloaded,
+            }
+
+
+class OffloadingSerializer(SerializerProtocol):
+    """Serializer that swaps large values for references into a :class:`BlobStore`."""
+
+    def __init__(
+        self,
+        store: BlobStore,
+        min_bytes: int = DEFAULT_MIN_BYTES,
+        inner: Optional[SerializerProtocol] = None,
+    ) -> None:
+        self.store = store
+        self.min_bytes = min_bytes
+        self.inner = inner or JsonPlusSerializer()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        """Serialize ``obj``, offloading it to the store when large enough."""
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < self.min_bytes:
+            return type_, data
+        digest = self.store.put(data)
+        return BLOB_REF_TYPE, f"{type_}:{digest}".encode()
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        """Deserialize a value, resolving blob references through the store."""
+        type_, payload = data
+        if type_ != BLOB_REF_TYPE:
+            return self.inner.loads_typed(data)
+        inner_type, _, digest = payload.decode().rpartition(":")
+        return self.inner.loads_typed((inner_type, self.store.get(digest)))
+
+
+def blob_refs(value: Any) -> Iterator[str]:
+    """Yield the digest of every blob reference nested in saved checkpoint data."""
+    if isinstance(value, tuple) and len(value) == 2 and value[0] == BLOB_REF_TYPE:
+        yield bytes(value[1]).decode().rpartition(":")[2]
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from blob_refs(item)
+    elif isinstance(value, dict):
+        for item in list(value.values()):
+            yield from blob_refs(item)
+
+
+class BlobCollectingSaver(MemorySaver):
+    """In-memory checkpointer that frees blobs once no checkpoint references them."""
+
+    def __init__(
+        self,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+        store: Optional[BlobStore] = None,
+        grace_sec: float = SWEEP_GRACE_SEC,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.blob_store = store or get_blob_store()
+        self.grace_sec = grace_sec
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints, then the blobs only it referenced."""
+        super().delete_thread(thread_id)
+        self.collect_blobs()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints, then sweep its blobs off the loop.
+
+        Checkpoints saved while the sweep runs are protected by the grace
+        period: their blobs were stored (or re-stored) too recently to drop.
+        """
+        super().delete_thread(thread_id)
+        await asyncio.to_thread(self.collect_blobs)
+
+    def collect_blobs(self) -> int:
+        """Sweep blobs not referenced by any saved checkpoint; return the count."""
+        live = set(blob_refs(self.storage))
+        live.update(blob_refs(self.writes))
+        live.update(blob_refs(self.blobs))
+        return self.blob_store.sweep(live, self.grace_sec)
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the shared checkpoint blob store, creating it if needed."""
+    global _store
+    if _store is None:
+        _store = BlobStore()
+    return _store
+
+
+def checkpoint_serde() -> Optional[SerializerProtocol]:
+    """Return the offloading serializer, or ``None`` (LangGraph's default) if disabled."""
+    if os.getenv(OFFLOAD_ENV_VAR, "true").lower() != "true":
+        return None
+    min_bytes = int(os.getenv(MIN_BYTES_ENV_VAR) or DEFAULT_MIN_BYTES)
+    return OffloadingSerializer(get_blob_store(), min_bytes)
@@ -0,0 +1,173 @@
+"""Append-only store of node execution events, kept outside the graph state.
+
+Nodes call :func:`log_event` instead of growing a ``logs`` list in
+``JokeState``, so checkpoints no longer carry the run's history. Events
+are kept in memory per thread (the least recently written threads are
+dropped past ``EXECUTION_LOG_MAX_THREADS``), or, with
+``EXECUTION_LOG_DB=/path/events.sqlite``, written to SQLite by a
+background thread so they survive restarts. Each event has an
+increasing ``seq``, which doubles as the paging cursor. In memory it is a
+per-process counter; in SQLite the database assigns it (``AUTOINCREMENT``)
+when the row is written, so several workers sharing one file never collide
+and a page cursor never skips a row committed after it.
+"""
+
+import collections
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langgraph.config import get_config
+
+logger = logging.getLogger(__name__)
+
+DB_ENV_VAR = "EXECUTION_LOG_DB"
+MAX_THREADS_ENV_VAR = "EXECUTION_LOG_MAX_THREADS"
+DEFAULT_MAX_THREADS = 1000
+MAX_PAGE_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid INTEGER NOT NULL,
+    local_seq INTEGER NOT NULL,
+    thread_id TEXT NOT NULL,
+    at REAL NOT NULL,
+    node TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS execution_events_thread
+    ON execution_events (thread_id, seq);
+"""
+
+Event = Dict[str, Any]
+
+
+class ExecutionLog:
+    """Per-thread event lists in memory, or in SQLite when ``db_path`` is set."""
+
+    def __init__(self, db_path: Optional[Path], max_threads: int) -> None:
+        self.db_path = db_path
+        self.max_threads = max(max_threads, 1)
+        self._lock = threading.Lock()
+        self._threads: "collections.OrderedDict[str, List[Event]]" = (
+            collections.OrderedDict()
+        )
+        self._seq = 0
+        self._pending: "queue.Queue[Tuple[Any, ...]]" = queue.Queue()
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.executescript(_SCHEMA)
+            threading.Thread(
+                target=self._write_loop, name="execution-log-writer", daemon=True
+            ).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            rows = [self._pending.get()]
+            while not self._pending.empty():
+                rows.append(self._pending.get_nowait())
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO execution_events"
+                        " (pid, local_seq, thread_id, at, node, message)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error:
+                logger.exception("Dropped %d execution log events", len(rows))
+            for _ in rows:
+                self._pending.task_done()
+
+    def append(self, thread_id: str, node: Optional[str], message: str) -> int:
+        """Record one event and return its ``seq``.
+
+        With SQLite the row's ``seq`` is only known once the writer commits
+        it, so this returns the process-local counter stored as ``local_seq``.
+        """
+        at = time.time()
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            if self.db_path is None:
+                events = self._threads.pop(thread_id, None) or []
+                events.append({"seq": seq, "at": at, "node": node, "message": message})
+                self._threads[thread_id] = events
+                while len(self._threads) > self.max_threads:
+                    self._threads.popitem(last=False)
+        if self.db_path is not None:
+            self._pending.put((os.getpid(), seq, thread_id, at, node, message))
+        return seq
+
+    def flush(self) -> None:
+        """Block until queued events are in SQLite (tests and shutdown)."""
+        self._pending.join()
+
+    def page(self, thread_id: str, after: int = 0, limit: int = 100) -> List[Event]:
+        """Return up to ``limit`` events of a thread with ``seq > after``.
+
+        SQLite pages hold what the writer has committed; events still queued
+        get a higher ``seq`` and show up on the next page.
+        """
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        if self.db_path is None:
+            with self._lock:
+                events = list(self._threads.get(thread_id) or [])
+            return [event for event in events if event["seq"] > after][:limit]
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, at, node, message FROM execution_events"
+                " WHERE thread_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (thread_id, after, limit),
+            ).fetchall()
+        return [
+            {"seq": seq, "at": at, "node": node, "message": message}
+            for seq, at, node, message in rows
+        ]
+
+
+_log: Optional[ExecutionLog] = None
+
+
+def get_execution_log() -> ExecutionLog:
+    """Return the shared execution log, creating it if needed."""
+    global _log
+    if _log is None:
+        db_path = os.getenv(DB_ENV_VAR)
+        _log = ExecutionLog(
+            Path(db_path) if db_path else None,
+            int(os.getenv(MAX_THREADS_ENV_VAR) or DEFAULT_MAX_THREADS),
+        )
+    return _log
+
+
+def log_event(message: str) -> int:
+    """Record ``message`` for the running graph thread and return its ``seq``.
+
+    Outside a graph run (e.g. a node called directly by a benchmark) there
+    is no thread to file it under; the message is only logged at DEBUG.
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        config = {}
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    if not thread_id:
+        logger.debug("execution event outside a graph thread: %s", message)
+        return 0
+    node = (config.get("metadata") or {}).get("langgraph_node")
+    return get_execution_log().append(str(thread_id), node, message)
@@ -1,40 +1,58 @@
 """LangGraph wiring for the MemeVid Jokestruc workflow."""
+
 import json
+from typing import Any, Iterator
 
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 from langgraph.types import Command, interrupt
 
+from .artifact_store import get_artifact_store
+from .checkpoint_blobs import BlobCollectingSaver, checkpoint_serde
 from .Nodes.caption_generator import caption_generator
 from .Nodes.caption_selector import caption_selector
 from .Nodes.dag_composer import dag_composer
 from .Nodes.human_review import human_caption_review
 from .Nodes.humor_framer import humor_framer
 from .Nodes.input_parser import input_parser
+from .Nodes.media_normalizer import media_normalizer
+from .Nodes.packager import packager
 from .Nodes.renderer import renderer
 from .Nodes.scene_mapper import scene_mapper
 from .Nodes.timing_composer import timing_composer
 from .Nodes.video_insight.video_insight import video_insight
+from .node_wrapper import instrument_node
 from .state import JokeState
 
 _builder = StateGraph(JokeState)
 
+
 # Nodes
-_builder.add_node("input_parser", input_parser)
-_builder.add_node("video_insight", video_insight)
-_builder.add_node("humor_framer", humor_framer)
-_builder.add_node("caption_generator", caption_generator)
-_builder.add_node("scene_mapper", scene_mapper)
-_builder.add_node("timing_composer", timing_composer)
-_builder.add_node("dag_composer", dag_composer)
-_builder.add_node("renderer", renderer)
-_builder.add_node("caption_selector", caption_selector)
-_builder.add_node("human_review", human_caption_review)
+_builder.add_node("input_parser", instrument_node("input_parser", input_parser))
+_builder.add_node(
+    "media_normalizer", instrument_node("media_normalizer", media_normalizer)
+)
+_builder.add_node("video_insight", instrument_node("video_insight", video_insight))
+_builder.add_node("humor_framer", instrument_node("humor_framer", humor_framer))
+_builder.add_node(
+    "caption_generator", instrument_node("caption_generator", caption_generator)
+)
+_builder.add_node("scene_mapper", instrument_node("scene_mapper", scene_mapper))
+_builder.add_node(
+    "timing_composer", instrument_node("timing_composer", timing_composer)
+)
+_builder.add_node("dag_composer", instrument_node("dag_composer", dag_composer))
+_builder.add_node("renderer", instrument_node("renderer", renderer))
+_builder.add_node("packager", instrument_node("packager", packager))
+_builder.add_node(
+    "caption_selector", instrument_node("caption_selector", caption_selector)
+)
+_builder.add_node("human_review", instrument_node("human_review", human_caption_review))
 
 
 # Flow
 _builder.set_entry_point("input_parser")
-_builder.add_edge("input_parser", "video_insight")
+_builder.add_edge("input_parser", "media_normalizer")
+_builder.add_edge("media_normalizer", "video_insight")
 _builder.add_edge("video_insight", "humor_framer")
 _builder.add_edge("humor_framer", "caption_generator")
 _builder.add_edge("caption_generator", "human_review")
@@ -42,12 +60,33 @@ _builder.add_edge("human_review", "timing_composer")
 
 _builder.add_edge("timing_composer", "dag_composer")
 _builder.add_edge("dag_composer", "renderer")
-_builder.add_edge("renderer", END)
+_builder.add_edge("renderer", "packager")
+_builder.add_edge("packager", END)
 
-_memory = MemorySaver()
+_memory = BlobCollectingSaver(serde=checkpoint_serde())
 app = _builder.compile(checkpointer=_memory)
 
 
+def paused_threads() -> Iterator[Any]:
+    """Yield the state snapshot of every checkpointed thread not yet finished."""
+    for thread_id in list(_memory.storage):
+        snapshot = app.get_state({"configurable": {"thread_id": thread_id}})
+        if snapshot.next:
+            yield snapshot
+
+
+def _live_media_paths() -> Iterator[str]:
+    """Yield the upload and proxy paths that paused threads will resume from."""
+    for snapshot in paused_threads():
+        input_data = snapshot.values.get("input") or {}
+        for key in ("media_path", "source_path"):
+            if input_data.get(key):
+                yield input_data[key]
+
+
+get_artifact_store().add_reference_source(_live_media_paths)
+
+
 async def run_graph(initial_state: JokeState, thread_id: str) -> JokeState:
     """Execute the workflow until completion or interrupt."""
     return await app.ainvoke(
@@ -56,6 +95,14 @@ async def run_graph(initial_state: JokeState, thread_id: str) -> JokeState:
     )
 
 
+async def delete_thread(thread_id: str) -> bool:
+    """Drop a thread's checkpoints and its unshared blobs; False if unknown."""
+    if thread_id not in _memory.storage:
+        return False
+    await _memory.adelete_thread(thread_id)
+    return True
+
+
 async def resume_graph(thread_id: str, resume_payload: dict) -> JokeState:
     """Resume a paused workflow thread with human-provided data."""
     return await app.ainvoke(
@@ -1,5 +1,6 @@
 """Load humor lever configuration used across the workflow."""
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, TypedDict
 
@@ -8,8 +9,12 @@ import yaml  # or json
 CONFIG_PATH = Path(__file__).parent / "config" / "humor_levers.yaml"
 
 
+@lru_cache(maxsize=1)
 def load_humor_levers() -> List[Dict[str, str]]:
-    """Load humor lever metadata from the configuration file."""
+    """Load humor lever metadata from the configuration file.
+
+    Parsed once per process; callers share the result and must not mutate it.
+    """
     with CONFIG_PATH.open() as f:
         return yaml.safe_load(f)
 
@@ -1,12 +1,23 @@
 """Utility helpers for configuring language model providers."""
 
+import asyncio
 import os
-from typing import Optional
+import random
+from typing import Any, Dict, Optional
 
 import google.generativeai as genai
+from google.api_core import exceptions as core_exceptions
+from google.api_core import retry as core_retry
+
+from .metrics import record_retry
+from .tracing import span
 
 API_KEY_ENV_VARS = ("GEMINI_API_KEY", "GOOGLE_API_KEY")
 DEFAULT_VIDEO_MODEL = "gemini-2.5-pro"  # adjust if needed
+# Same policy the OpenAI SDK applies itself: 2 retries, 0.5s doubling to 8s.
+OPENAI_MAX_RETRIES = 2
+OPENAI_BACKOFF_SEC = 0.5
+OPENAI_MAX_BACKOFF_SEC = 8.0
 
 
 class MissingAPIKeyError(RuntimeError):
@@ -31,6 +42,26 @@ def configure_genai() -> None:
     genai.configure(api_key=_get_api_key())
 
 
+def gemini_request_options() -> Dict[str, Any]:
+    """Return ``request_options`` for ``generate_content`` that count retries.
+
+    The retry policy matches the SDK default for ``generate_content``
+    (retry ``ServiceUnavailable`` with 1s..10s backoff); it only adds the
+    ``memevid_provider_retries_total`` hook.
+    """
+    return {
+        "retry": core_retry.Retry(
+            initial=1.0,
+            maximum=10.0,
+            multiplier=1.3,
+            predicate=core_retry.if_exception_type(core_exceptions.ServiceUnavailable),
+            timeout=600.0,
+            on_error=lambda exc: record_retry("gemini", exc),
+        )
+    }
+
+
+import openai
 from openai import AsyncOpenAI
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # pick your latest model
@@ -44,19 +75,59 @@ def get_openai_client() -> AsyncOpenAI:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise MissingAPIKeyError("Set OPENAI_API_KEY before running humor framing.")
-        _client = AsyncOpenAI(api_key=api_key)
+        # Retries happen in run_openai_completion so each one is counted.
+        _client = AsyncOpenAI(api_key=api_key, max_retries=0)
     return _client
 
 
+_OPENAI_RETRYABLE = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.ConflictError,
+    openai.InternalServerError,
+)
+
+
 async def run_openai_completion(prompt: str) -> str:
     """Execute a chat completion request and return the model's reply text."""
     client = get_openai_client()
-    response = await client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": "You are a helpful meme caption writer."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.7,
-    )
+    with span("openai.chat_completion", model=OPENAI_MODEL) as current:
+        current.set_attribute("prompt_chars", len(prompt))
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            try:
+                response = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a helpful meme caption writer.",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.7,
+                )
+                break
+            except _OPENAI_RETRYABLE as exc:
+                if attempt == OPENAI_MAX_RETRIES:
+                    raise
+                record_retry("openai", exc)
+                current.set_attribute("retries", attempt + 1)
+                backoff = min(OPENAI_BACKOFF_SEC * 2**attempt, OPENAI_MAX_BACKOFF_SEC)
+                await asyncio.sleep(backoff * random.uniform(0.75, 1.0))
+        usage = getattr(response, "usage", None)
+        current.set_attributes(
+            {
+                "prompt_tokens": getattr(usage, "prompt_tokens", None),
+                "completion_tokens": getattr(usage, "completion_tokens", None),
+            }
+        )
     return response.choices[0].message.content
+
+
+def gemini_usage(response: Any) -> Dict[str, Any]:
+    """Return token counts from a Gemini response for span attributes."""
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "completion_tokens": getattr(usage, "candidates_token_count", None),
+    }
@@ -0,0 +1,232 @@
+"""Event-loop stall watchdog and an audit mode for blocking calls on the loop.
+
+The watchdog runs a heartbeat coroutine that records how late each
+``asyncio.sleep`` wakes up (``memevid_event_loop_lag_seconds``). A daemon
+thread watches the heartbeat; when the loop has not come back for
+``LOOP_STALL_THRESHOLD_SEC`` it logs the loop thread's stack once per
+stall, which names whatever synchronous call is holding it.
+
+``LOOP_BLOCKING_AUDIT=warn|strict`` installs an audit hook that flags
+known-blocking APIs called from a thread running an event loop:
+``time.sleep``, ``subprocess.Popen``, ``socket.getaddrinfo``, connects
+on blocking sockets and file ``open`` (config reads, log appends). Imports
+and ``/proc``-style pseudo files are not flagged. ``warn`` logs the call
+site; ``strict`` raises :class:`BlockingCallError` so benchmarks and tests
+fail fast.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .metrics import LOOP_LAG, LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+WATCHDOG_ENV_VAR = "LOOP_WATCHDOG"
+STALL_THRESHOLD_ENV_VAR = "LOOP_STALL_THRESHOLD_SEC"
+BLOCKING_AUDIT_ENV_VAR = "LOOP_BLOCKING_AUDIT"
+DEFAULT_STALL_THRESHOLD_SEC = 0.25
+HEARTBEAT_SEC = 0.05
+STALL_STACK_LIMIT = 40
+RECENT_STALLS = 20
+AUDIT_MODES = ("off", "warn", "strict")
+_ASYNCIO_SUBPROCESS = os.path.join("asyncio", "base_subprocess.py")
+_PSEUDO_FS_PREFIXES = ("/proc/", "/sys/", "/dev/")
+_CODE_SUFFIXES = (".py", ".pyc", ".so")
+
+
+class BlockingCallError(RuntimeError):
+    """A known-blocking call ran on the event-loop thread in strict audit mode."""
+
+
+class LoopWatchdog:
+    """Measures loop lag and captures the loop thread's stack during stalls."""
+
+    def __init__(self, threshold: float, heartbeat: float = HEARTBEAT_SEC) -> None:
+        self.threshold = threshold
+        self.heartbeat = heartbeat
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=RECENT_STALLS)
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def _beat(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.heartbeat)
+            now = time.monotonic()
+            self._last_beat = now
+            LOOP_LAG.observe(max(now - started - self.heartbeat, 0.0))
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.heartbeat):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread or 0)
+            stack = "".join(traceback.format_stack(frame, STALL_STACK_LIMIT))
+            self.stalls.append(
+                {"at": time.time(), "stalled_sec": round(stalled, 3), "stack": stack}
+            )
+            LOOP_STALLS.inc()
+            logger.warning(
+                "Event loop blocked for %.0f ms; loop thread stack:\n%s",
+                stalled * 1000,
+                stack,
+            )
+
+    def start(self) -> None:
+        """Start on the running loop; call from a coroutine."""
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.ensure_future(self._beat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the watchdog thread and cancel the heartbeat task."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def start_loop_watchdog() -> Optional[LoopWatchdog]:
+    """Start the shared watchdog on the running loop unless disabled."""
+    global _watchdog
+    if os.getenv(WATCHDOG_ENV_VAR, "true").lower() != "true":
+        return None
+    if _watchdog is None:
+        threshold = float(
+            os.getenv(STALL_THRESHOLD_ENV_VAR) or DEFAULT_STALL_THRESHOLD_SEC
+        )
+        _watchdog = LoopWatchdog(threshold)
+        _watchdog.start()
+    return _watchdog
+
+
+def _on_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _called_from(predicate: Callable[[str], bool]) -> bool:
+    """Whether any caller frame's filename satisfies ``predicate``."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if predicate(frame.f_code.co_filename):
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _from_asyncio_subprocess() -> bool:
+    """Whether the current ``Popen`` is asyncio spawning a non-blocking child."""
+    return _called_from(lambda filename: filename.endswith(_ASYNCIO_SUBPROCESS))
+
+
+def _blocking_open(path: Any) -> Optional[str]:
+    """Describe an ``open`` of a regular file that is not part of an import."""
+    if isinstance(path, int):
+        return None
+    path = os.fsdecode(path)
+    if path.startswith(_PSEUDO_FS_PREFIXES) or path.endswith(_CODE_SUFFIXES):
+        return None
+    if _called_from(lambda filename: "importlib" in filename):
+        return None
+    return f"open({os.path.basename(path)})"
+
+
+def _blocking_call(event: str, args: Tuple[Any, ...]) -> Optional[str]:
+    """Describe ``event`` if it would block the calling thread."""
+    if event == "time.sleep":
+        return f"time.sleep({args[0]})" if args[0] > 0 else None
+    if event == "subprocess.Popen":
+        if _from_asyncio_subprocess():
+            return None
+        return f"subprocess.Popen({os.path.basename(str(args[0]))})"
+    if event == "socket.getaddrinfo":
+        return f"socket.getaddrinfo({args[0]})"
+    if event == "socket.connect":
+        # asyncio connects non-blocking sockets (timeout 0.0) on the loop
+        return f"socket.connect({args[1]})" if args[0].gettimeout() != 0.0 else None
+    if event == "open":
+        return _blocking_open(args[0])
+    return None
+
+
+def _audited_sleep(sleep: Callable[[float], None]) -> Callable[[float], None]:
+    """Raise the ``time.sleep`` audit event that Python < 3.12 lacks."""
+
+    @functools.wraps(sleep)
+    def _sleep(secs: float) -> None:
+        sys.audit("time.sleep", secs)
+        sleep(secs)
+
+    return _sleep
+
+
+_audit_mode = "off"
+_audit_installed = False
+
+
+def _audit_hook(event: str, args: Tuple[Any, ...]) -> None:
+    if _audit_mode == "off" or not (
+        event == "open" or event.startswith(("time.", "subprocess.", "socket."))
+    ):
+        return
+    call = _blocking_call(event, args)
+    if call is None or not _on_loop_thread():
+        return
+    if _audit_mode == "strict":
+        raise BlockingCallError(f"Blocking call on the event loop: {call}")
+    logger.warning(
+        "Blocking call on the event loop: %s\n%s",
+        call,
+        "".join(traceback.format_stack(limit=STALL_STACK_LIMIT)[:-1]),
+    )
+
+
+def install_blocking_audit(mode: Optional[str] = None) -> str:
+    """Set the audit mode (default from ``LOOP_BLOCKING_AUDIT``) and return it.
+
+    Audit hooks cannot be removed, so the hook is installed once and later
+    calls only change the mode.
+    """
+    global _audit_mode, _audit_installed
+    mode = (mode or os.getenv(BLOCKING_AUDIT_ENV_VAR) or "off").lower()
+    if mode not in AUDIT_MODES:
+        raise ValueError(f"{BLOCKING_AUDIT_ENV_VAR} must be one of {AUDIT_MODES}")
+    _audit_mode = mode
+    if mode != "off" and not _audit_installed:
+        sys.addaudithook(_audit_hook)
+        if sys.version_info < (3, 12):
+            time.sleep = _audited_sleep(time.sleep)
+        _audit_installed = True
+    return mode
+
+
+def recent_stalls() -> List[Dict[str, Any]]:
+    """Return the stalls captured by the shared watchdog, oldest first."""
+    return list(_watchdog.stalls) if _watchdog is not None else []
@@ -1,14 +1,26 @@
 """FastAPI router exposing the Jokestruc meme workflow."""
 
+import asyncio
 import logging
 import uuid
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from langgraph.types import Command
 from pydantic import BaseModel
 
-from .graph import app, resume_graph, run_graph
+from .artifact_store import get_artifact_store
+from .execution_log import MAX_PAGE_SIZE, get_execution_log
+from .graph import app, delete_thread, resume_graph, run_graph
+from .loop_monitor import recent_stalls
+from .metrics import IN_FLIGHT, clear_awaiting_review, mark_awaiting_review
+from .packaging_jobs import get_packaging_jobs
+from .preview_stills import candidate_captions, render_caption_stills, segment_midpoint
+from .profiling import list_profiles, load_profile, tag_profile
+from .render_scheduler import get_render_scheduler
+from .thumbnails import get_sprite_cache, timeline_boundaries
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +31,7 @@ class GenerateRequest(BaseModel):
     """Request payload for the meme generation workflow."""
 
     media_path: Optional[str] = None
+    render_options: Optional[Dict[str, Any]] = None
 
 
 class ResumeRequest(BaseModel):
@@ -26,26 +39,30 @@ class ResumeRequest(BaseModel):
 
     thread_id: str
     user_selected_caption: str
+    render_options: Optional[Dict[str, Any]] = None
 
 
 @router.post("/generate")
 async def generate(req: GenerateRequest):
     """Start the workflow; return state or interrupt payload."""
     thread_id = str(uuid.uuid4())
+    tag_profile(thread_id)
     logger.info(
         "Starting jokestruc run with thread_id=%s media=%s",
         thread_id,
         req.media_path,
     )
 
-    result = await run_graph(
-        {"input": {"media_path": req.media_path}, "logs": []},
-        thread_id=thread_id,
-    )
+    initial_state: Dict[str, Any] = {"input": {"media_path": req.media_path}}
+    if req.render_options:
+        initial_state["render_options"] = req.render_options
+    with IN_FLIGHT.track_inprogress():
+        result = await run_graph(initial_state, thread_id=thread_id)
 
     interrupts = result.get("__interrupt__")
     if interrupts:
         payload = interrupts[0].value
+        mark_awaiting_review(thread_id)
         logger.info("Workflow thread %s awaiting human review", thread_id)
         return {
             "thread_id": thread_id,
@@ -60,18 +77,127 @@ async def generate(req: GenerateRequest):
 @router.post("/resume")
 async def resume(req: ResumeRequest):
     """Resume workflow after human review."""
+    tag_profile(req.thread_id)
     logger.info(
         "Resuming thread %s with caption=%r",
         req.thread_id,
         req.user_selected_caption,
     )
-    final_state = await resume_graph(
-        req.thread_id,
-        {"user_selected_caption": req.user_selected_caption},
-    )
+    resume_payload: Dict[str, Any] = {
+        "user_selected_caption": req.user_selected_caption
+    }
+    if req.render_options:
+        resume_payload["render_options"] = req.render_options
+    with IN_FLIGHT.track_inprogress():
+        final_state = await resume_graph(req.thread_id, resume_payload)
+    if final_state.get("__interrupt__"):
+        mark_awaiting_review(req.thread_id)
+    else:
+        clear_awaiting_review(req.thread_id)
     logger.info(
-        "Thread %s resumed successfully; state keys=%s",
+        "Thread %s resumed successfully; output=%s",
         req.thread_id,
-        list(final_state.keys()),
+        final_state.get("output_path"),
     )
     return {"thread_id": req.thread_id, "state": final_state}
+
+
+@router.delete("/threads/{thread_id}")
+async def discard_thread(thread_id: str):
+    """Forget a thread, e.g. one abandoned at review, and free its checkpoints."""
+    if not await delete_thread(thread_id):
+        raise HTTPException(status_code=404, detail="Unknown thread")
+    clear_awaiting_review(thread_id)
+    return {"thread_id": thread_id, "deleted": True}
+
+
+@router.get("/logs/{thread_id}")
+async def execution_events(thread_id: str, after: int = 0, limit: int = 100):
+    """Page through a thread's execution events; pass ``next_after`` back as ``after``."""
+    events = await asyncio.to_thread(get_execution_log().page, thread_id, after, limit)
+    full_page = len(events) >= min(limit, MAX_PAGE_SIZE)
+    return {
+        "thread_id": thread_id,
+        "events": events,
+        "next_after": events[-1]["seq"] if events and full_page else None,
+    }
+
+
+@router.get("/render/queue")
+async def render_queue():
+    """Report render slot occupancy, queue depth, and admission wait times."""
+    return get_render_scheduler().stats()
+
+
+@router.get("/loop/stalls")
+async def loop_stalls():
+    """Return recent event-loop stalls with the stack that was blocking."""
+    return recent_stalls()
+
+
+@router.get("/packaging/{thread_id}")
+async def packaging_status(thread_id: str):
+    """Report the background packaging job and manifest for a thread."""
+    job = get_packaging_jobs().status(thread_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No packaging job for thread")
+    return job
+
+
+@router.get("/preview/{thread_id}")
+async def caption_previews(thread_id: str):
+    """Return a captioned still per candidate for a thread awaiting review."""
+    snapshot = await app.aget_state({"configurable": {"thread_id": thread_id}})
+    values = snapshot.values if snapshot else {}
+    media_path = (values.get("input") or {}).get("media_path")
+    captions = candidate_captions(values.get("captions"))
+    if not media_path or not captions:
+        raise HTTPException(status_code=404, detail="No caption candidates for thread")
+
+    at_sec = segment_midpoint(values.get("selected_segment"))
+    stills = await render_caption_stills(Path(media_path), at_sec, captions)
+    return {"thread_id": thread_id, "time_sec": at_sec, "stills": stills}
+
+
+@router.get("/thumbnails/{thread_id}")
+async def timeline_thumbnails(thread_id: str):
+    """Return the clip's sprite sheet and WebVTT thumbnail map for a thread."""
+    snapshot = await app.aget_state({"configurable": {"thread_id": thread_id}})
+    values = snapshot.values if snapshot else {}
+    media_path = (values.get("input") or {}).get("media_path")
+    if not media_path:
+        raise HTTPException(status_code=404, detail="No media for thread")
+
+    timeline = (values.get("video_insights") or {}).get("timeline")
+    sheet = await get_sprite_cache().get(
+        Path(media_path), timeline_boundaries(timeline)
+    )
+    return {"thread_id": thread_id, **sheet}
+
+
+@router.get("/storage")
+async def storage_usage():
+    """Report artifact disk usage and quotas per category."""
+    return await asyncio.to_thread(get_artifact_store().usage)
+
+
+@router.post("/storage/gc")
+async def storage_gc():
+    """Evict least-recently-used artifacts until every category fits its quota."""
+    freed = await asyncio.to_thread(get_artifact_store().collect)
+    return {"freed_bytes": freed}
+
+
+@router.get("/profiles")
+async def profiles(limit: int = 20):
+    """List the most recent request profiles, newest first."""
+    return await asyncio.to_thread(list_profiles, limit)
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def profile(profile_id: str):
+    """Return one profile as collapsed stacks for flamegraph.pl or speedscope."""
+    folded = await asyncio.to_thread(load_profile, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    return folded
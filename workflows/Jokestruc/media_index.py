@@ -0,0 +1,278 @@
+"""Per-clip keyframe and scene-cut index, persisted by content fingerprint."""
+
+import array
+import asyncio
+import bisect
+import logging
+import os
+import struct
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .artifact_store import get_artifact_store
+from .metrics import record_cache
+from .tracing import span
+from .utils.sandbox import sandbox_argv
+from .video_io import content_fingerprint
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR_ENV_VAR = "MEDIA_INDEX_DIR"
+SCENE_THRESHOLD_ENV_VAR = "MEDIA_INDEX_SCENE_THRESHOLD"
+INDEX_SUBDIR = "media_index"
+DEFAULT_SCENE_THRESHOLD = 0.3
+SCENE_ANALYSIS_WIDTH = 160
+
+# magic, version, flags, scene threshold, duration, keyframe count, cut count
+_HEADER = struct.Struct("<4sHHddII")
+_MAGIC = b"MVIX"
+_VERSION = 1
+_FLAG_SCENES = 1
+
+
+def _nearest(values: Sequence[float], t: float) -> Optional[float]:
+    pos = bisect.bisect_left(values, t)
+    candidates = values[max(pos - 1, 0) : pos + 1]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda v: abs(v - t))
+
+
+class MediaIndex:
+    """Sorted keyframe and scene-cut timestamps with O(log n) lookups."""
+
+    def __init__(
+        self,
+        duration_sec: Optional[float],
+        keyframes: Sequence[float],
+        cuts: Optional[Sequence[float]] = None,
+        scene_threshold: Optional[float] = None,
+    ) -> None:
+        self.duration_sec = duration_sec
+        self.keyframes = array.array("d", sorted(keyframes))
+        self.cuts = array.array("d", sorted(cuts or []))
+        self.has_scenes = cuts is not None
+        self.scene_threshold = scene_threshold
+
+    def nearest_keyframe(self, t: float) -> Optional[float]:
+        """Return the keyframe closest to ``t``, or ``None`` if there are none."""
+        return _nearest(self.keyframes, t)
+
+    def keyframe_at_or_before(self, t: float) -> float:
+        """Return the last keyframe at or before ``t`` (``0.0`` if none)."""
+        pos = bisect.bisect_right(self.keyframes, t + 1e-6)
+        return self.keyframes[pos - 1] if pos else 0.0
+
+    def nearest_cut(
+        self, t: float, max_distance: Optional[float] = None
+    ) -> Optional[float]:
+        """Return the scene cut closest to ``t``, optionally within a tolerance."""
+        cut = _nearest(self.cuts, t)
+        if cut is None or (max_distance is not None and abs(cut - t) > max_distance):
+            return None
+        return cut
+
+    def to_bytes(self) -> bytes:
+        """Serialize to the MVIX format: a fixed header then raw float64 arrays."""
+        header = _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            _FLAG_SCENES if self.has_scenes else 0,
+            self.scene_threshold or 0.0,
+            self.duration_sec or 0.0,
+            len(self.keyframes),
+            len(self.cuts),
+        )
+        return header + self.keyframes.tobytes() + self.cuts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MediaIndex":
+        """Parse an MVIX blob, rejecting unknown versions and truncated data."""
+        (
+            magic,
+            version,
+            flags,
+            threshold,
+            duration,
+            n_keys,
+            n_cuts,
+        ) = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Unsupported media index format")
+        values = array.array("d")
+        values.frombytes(data[_HEADER.size :])
+        if len(values) != n_keys + n_cuts:
+            raise ValueError("Truncated media index")
+        has_scenes = bool(flags & _FLAG_SCENES)
+        return cls(
+            duration or None,
+            values[:n_keys],
+            values[n_keys:] if has_scenes else None,
+            threshold if has_scenes else None,
+        )
+
+
+def probe_packets(video_path: Path) -> Optional[MediaIndex]:
+    """Collect duration and keyframe PTS in a single ffprobe packet pass."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags:format=duration",
+        "-of",
+        "csv=p=1",
+        str(video_path),
+    ]
+    with span("ffprobe.packets", file=video_path.name):
+        completed = subprocess.run(
+            sandbox_argv(cmd), capture_output=True, text=True, check=False
+        )
+    if completed.returncode != 0:
+        logger.warning(f"Keyframe probe failed for {video_path.name}")
+        return None
+
+    duration: Optional[float] = None
+    keyframes: List[float] = []
+    for line in completed.stdout.splitlines():
+        fields = line.split(",")
+        try:
+            if fields[0] == "packet" and "K" in fields[2]:
+                keyframes.append(float(fields[1]))
+            elif fields[0] == "format":
+                duration = float(fields[1])
+        except (IndexError, ValueError):
+            continue
+    return MediaIndex(duration, keyframes)
+
+
+def detect_scene_cuts(video_path: Path, threshold: float) -> List[float]:
+    """Return timestamps whose scene-change score exceeds ``threshold``.
+
+    Frames are downscaled before scoring, which keeps the pass cheap without
+    changing which hard cuts are found.
+    """
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        str(video_path),
+        "-an",
+        "-vf",
+        f"scale={SCENE_ANALYSIS_WIDTH}:-2,select='gt(scene,{threshold})',"
+        "metadata=print:file=-",
+        "-f",
+        "null",
+        "-",
+    ]
+    with span("ffmpeg.scene_cuts", file=video_path.name, threshold=threshold):
+        completed = subprocess.run(
+            sandbox_argv(cmd), capture_output=True, text=True, check=False
+        )
+    if completed.returncode != 0:
+        logger.warning(f"Scene detection failed for {video_path.name}")
+        return []
+
+    cuts: List[float] = []
+    for line in completed.stdout.splitlines():
+        _, marker, value = line.partition("pts_time:")
+        if marker:
+            try:
+                cuts.append(float(value.split()[0]))
+            except (IndexError, ValueError):
+                continue
+    return cuts
+
+
+class MediaIndexStore:
+    """Loads indexes from memory or disk and builds missing ones once."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._memory: Dict[str, MediaIndex] = {}
+        self._building: Dict[str, "asyncio.Task[MediaIndex]"] = {}
+
+    def _path(self, fingerprint: str) -> Path:
+        return self.root / f"{fingerprint}.idx"
+
+    def _load(self, fingerprint: str) -> Optional[MediaIndex]:
+        try:
+            return MediaIndex.from_bytes(self._path(fingerprint).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (ValueError, struct.error):
+            logger.warning(f"Discarding unreadable media index {fingerprint}")
+            return None
+
+    def _save(self, fingerprint: str, index: MediaIndex) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(fingerprint)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(index.to_bytes())
+        os.replace(tmp, path)
+
+    def load_or_build(
+        self, video_path: Path, fingerprint: str, scenes: bool
+    ) -> MediaIndex:
+        """Return the clip's index, running only the passes not already stored."""
+        index = self._memory.get(fingerprint) or self._load(fingerprint)
+        if index is None:
+            index = probe_packets(video_path)
+            if index is None:
+                # Not persisted, so a later call can retry once ffprobe works.
+                return MediaIndex(None, [])
+            self._save(fingerprint, index)
+        if scenes and not index.has_scenes:
+            threshold = float(
+                os.getenv(SCENE_THRESHOLD_ENV_VAR, DEFAULT_SCENE_THRESHOLD)
+            )
+            cuts = detect_scene_cuts(video_path, threshold)
+            index = MediaIndex(index.duration_sec, index.keyframes, cuts, threshold)
+            self._save(fingerprint, index)
+        self._memory[fingerprint] = index
+        return index
+
+    async def get(self, video_path: Path, scenes: bool = False) -> MediaIndex:
+        """Return the index for ``video_path``, sharing in-flight builds."""
+        fingerprint = await asyncio.to_thread(content_fingerprint, video_path)
+        cached = self._memory.get(fingerprint)
+        hit = cached is not None and (cached.has_scenes or not scenes)
+        record_cache("media_index", hit)
+        if hit:
+            return cached
+
+        key = f"{fingerprint}:{int(scenes)}"
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                asyncio.to_thread(self.load_or_build, video_path, fingerprint, scenes)
+            )
+            self._building[key] = task
+            task.add_done_callback(lambda _: self._building.pop(key, None))
+        return await asyncio.shield(task)
+
+
+_store: Optional[MediaIndexStore] = None
+
+
+def get_media_index_store() -> MediaIndexStore:
+    """Return the shared media index store, creating it if needed."""
+    global _store
+    if _store is None:
+        _store = MediaIndexStore(
+            Path(
+                os.getenv(INDEX_DIR_ENV_VAR)
+                or get_artifact_store().path("caches", INDEX_SUBDIR)
+            )
+        )
+    return _store
+
+
+async def get_media_index(video_path: Path, scenes: bool = False) -> MediaIndex:
+    """Return the keyframe (and optionally scene-cut) index for a clip."""
+    return await get_media_index_store().get(video_path, scenes)
@@ -0,0 +1,207 @@
+"""Prometheus metrics for pipeline, provider, cache and render health.
+
+Latency histograms are fed from finished tracing spans (node runs, provider
+calls, uploads), so call sites stay instrumented once. Gauges that mirror
+existing state (checkpoints, render queue) are sampled at scrape time.
+Both are wired up by :func:`install_metrics`; the counters work without it.
+Labels are limited to small fixed sets: node names, models, cache names,
+render modes and error kinds; never thread ids, files or step names.
+"""
+
+import logging
+from typing import Any, Optional, Set, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+from .app_config import app_config
+from .render_scheduler import get_render_scheduler
+from .tracing import Span, add_span_listener
+
+logger = logging.getLogger(__name__)
+
+# Node and provider calls span milliseconds to minutes.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+REALTIME_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)
+
+NODE_DURATION = Histogram(
+    "memevid_node_duration_seconds",
+    "Wall time of one graph node run.",
+    ["node", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_DURATION = Histogram(
+    "memevid_provider_request_seconds",
+    "Latency of one LLM provider request.",
+    ["provider", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_ERRORS = Counter(
+    "memevid_provider_errors_total",
+    "Failed provider requests; kind is rate_limited (HTTP 429), timeout or other.",
+    ["provider", "kind"],
+)
+PROVIDER_RETRIES = Counter(
+    "memevid_provider_retries_total",
+    "Provider requests retried after a transient error, by the error's kind.",
+    ["provider", "kind"],
+)
+UPLOAD_DURATION = Histogram(
+    "memevid_upload_seconds",
+    "Time to upload a clip to Gemini.",
+    buckets=LATENCY_BUCKETS,
+)
+PROCESSING_WAIT = Histogram(
+    "memevid_upload_processing_wait_seconds",
+    "Time an uploaded clip spent PROCESSING before it became usable.",
+    buckets=LATENCY_BUCKETS,
+)
+RENDER_REALTIME = Histogram(
+    "memevid_render_realtime_factor",
+    "Seconds of media rendered per wall-clock second, per renderer run.",
+    ["mode"],
+    buckets=REALTIME_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "memevid_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+IN_FLIGHT = Gauge(
+    "memevid_threads_in_flight",
+    "Workflow threads currently executing a generate or resume request.",
+)
+AWAITING_REVIEW = Gauge(
+    "memevid_threads_awaiting_review",
+    "Workflow threads paused at the human review interrupt.",
+)
+CHECKPOINT_THREADS = Gauge(
+    "memevid_checkpoint_threads",
+    "Threads held by the in-memory checkpointer.",
+)
+RENDER_QUEUE_DEPTH = Gauge(
+    "memevid_render_queue_depth",
+    "Encodes waiting for a render scheduler slot.",
+)
+RENDER_ACTIVE = Gauge(
+    "memevid_render_active",
+    "Encodes currently holding a render scheduler slot.",
+)
+
+LOOP_LAG = Histogram(
+    "memevid_event_loop_lag_seconds",
+    "How late the loop watchdog's heartbeat woke up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+LOOP_STALLS = Counter(
+    "memevid_event_loop_stalls_total",
+    "Times the event loop stayed blocked past LOOP_STALL_THRESHOLD_SEC.",
+)
+
+_PROVIDER_SPANS = {
+    "openai.chat_completion": "openai",
+    "gemini.generate_content": "gemini",
+}
+_RATE_LIMIT_MARKERS = ("429", "RateLimit", "ResourceExhausted", "TooManyRequests")
+
+_awaiting_review: Set[str] = set()
+
+
+def metrics_enabled() -> bool:
+    """Return the ``ENABLE_METRICS`` setting from the app config."""
+    return bool(app_config().ENABLE_METRICS)
+
+
+def _seconds(span: Span) -> float:
+    return max(span.end_ns - span.start_ns, 0) / 1e9
+
+
+def _error_kind(message: str) -> str:
+    if any(marker in message for marker in _RATE_LIMIT_MARKERS):
+        return "rate_limited"
+    if "Timeout" in message or "DeadlineExceeded" in message:
+        return "timeout"
+    return "other"
+
+
+def observe_span(span: Span) -> None:
+    """Span listener mapping finished spans onto the latency metrics."""
+    name = span.name
+    if name.startswith("node."):
+        if span.attributes.get("interrupted"):
+            status = "interrupted"
+        else:
+            status = "error" if span.status == "ERROR" else "ok"
+        NODE_DURATION.labels(name[len("node.") :], status).observe(_seconds(span))
+    elif name in _PROVIDER_SPANS:
+        provider = _PROVIDER_SPANS[name]
+        model = str(span.attributes.get("model") or "unknown")
+        PROVIDER_DURATION.labels(provider, model).observe(_seconds(span))
+        if span.status == "ERROR":
+            PROVIDER_ERRORS.labels(provider, _error_kind(span.status_message)).inc()
+    elif name == "gemini.upload":
+        UPLOAD_DURATION.observe(_seconds(span))
+    elif name == "gemini.upload_poll":
+        PROCESSING_WAIT.observe(_seconds(span))
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one lookup against a named cache."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_render(mode: str, media_sec: Optional[float], wall_sec: float) -> None:
+    """Record how fast a renderer run went relative to the media it produced."""
+    if media_sec and wall_sec > 0:
+        RENDER_REALTIME.labels(mode).observe(media_sec / wall_sec)
+
+
+def record_retry(provider: str, exc: BaseException) -> None:
+    """Count one provider request about to be retried after ``exc``."""
+    PROVIDER_RETRIES.labels(provider, _error_kind(f"{type(exc).__name__}: {exc}")).inc()
+
+
+def mark_awaiting_review(thread_id: str) -> None:
+    """Count a thread paused at the review interrupt (idempotent)."""
+    _awaiting_review.add(thread_id)
+
+
+def clear_awaiting_review(thread_id: str) -> None:
+    """Stop counting a thread once it resumes past review or is deleted."""
+    _awaiting_review.discard(thread_id)
+
+
+def install_metrics(saver: Any) -> None:
+    """Feed histograms from spans and sample gauges from live state.
+
+    Every gauge callback is O(1), so a scrape never walks checkpoints on
+    the event loop. Metrics are also served on the configured
+    ``METRICS_PORT``, for scrapers that should not reach the API port; set
+    it to 0 to skip that listener.
+    """
+    scheduler = get_render_scheduler()
+    add_span_listener(observe_span)
+    AWAITING_REVIEW.set_function(lambda: len(_awaiting_review))
+    CHECKPOINT_THREADS.set_function(lambda: len(saver.storage))
+    RENDER_QUEUE_DEPTH.set_function(lambda: scheduler.queue_depth)
+    RENDER_ACTIVE.set_function(lambda: scheduler.stats()["active"])
+
+    port = app_config().METRICS_PORT
+    if port:
+        try:
+            start_http_server(port)
+        except OSError:  # e.g. a second worker process; /metrics still works
+            logger.warning("Could not serve metrics on port %s", port, exc_info=True)
+        else:
+            logger.info("Serving Prometheus metrics on port %s", port)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Return the exposition body and its content type for a scrape."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,114 @@
+"""Content-addressed cache of normalized mezzanine transcodes."""
+
+import asyncio
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from .artifact_store import get_artifact_store
+from .metrics import record_cache
+from .render_scheduler import (
+    DEFAULT_PRIORITY,
+    apply_thread_budget,
+    get_render_scheduler,
+)
+from .utils.ffmpeg_runner import default_step_timeout, run_ffmpeg
+from .utils.mezzanine import (
+    audio_only,
+    build_mezzanine_command,
+    mezzanine_fps,
+    normalization_reasons,
+)
+from .video_io import content_fingerprint
+
+logger = logging.getLogger(__name__)
+
+MEZZANINE_ENABLED_ENV_VAR = "MEZZANINE_ENABLED"
+MEZZANINE_DIR_ENV_VAR = "MEZZANINE_CACHE_DIR"
+
+
+def mezzanine_enabled() -> bool:
+    """Return whether odd inputs are normalized into a mezzanine."""
+    return os.getenv(MEZZANINE_ENABLED_ENV_VAR, "true").lower() == "true"
+
+
+def _existing_mezzanine(directory: Path) -> Optional[Path]:
+    return next(directory.glob("*.mp4"), None)
+
+
+class MezzanineCache:
+    """Transcodes each distinct input at most once and reuses the result."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._pending: Dict[str, "asyncio.Task[Path]"] = {}
+
+    async def get(
+        self,
+        video_path: Path,
+        streams: Sequence[Dict[str, Any]],
+        priority: str = DEFAULT_PRIORITY,
+    ) -> Path:
+        """Return the mezzanine for ``video_path``, transcoding on first use."""
+        fingerprint = await asyncio.to_thread(content_fingerprint, video_path)
+        # Keyed by content, named after the source so render outputs keep its stem.
+        existing = await asyncio.to_thread(_existing_mezzanine, self.root / fingerprint)
+        record_cache("mezzanine", existing is not None)
+        if existing is not None:
+            return existing
+        path = self.root / fingerprint / f"{video_path.stem}.mp4"
+
+        task = self._pending.get(fingerprint)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._transcode(
+                    video_path,
+                    path,
+                    mezzanine_fps(streams),
+                    audio_only(normalization_reasons(streams)),
+                    priority,
+                )
+            )
+            self._pending[fingerprint] = task
+            task.add_done_callback(lambda _: self._pending.pop(fingerprint, None))
+        return await asyncio.shield(task)
+
+    async def _transcode(
+        self, video_path: Path, path: Path, fps: int, copy_video: bool, priority: str
+    ) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp")
+        command = build_mezzanine_command(video_path, tmp, fps, copy_video)
+        try:
+            async with get_render_scheduler().slot(priority) as budget:
+                await run_ffmpeg(
+                    apply_thread_budget(command, [str(tmp)], budget),
+                    timeout=default_step_timeout(),
+                )
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        logger.info(
+            "Normalized %s into mezzanine %s%s",
+            video_path.name,
+            path.name,
+            " (video stream copied)" if copy_video else "",
+        )
+        return path
+
+
+_mezzanine_cache: Optional[MezzanineCache] = None
+
+
+def get_mezzanine_cache() -> MezzanineCache:
+    """Return the shared mezzanine cache, creating it if needed."""
+    global _mezzanine_cache
+    if _mezzanine_cache is None:
+        _mezzanine_cache = MezzanineCache(
+            Path(
+                os.getenv(MEZZANINE_DIR_ENV_VAR) or get_artifact_store().path("proxies")
+            )
+        )
+    return _mezzanine_cache
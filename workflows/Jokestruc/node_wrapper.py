@@ -0,0 +1,60 @@
+"""Single wrapper that instruments every graph node run.
+
+Each run becomes a ``node.<name>`` span in its thread's trace (see
+:mod:`.tracing`) and logs its compact state delta (see
+:mod:`.state_logging`).
+"""
+
+import functools
+import inspect
+from typing import Any, Callable, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from .state_logging import log_state_update
+from .tracing import span
+
+
+def config_thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """Return the ``thread_id`` a LangGraph run config belongs to, if any."""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def instrument_node(name: str, node: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a graph node so each run is traced as a span and logs its state delta.
+
+    The wrapper always accepts ``config`` (LangGraph passes it because the
+    parameter is declared) and forwards it only to nodes that take it.
+    """
+    wants_config = "config" in inspect.signature(node).parameters
+
+    def _args(state: Any, config: Optional[RunnableConfig]) -> List[Any]:
+        return [state, config] if wants_config else [state]
+
+    if inspect.iscoroutinefunction(node):
+
+        async def _async_node(
+            state: Any, config: Optional[RunnableConfig] = None
+        ) -> Any:
+            thread_id = config_thread_id(config)
+            with span(f"node.{name}", thread_id, node=name):
+                update = await node(*_args(state, config))
+            log_state_update(name, update, thread_id)
+            return update
+
+        wrapper: Callable[..., Any] = _async_node
+    else:
+
+        def _sync_node(state: Any, config: Optional[RunnableConfig] = None) -> Any:
+            thread_id = config_thread_id(config)
+            with span(f"node.{name}", thread_id, node=name):
+                update = node(*_args(state, config))
+            log_state_update(name, update, thread_id)
+            return update
+
+        wrapper = _sync_node
+
+    functools.update_wrapper(wrapper, node, updated=())
+    # Keep LangGraph's signature inspection on the wrapper, which takes config
+    del wrapper.__wrapped__  # type: ignore[attr-defined]
+    return wrapper
@@ -0,0 +1,160 @@
+"""Background packaging of finished renders into streaming-ready artifacts."""
+
+import asyncio
+import collections
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .artifact_store import atomic_write_text
+from .render_scheduler import apply_thread_budget, get_render_scheduler
+from .utils.ffmpeg_runner import default_step_timeout, run_ffmpeg
+from .utils.packaging import (
+    build_packaging_command,
+    build_packaging_manifest,
+    package_dir_for,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = 256
+
+
+async def package_render(
+    video_path: Path, options: Dict[str, Any], priority: str
+) -> Dict[str, Any]:
+    """Package ``video_path`` in one ffmpeg pass and return its manifest."""
+    package_dir = package_dir_for(video_path)
+    command, artifacts = build_packaging_command(video_path, package_dir, options)
+    for path in artifacts.values():
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.monotonic()
+    async with get_render_scheduler().slot(priority) as budget:
+        await run_ffmpeg(
+            apply_thread_budget(command, list(artifacts.values()), budget),
+            timeout=default_step_timeout(),
+        )
+    manifest = await asyncio.to_thread(
+        build_packaging_manifest,
+        video_path,
+        artifacts,
+        options,
+        time.monotonic() - started,
+    )
+    await asyncio.to_thread(
+        atomic_write_text, package_dir / "manifest.json", json.dumps(manifest, indent=2)
+    )
+    return manifest
+
+
+def describe_packaging(videos: Dict[str, Path]) -> Dict[str, Any]:
+    """Return the job fields that name each render and its manifest path.
+
+    The first render is reported at the top level; multi-target runs also
+    list every target under ``targets``.
+    """
+    entries = {
+        name: {
+            "source": str(path),
+            "manifest_path": str(package_dir_for(path) / "manifest.json"),
+        }
+        for name, path in videos.items()
+    }
+    job: Dict[str, Any] = dict(next(iter(entries.values())))
+    if len(entries) > 1:
+        job["targets"] = entries
+    return job
+
+
+async def package_renders(
+    job: Dict[str, Any],
+    videos: Dict[str, Path],
+    options: Dict[str, Any],
+    priority: str,
+) -> None:
+    """Package each render in turn and record its manifest on ``job``."""
+    for idx, (name, path) in enumerate(videos.items()):
+        manifest = await package_render(path, options, priority)
+        if idx == 0:
+            job["manifest"] = manifest
+        if "targets" in job:
+            job["targets"][name]["manifest"] = manifest
+
+
+class PackagingJobs:
+    """Tracks packaging tasks by key so callers can poll their status."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS) -> None:
+        self.max_finished = max_finished
+        self._jobs: "collections.OrderedDict[str, Dict[str, Any]]" = (
+            collections.OrderedDict()
+        )
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+    def submit(
+        self,
+        key: str,
+        videos: Dict[str, Path],
+        options: Dict[str, Any],
+        priority: str,
+    ) -> Dict[str, Any]:
+        """Start packaging in the background, replacing any job with this key."""
+        previous = self._tasks.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+
+        job: Dict[str, Any] = {"status": "pending", **describe_packaging(videos)}
+        self._jobs[key] = job
+        self._jobs.move_to_end(key)
+        task = asyncio.create_task(self._run(key, job, videos, options, priority))
+        self._tasks[key] = task
+        self._prune()
+        return dict(job)
+
+    async def _run(
+        self,
+        key: str,
+        job: Dict[str, Any],
+        videos: Dict[str, Path],
+        options: Dict[str, Any],
+        priority: str,
+    ) -> None:
+        job["status"] = "running"
+        try:
+            await package_renders(job, videos, options, priority)
+            job["status"] = "done"
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as exc:
+            logger.exception("Packaging failed for %s", job["source"])
+            job["status"] = "failed"
+            job["error"] = str(exc)
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond ``max_finished``."""
+        finished = [key for key in self._jobs if key not in self._tasks]
+        for key in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[key]
+
+    def status(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job for ``key``, or ``None`` if unknown."""
+        job = self._jobs.get(key)
+        return dict(job) if job is not None else None
+
+
+_jobs: Optional[PackagingJobs] = None
+
+
+def get_packaging_jobs() -> PackagingJobs:
+    """Return the shared packaging job registry, creating it if needed."""
+    global _jobs
+    if _jobs is None:
+        _jobs = PackagingJobs()
+    return _jobs
@@ -0,0 +1,120 @@
+"""Captioned preview stills for the human review step."""
+
+import asyncio
+import base64
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .artifact_store import get_artifact_store
+from .metrics import record_cache
+from .utils.ffmpeg_runner import run_ffmpeg
+from .utils.ffmpeg_util import pick_font_path
+from .utils.stills import build_caption_stills_command, build_frame_grab_command
+from .video_io import content_fingerprint
+
+PREVIEW_CACHE_DIR_ENV_VAR = "PREVIEW_CACHE_DIR"
+PREVIEW_CACHE_SUBDIR = "preview_frames"
+STILL_TIMEOUT_SEC = 30.0
+
+
+def candidate_captions(raw: Any) -> List[str]:
+    """Normalize ``state['captions']`` (list or newline text) into a list."""
+    if isinstance(raw, str):
+        return [line.strip() for line in raw.splitlines() if line.strip()]
+    return [str(caption).strip() for caption in raw or [] if str(caption).strip()]
+
+
+def segment_midpoint(segment: Optional[Dict[str, Any]]) -> float:
+    """Return the middle of a provisional caption window, or ``0`` without one."""
+    segment = segment or {}
+    try:
+        return (float(segment["start"]) + float(segment["end"])) / 2
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+class FrameCache:
+    """Decoded PNG frames keyed by clip fingerprint and millisecond offset."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._pending: Dict[str, "asyncio.Task[Path]"] = {}
+
+    async def get(self, video_path: Path, at_sec: float) -> Path:
+        """Return the cached frame, decoding it once across concurrent callers."""
+        fingerprint = await asyncio.to_thread(content_fingerprint, video_path)
+        key = f"{fingerprint}_{round(at_sec * 1000)}"
+        path = self.root / f"{key}.png"
+        cached = path.exists()
+        record_cache("preview_frames", cached)
+        if cached:
+            return path
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._decode(video_path, at_sec, path))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _decode(self, video_path: Path, at_sec: float, path: Path) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp.png")
+        try:
+            await run_ffmpeg(
+                build_frame_grab_command(video_path, at_sec, tmp),
+                timeout=STILL_TIMEOUT_SEC,
+            )
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return path
+
+
+async def render_caption_stills(
+    video_path: Path, at_sec: float, captions: List[str]
+) -> List[Dict[str, str]]:
+    """Return one base64 JPEG per caption, composited on a shared cached frame.
+
+    Stills skip the render scheduler: they are a single cheap decode plus
+    one image encode per caption, and should not queue behind full renders.
+    """
+    if not captions:
+        return []
+    frame_path = await get_frame_cache().get(video_path, at_sec)
+    work_dir = Path(tempfile.mkdtemp(prefix="memevid-stills-"))
+    try:
+        command, outputs = build_caption_stills_command(
+            frame_path, captions, pick_font_path(), work_dir
+        )
+        await run_ffmpeg(command, timeout=STILL_TIMEOUT_SEC)
+        images = await asyncio.gather(
+            *(asyncio.to_thread(path.read_bytes) for path in outputs)
+        )
+    finally:
+        await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+    return [
+        {"caption": caption, "jpeg_base64": base64.b64encode(image).decode("ascii")}
+        for caption, image in zip(captions, images)
+    ]
+
+
+_frame_cache: Optional[FrameCache] = None
+
+
+def get_frame_cache() -> FrameCache:
+    """Return the shared preview frame cache, creating it if needed."""
+    global _frame_cache
+    if _frame_cache is None:
+        _frame_cache = FrameCache(
+            Path(
+                os.getenv(PREVIEW_CACHE_DIR_ENV_VAR)
+                or get_artifact_store().path("caches", PREVIEW_CACHE_SUBDIR)
+            )
+        )
+    return _frame_cache
@@ -0,0 +1,275 @@
+"""Opt-in sampling profiles of individual API requests.
+
+When profiling is enabled (``ENABLE_PROFILING`` in the app config, on in
+development; the env var of the same name overrides it), a request is
+profiled when it sends an ``X-Profile: 1`` header or wins a
+``PROFILE_SAMPLE_RATE`` draw. While it runs, a daemon thread samples
+``sys._current_frames()`` every ``PROFILE_INTERVAL_SEC``:
+
+- the event-loop thread on every tick (wall clock), so idle time in the
+  selector (provider I/O, awaited thread-pool work) shows up beside JSON
+  handling and Pydantic validation;
+- other threads only while ``/proc`` reports them running, which gives CPU
+  profiles of the ``asyncio.to_thread`` workers.
+
+Stacks are stored in collapsed ("folded") format, ready for flamegraph.pl
+or speedscope, under ``caches/profiles`` in the artifact store and tagged
+with the workflow ``thread_id``. One request is profiled at a time; the
+samples still include whatever else the process was doing meanwhile.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Optional
+
+from .app_config import app_config
+from .artifact_store import atomic_write_text, get_artifact_store, safe_name
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENV_VAR = "ENABLE_PROFILING"
+SAMPLE_RATE_ENV_VAR = "PROFILE_SAMPLE_RATE"
+INTERVAL_ENV_VAR = "PROFILE_INTERVAL_SEC"
+KEEP_ENV_VAR = "PROFILE_KEEP"
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+DEFAULT_INTERVAL_SEC = 0.01
+DEFAULT_KEEP = 50
+PROFILE_SUBDIR = "profiles"
+# Never profile the endpoints that read profiles or metrics.
+EXCLUDED_PATHS = ("/health", "/metrics", "/jokestruc/profiles")
+LOOP_ROOT = "event-loop"
+
+_PROFILE_ID_RE = re.compile(r"[0-9a-f]{12}")
+_THREAD_SUFFIX_RE = re.compile(r"[-_]\d+")
+
+_active: ContextVar[Optional["ProfileSession"]] = ContextVar(
+    "jokestruc_profile", default=None
+)
+_running: Optional["ProfileSession"] = None
+
+
+def profiling_enabled() -> bool:
+    """Return the app config's ``ENABLE_PROFILING``, overridable from the env."""
+    override = os.getenv(PROFILING_ENV_VAR)
+    if override:
+        return override.lower() == "true"
+    return bool(getattr(app_config(), "ENABLE_PROFILING", False))
+
+
+def profile_dir() -> Path:
+    """Return the artifact-store directory holding saved profiles."""
+    return get_artifact_store().path("caches", PROFILE_SUBDIR)
+
+
+def _on_cpu(native_id: Optional[int]) -> bool:
+    """Whether the kernel reports the thread as running (always true off Linux)."""
+    if native_id is None:
+        return True
+    try:
+        with open(f"/proc/self/task/{native_id}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] == "R"
+    except (OSError, IndexError):
+        return True
+
+
+class ProfileSession:
+    """Samples every thread's stack until stopped and folds them into counts."""
+
+    def __init__(self, loop_thread: int, interval: float, label: str) -> None:
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.thread_id: Optional[str] = None
+        self.label = label
+        self.interval = interval
+        self.loop_thread = loop_thread
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.wall_sec = 0.0
+        self._frame_labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start the sampler thread."""
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread; blocks up to one tick."""
+        self._stop.set()
+        self._sampler.join()
+        self.wall_sec = time.time() - self.started_at
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own)
+
+    def _frame_label(self, code: CodeType) -> str:
+        label = self._frame_labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            where = "/".join(Path(code.co_filename).parts[-2:])
+            label = f"{name} ({where}:{code.co_firstlineno})".replace(";", ",")
+            self._frame_labels[code] = label
+        return label
+
+    def _fold(self, root: str, frame: Optional[FrameType]) -> str:
+        names: List[str] = []
+        while frame is not None:
+            names.append(self._frame_label(frame.f_code))
+            frame = frame.f_back
+        names.append(root)
+        return ";".join(reversed(names))
+
+    def _sample(self, own: int) -> None:
+        threads = {thread.ident: thread for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if ident == self.loop_thread:
+                root = LOOP_ROOT
+            else:
+                thread = threads.get(ident)
+                if thread is None or not _on_cpu(thread.native_id):
+                    continue
+                root = f"thread:{_THREAD_SUFFIX_RE.sub('', thread.name)}"
+            self.stacks[self._fold(root, frame)] += 1
+        self.samples += 1
+
+    def metadata(self) -> Dict[str, Any]:
+        """Return the JSON sidecar fields describing this profile."""
+        return {
+            "profile_id": self.profile_id,
+            "thread_id": self.thread_id,
+            "request": self.label,
+            "started_at": self.started_at,
+            "wall_sec": round(self.wall_sec, 3),
+            "samples": self.samples,
+            "interval_sec": self.interval,
+        }
+
+    def save(self, directory: Path) -> Path:
+        """Write ``<thread_id>_<profile_id>.folded`` plus a JSON sidecar."""
+        stem = f"{safe_name(self.thread_id or 'request')}_{self.profile_id}"
+        folded = "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+        atomic_write_text(directory / f"{stem}.json", json.dumps(self.metadata()))
+        return atomic_write_text(directory / f"{stem}.folded", folded)
+
+
+def tag_profile(thread_id: str) -> None:
+    """Attach the workflow thread id to the request's profile, if one is running."""
+    session = _active.get()
+    if session is not None:
+        session.thread_id = thread_id
+
+
+def _prune(directory: Path, keep: int) -> None:
+    sidecars = sorted(
+        directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True
+    )
+    for sidecar in sidecars[keep:]:
+        sidecar.with_suffix(".folded").unlink(missing_ok=True)
+        sidecar.unlink(missing_ok=True)
+
+
+def _store(session: ProfileSession) -> None:
+    directory = profile_dir()
+    path = session.save(directory)
+    _prune(directory, int(os.getenv(KEEP_ENV_VAR) or DEFAULT_KEEP))
+    logger.info(
+        "Saved profile %s (%d samples, %.2fs) to %s",
+        session.profile_id,
+        session.samples,
+        session.wall_sec,
+        path,
+    )
+
+
+def list_profiles(limit: int = 20) -> List[Dict[str, Any]]:
+    """Return metadata for the most recent profiles, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    sidecars = sorted(
+        directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True
+    )
+    return [json.loads(sidecar.read_text()) for sidecar in sidecars[:limit]]
+
+
+def load_profile(profile_id: str) -> Optional[str]:
+    """Return a profile's folded stacks, or ``None`` if it is unknown."""
+    if not _PROFILE_ID_RE.fullmatch(profile_id):
+        return None
+    match = next(profile_dir().glob(f"*_{profile_id}.folded"), None)
+    return match.read_text() if match is not None else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests chosen by header or sample rate."""
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+        self.sample_rate = float(os.getenv(SAMPLE_RATE_ENV_VAR) or 0.0)
+        self.interval = float(os.getenv(INTERVAL_ENV_VAR) or DEFAULT_INTERVAL_SEC)
+
+    def _wanted(self, scope: Dict[str, Any]) -> bool:
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PATHS):
+            return False
+        header = dict(scope.get("headers") or []).get(PROFILE_HEADER, b"")
+        if header.lower() in (b"1", b"true"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Run the request, profiling it if chosen and no other profile is running."""
+        global _running
+        if _running is not None or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(
+            threading.get_ident(),
+            self.interval,
+            f"{scope['method']} {scope['path']}",
+        )
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((PROFILE_ID_HEADER, session.profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        _running = session
+        token = _active.set(session)
+        session.start()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _active.reset(token)
+            try:
+                # Joining the sampler can take a tick; keep it off the loop.
+                await asyncio.to_thread(session.stop)
+            finally:
+                _running = None
+            try:
+                await asyncio.to_thread(_store, session)
+            except OSError:
+                logger.warning("Could not save profile %s", session.profile_id)
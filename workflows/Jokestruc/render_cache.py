@@ -0,0 +1,243 @@
+"""Content-addressed cache of rendered videos with single-flight renders."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .artifact_store import get_artifact_store
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED_ENV_VAR = "RENDER_CACHE_ENABLED"
+CACHE_DIR_ENV_VAR = "RENDER_CACHE_DIR"
+CACHE_MAX_BYTES_ENV_VAR = "RENDER_CACHE_MAX_BYTES"
+CACHE_SUBDIR = "render_cache"
+DEFAULT_CACHE_MAX_BYTES = 5 * 1024**3
+CACHE_KEY_VERSION = 1
+
+
+def normalize_beats(beats: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reduce beats to the fields that change rendered pixels."""
+    return [
+        {
+            "start": round(float(beat["start"]), 3),
+            "end": round(float(beat["end"]), 3),
+            "caption": " ".join(str(beat["caption"]).split()),
+        }
+        for beat in beats
+    ]
+
+
+def render_cache_key(
+    input_fingerprint: str,
+    beats: Sequence[Dict[str, Any]],
+    font_fingerprint: str,
+    style: Dict[str, Any],
+    encoder_args: Sequence[str],
+) -> str:
+    """Hash everything that determines a render's output into a cache key."""
+    spec = {
+        "version": CACHE_KEY_VERSION,
+        "input": input_fingerprint,
+        "beats": normalize_beats(beats),
+        "font": font_fingerprint,
+        "style": style,
+        "encoder": list(encoder_args),
+    }
+    encoded = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Place ``src`` at ``dst`` atomically, hard-linking when possible."""
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    # rename() is a no-op when both names already point at the same inode.
+    tmp.unlink(missing_ok=True)
+
+
+class _Flight:
+    """An in-progress render shared by every caller asking for the same key."""
+
+    def __init__(self, task: "asyncio.Task[None]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class RenderCache:
+    """LRU, disk-quota-bounded store of rendered artifacts keyed by spec hash."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._flights: Dict[str, _Flight] = {}
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def lookup(self, key: str, suffix: str = ".mp4") -> Optional[Path]:
+        """Return the cached artifact for ``key`` and mark it recently used."""
+        entry = self._entry_path(key, suffix)
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def _store(self, keys: Sequence[str], output_paths: Sequence[Path]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for key, output_path in zip(keys, output_paths):
+            _link_or_copy(output_path, self._entry_path(key, output_path.suffix))
+        self._evict()
+
+    def _lookup_all(
+        self, keys: Sequence[str], output_paths: Sequence[Path]
+    ) -> Optional[List[Path]]:
+        """Return the cached entry for every output, or ``None`` on any miss."""
+        entries = []
+        for key, output_path in zip(keys, output_paths):
+            entry = self.lookup(key, output_path.suffix)
+            if entry is None:
+                return None
+            entries.append(entry)
+        return entries
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits its quota."""
+        entries = []
+        for path in self.root.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info("Evicted render cache entry %s", path.name)
+
+    async def _render_and_store(
+        self,
+        keys: Sequence[str],
+        output_paths: Sequence[Path],
+        render: Callable[[], Awaitable[Any]],
+    ) -> None:
+        for output_path in output_paths:
+            output_path.unlink(missing_ok=True)
+        await render()
+        await asyncio.to_thread(self._store, keys, output_paths)
+
+    async def _join(self, flight: _Flight) -> None:
+        flight.waiters += 1
+        try:
+            await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _materialize(
+        self, entries: Sequence[Path], output_paths: Sequence[Path]
+    ) -> None:
+        for entry, output_path in zip(entries, output_paths):
+            await asyncio.to_thread(_link_or_copy, entry, output_path)
+
+    async def get_or_render(
+        self,
+        key: str,
+        output_path: Path,
+        render: Callable[[], Awaitable[Any]],
+    ) -> bool:
+        """Materialize the artifact for ``key`` at ``output_path``.
+
+        Runs ``render`` (which must write ``output_path``) only on a miss and
+        collapses concurrent identical requests into one render. Returns
+        ``True`` when the result came from the cache.
+        """
+        return await self.get_or_render_many([key], [output_path], render)
+
+    async def get_or_render_many(
+        self,
+        keys: Sequence[str],
+        output_paths: Sequence[Path],
+        render: Callable[[], Awaitable[Any]],
+    ) -> bool:
+        """Like :meth:`get_or_render` for a render that writes several outputs.
+
+        ``keys[i]`` names the entry for ``output_paths[i]``. The cache only
+        serves the request when every output is cached; otherwise ``render``
+        runs once and refreshes all of them.
+        """
+        if len(keys) != len(output_paths):
+            raise ValueError("Need exactly one cache key per output path")
+
+        cached = self._lookup_all(keys, output_paths)
+        if cached is not None:
+            self.hits += 1
+            await self._materialize(cached, output_paths)
+            return True
+
+        flight_key = "+".join(keys)
+        flight = self._flights.get(flight_key)
+        if flight is not None:
+            # Only count the join as a hit once the shared render has succeeded.
+            await self._join(flight)
+            cached = self._lookup_all(keys, output_paths)
+            if cached is None:
+                raise RuntimeError(
+                    f"Render cache entry {flight_key} vanished after render"
+                )
+            self.hits += 1
+            await self._materialize(cached, output_paths)
+            return True
+
+        self.misses += 1
+        task = asyncio.create_task(self._render_and_store(keys, output_paths, render))
+        flight = _Flight(task)
+        self._flights[flight_key] = flight
+        task.add_done_callback(lambda _: self._flights.pop(flight_key, None))
+        await self._join(flight)
+        return False
+
+
+_cache: Optional[RenderCache] = None
+
+
+def render_cache_enabled() -> bool:
+    """Return whether render caching is switched on."""
+    return os.getenv(CACHE_ENABLED_ENV_VAR, "true").lower() == "true"
+
+
+def get_render_cache() -> RenderCache:
+    """Return the shared render cache, creating it if needed."""
+    global _cache
+    if _cache is None:
+        root = Path(
+            os.getenv(CACHE_DIR_ENV_VAR)
+            or get_artifact_store().path("caches", CACHE_SUBDIR)
+        )
+        max_bytes = int(os.getenv(CACHE_MAX_BYTES_ENV_VAR) or DEFAULT_CACHE_MAX_BYTES)
+        _cache = RenderCache(root, max_bytes)
+    return _cache
@@ -0,0 +1,152 @@
+"""Admission control and CPU thread budgeting for concurrent ffmpeg encodes."""
+
+import asyncio
+import collections
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+)
+
+from .utils.sandbox import render_cpu_count
+
+MAX_CONCURRENT_ENV_VAR = "RENDER_MAX_CONCURRENT"
+CORES_PER_ENCODE = 4
+WAIT_SAMPLE_SIZE = 256
+
+PRIORITIES = {"interactive": 0, "batch": 1, "speculative": 2}
+DEFAULT_PRIORITY = "interactive"
+
+
+class ThreadBudget(TypedDict):
+    threads: int
+    filter_threads: int
+
+
+def apply_thread_budget(
+    command: Sequence[str], outputs: Sequence[str], budget: ThreadBudget
+) -> List[str]:
+    """Pin an ffmpeg command's encoder and filter threads to ``budget``.
+
+    ``-filter_threads`` is global so it goes right after the binary;
+    ``-threads`` is an output option and is placed before every output path.
+    """
+    argv = list(command)
+    if not argv or not argv[0].endswith("ffmpeg"):
+        return argv
+
+    output_set = set(outputs)
+    budgeted = [argv[0], "-filter_threads", str(budget["filter_threads"])]
+    for arg in argv[1:]:
+        if arg in output_set:
+            budgeted.extend(["-threads", str(budget["threads"])])
+        budgeted.append(arg)
+    return budgeted
+
+
+class RenderScheduler:
+    """Priority queue that admits at most ``max_concurrent`` encodes at once."""
+
+    def __init__(self, max_concurrent: int, cores: int) -> None:
+        self.max_concurrent = max(max_concurrent, 1)
+        self.cores = max(cores, 1)
+        self._active = 0
+        self._queue: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._order = itertools.count()
+        self._waits: Deque[float] = collections.deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.admitted = 0
+
+    def budget(self) -> ThreadBudget:
+        """Return the per-encode thread budget for a full scheduler."""
+        threads = max(self.cores // self.max_concurrent, 1)
+        return {"threads": threads, "filter_threads": max(threads // 2, 1)}
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers still waiting for a slot."""
+        return sum(1 for _, _, waiter in self._queue if not waiter.done())
+
+    def _release(self) -> None:
+        """Hand the freed slot to the best waiter, or return it to the pool."""
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    async def _acquire(self, priority: str) -> None:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown render priority {priority!r}")
+        if self._active < self.max_concurrent and not self.queue_depth:
+            self._active += 1
+            return
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (PRIORITIES[priority], next(self._order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before we were cancelled.
+                self._release()
+            raise
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: str = DEFAULT_PRIORITY
+    ) -> AsyncIterator[ThreadBudget]:
+        """Wait for an encode slot and yield its thread budget."""
+        enqueued = time.monotonic()
+        await self._acquire(priority)
+        self._waits.append(time.monotonic() - enqueued)
+        self.admitted += 1
+        try:
+            yield self.budget()
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize occupancy, queue depth, and recent admission waits."""
+        waits = sorted(self._waits)
+
+        def _pct(fraction: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(int(len(waits) * fraction), len(waits) - 1)], 4)
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self._active,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "budget": self.budget(),
+            "wait_sec": {"p50": _pct(0.5), "p95": _pct(0.95), "max": _pct(1.0)},
+        }
+
+
+_scheduler: Optional[RenderScheduler] = None
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """Return the shared render scheduler, creating it if needed."""
+    global _scheduler
+    if _scheduler is None:
+        cores = render_cpu_count()
+        configured = os.getenv(MAX_CONCURRENT_ENV_VAR)
+        max_concurrent = (
+            int(configured) if configured else max(cores // CORES_PER_ENCODE, 1)
+        )
+        _scheduler = RenderScheduler(max_concurrent, cores)
+    return _scheduler
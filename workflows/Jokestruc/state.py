@@ -1,11 +1,13 @@
 """Typed dictionaries representing workflow state."""
 
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict, Union
 
 
 class InputPayload(TypedDict, total=False):
     media_path: str
     duration_sec: Optional[float]
+    source_path: str
+    normalized: List[str]
 
 
 class TimelineSegmentDict(TypedDict):
@@ -39,9 +41,37 @@ class SelectedSegmentDict(TypedDict, total=False):
     emotional_tone: str
 
 
+class OutputTargetDict(TypedDict, total=False):
+    name: str
+    width: int
+    height: int
+    font_size: int
+    video_bitrate: str
+
+
+class RenderOptionsDict(TypedDict, total=False):
+    mode: str
+    targets: List[Union[str, OutputTargetDict]]
+    segments: int
+    priority: str
+    container: str
+    subtitle_track: bool
+    trim: str
+    lead_in_sec: float
+    lead_out_sec: float
+    normalize: bool
+    packaging: Union[bool, Dict[str, Any]]
+
+
+class RenderWindowDict(TypedDict):
+    start: float
+    end: float
+
+
 class JokeState(TypedDict, total=False):
     input: Optional[InputPayload]
-    logs: List[str]
+    # seq of the thread's latest execution_log event; the events live outside
+    log_cursor: int
     output_path: Optional[str]
 
     video_insights: Optional[VideoInsightsDict]
@@ -54,6 +84,10 @@ class JokeState(TypedDict, total=False):
     timing_plan: Optional[TimingPlanDict]
     dag_plan: Optional[List[Dict[str, Any]]]
     output_target: Optional[str]
+    render_options: Optional[RenderOptionsDict]
+    output_paths: Optional[Dict[str, str]]
+    render_window: Optional[RenderWindowDict]
+    packaging: Optional[Dict[str, Any]]
 
     # scene_map: Optional[str]
     # selected_caption: Optional[str]
@@ -64,6 +98,7 @@ class JokeState(TypedDict, total=False):
     # caption_selection_reason: Optional[str]
 
     input_parser_done: bool
+    media_normalizer_done: bool
     video_insight_done: bool
     humor_framer_done: bool
     caption_generator_done: bool
@@ -71,4 +106,5 @@ class JokeState(TypedDict, total=False):
     timing_composer_done: bool
     dag_composer_done: bool
     renderer_done: bool
+    packager_done: bool
     caption_selector_done: bool
@@ -0,0 +1,86 @@
+"""Compact, lazily rendered logging of workflow state.
+
+Every node run logs one INFO line naming the keys it returned with their
+type and size, e.g. ``node=video_insight thread=… delta=video_insights=dict[3]``.
+With DEBUG enabled each key also gets a short content hash
+(``dict[3]#9f2c1a0b``), which means serializing the value, so INFO logging
+never pays for it. Full payloads are only logged at DEBUG, or for a
+``STATE_LOG_SAMPLE_RATE`` fraction of node runs at INFO. Everything is
+rendered in ``__str__``, so nothing is serialized unless the record is
+actually emitted.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+from typing import Any, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE_ENV_VAR = "STATE_LOG_SAMPLE_RATE"
+HASH_BYTES = 4
+
+
+def _size(value: Any) -> str:
+    if isinstance(value, (str, bytes, list, tuple, dict, set)):
+        return f"[{len(value)}]"
+    return ""
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=HASH_BYTES).hexdigest()
+
+
+class StateDelta:
+    """Renders ``key=type[len]`` (plus ``#hash`` with ``digests``) per updated key."""
+
+    __slots__ = ("update", "digests")
+
+    def __init__(self, update: Mapping[str, Any], digests: bool = False) -> None:
+        self.update = update
+        self.digests = digests
+
+    def __str__(self) -> str:
+        if not self.update:
+            return "(none)"
+        return " ".join(
+            f"{key}={type(value).__name__}{_size(value)}"
+            + (f"#{_digest(value)}" if self.digests else "")
+            for key, value in self.update.items()
+        )
+
+
+class LazyJSON:
+    """Serializes a payload only when the log record is formatted."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, indent=2, default=str)
+
+
+def _sample_rate() -> float:
+    return float(os.getenv(SAMPLE_RATE_ENV_VAR) or 0.0)
+
+
+def log_state_update(node: str, update: Any, thread_id: Optional[str] = None) -> None:
+    """Log a node's returned update compactly, and in full at DEBUG or sampled."""
+    if not isinstance(update, Mapping):
+        return
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.info(
+        "node=%s thread=%s delta=%s", node, thread_id, StateDelta(update, debug)
+    )
+    if debug:
+        level = logging.DEBUG
+    elif random.random() < _sample_rate():
+        level = logging.INFO
+    else:
+        return
+    logger.log(level, "node=%s thread=%s update=%s", node, thread_id, LazyJSON(update))
@@ -0,0 +1,144 @@
+"""Timeline sprite sheets and WebVTT thumbnail maps, cached per clip."""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .artifact_store import get_artifact_store
+from .media_index import get_media_index
+from .metrics import record_cache
+from .utils.ffmpeg_runner import default_step_timeout, run_ffmpeg
+from .utils.sprites import (
+    SPRITE_COLUMNS,
+    THUMB_HEIGHT,
+    THUMB_WIDTH,
+    build_sprite_command,
+    build_thumbnail_vtt,
+    effective_stride,
+    parse_frame_times,
+    sprite_rows,
+    tile_rect,
+)
+from .video_io import content_fingerprint
+
+SPRITE_CACHE_DIR_ENV_VAR = "SPRITE_CACHE_DIR"
+SPRITE_CACHE_SUBDIR = "sprites"
+
+
+def timeline_boundaries(timeline: Optional[Sequence[Dict[str, Any]]]) -> List[float]:
+    """Return the sorted start/end times of ``video_insights['timeline']``."""
+    boundaries = set()
+    for segment in timeline or []:
+        for key in ("start", "end"):
+            try:
+                boundaries.add(round(float(segment[key]), 3))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return sorted(boundaries)
+
+
+class SpriteSheetCache:
+    """Builds each clip's sprite sheet once and serves it from disk after."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._pending: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    async def get(
+        self, video_path: Path, boundaries: Sequence[float]
+    ) -> Dict[str, Any]:
+        """Return the sheet manifest for a clip and boundary set."""
+        fingerprint = await asyncio.to_thread(content_fingerprint, video_path)
+        spec = hashlib.sha256(json.dumps(list(boundaries)).encode()).hexdigest()
+        key = f"{fingerprint}_{spec[:16]}"
+        manifest_path = self.root / key / "sprite.json"
+        cached = manifest_path.exists()
+        record_cache("sprites", cached)
+        if cached:
+            return json.loads(await asyncio.to_thread(manifest_path.read_text))
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._build(video_path, boundaries, self.root / key)
+            )
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _build(
+        self, video_path: Path, boundaries: Sequence[float], sheet_dir: Path
+    ) -> Dict[str, Any]:
+        index = await get_media_index(video_path)
+        duration = index.duration_sec or (max(boundaries) if boundaries else 0.0)
+        stride = effective_stride(duration, len(boundaries))
+
+        # Build into a scratch directory and rename it in once complete.
+        work_dir = sheet_dir.with_name(f".{sheet_dir.name}.{uuid.uuid4().hex}")
+        work_dir.mkdir(parents=True)
+        try:
+            frames_path = work_dir / "frames.crc"
+            await run_ffmpeg(
+                build_sprite_command(
+                    video_path,
+                    work_dir / "sprite.jpg",
+                    frames_path,
+                    duration,
+                    boundaries,
+                    stride,
+                ),
+                timeout=default_step_timeout(),
+            )
+            frame_times = parse_frame_times(
+                await asyncio.to_thread(frames_path.read_text)
+            )
+            # Frames past the grid (only with an unknown duration) are not tiled.
+            capacity = SPRITE_COLUMNS * sprite_rows(duration, len(boundaries), stride)
+            frame_times = frame_times[:capacity]
+            manifest = {
+                "sprite": str(sheet_dir / "sprite.jpg"),
+                "vtt": str(sheet_dir / "thumbnails.vtt"),
+                "tile": {"width": THUMB_WIDTH, "height": THUMB_HEIGHT},
+                "stride_sec": round(stride, 3),
+                "frames": [
+                    {"time": time, "xywh": list(tile_rect(idx))}
+                    for idx, time in enumerate(frame_times)
+                ],
+            }
+            vtt = build_thumbnail_vtt("sprite.jpg", frame_times, duration)
+            await asyncio.to_thread(
+                (work_dir / "thumbnails.vtt").write_text, vtt, encoding="utf-8"
+            )
+            await asyncio.to_thread(
+                (work_dir / "sprite.json").write_text, json.dumps(manifest, indent=2)
+            )
+            frames_path.unlink()
+            try:
+                os.replace(work_dir, sheet_dir)
+            except OSError:
+                # Another process published the same sheet first.
+                pass
+            return manifest
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+
+_sprite_cache: Optional[SpriteSheetCache] = None
+
+
+def get_sprite_cache() -> SpriteSheetCache:
+    """Return the shared sprite sheet cache, creating it if needed."""
+    global _sprite_cache
+    if _sprite_cache is None:
+        _sprite_cache = SpriteSheetCache(
+            Path(
+                os.getenv(SPRITE_CACHE_DIR_ENV_VAR)
+                or get_artifact_store().path("caches", SPRITE_CACHE_SUBDIR)
+            )
+        )
+    return _sprite_cache
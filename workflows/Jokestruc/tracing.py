@@ -0,0 +1,305 @@
+"""Lightweight spans for graph nodes, provider calls and ffmpeg, with local export.
+
+Spans nest through a ``contextvars`` variable, so they follow awaits and
+``asyncio.to_thread`` calls. Every span of a workflow run shares a trace id
+derived from its ``thread_id``. Finished spans are written as
+OTLP-shaped JSON lines to ``TRACE_FILE`` and/or POSTed as OTLP/HTTP JSON
+to ``TRACE_OTLP_ENDPOINT`` by a background thread. In-process listeners
+(see :func:`add_span_listener`) also see every finished span. With no
+exporter and no listener, spans are no-ops.
+"""
+
+import atexit
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE_ENV_VAR = "TRACE_FILE"
+TRACE_OTLP_ENDPOINT_ENV_VAR = "TRACE_OTLP_ENDPOINT"
+SERVICE_NAME = "memevid"
+EXPORT_BATCH_SIZE = 256
+EXPORT_FLUSH_SEC = 2.0
+
+# Raised by ``interrupt()`` to pause a thread; not a failure.
+_INTERRUPT_ERRORS = ("GraphInterrupt", "NodeInterrupt")
+
+
+def trace_id_for(thread_id: str) -> str:
+    """Return the 128-bit hex trace id shared by every span of a thread."""
+    return hashlib.sha256(thread_id.encode("utf-8")).hexdigest()[:32]
+
+
+class Span:
+    """One timed operation; attributes are plain JSON scalars."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "thread_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+    )
+
+    def __init__(
+        self, name: str, parent: Optional["Span"], thread_id: Optional[str]
+    ) -> None:
+        self.name = name
+        self.thread_id = thread_id or (parent.thread_id if parent else None)
+        if parent is not None and parent.thread_id == self.thread_id:
+            self.trace_id = parent.trace_id
+            self.parent_id: Optional[str] = parent.span_id
+        else:
+            self.trace_id = (
+                trace_id_for(self.thread_id)
+                if self.thread_id
+                else secrets.token_hex(16)
+            )
+            self.parent_id = None
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set one attribute, ignoring ``None`` values."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, values: Dict[str, Any]) -> None:
+        """Set several attributes at once."""
+        for key, value in values.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, exc: BaseException) -> None:
+        """Mark the span failed, or just interrupted for a graph interrupt."""
+        if type(exc).__name__ in _INTERRUPT_ERRORS:
+            self.set_attribute("interrupted", True)
+            return
+        self.status = "ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"[:500]
+
+    def to_record(self) -> Dict[str, Any]:
+        """Return the span as one OTLP-shaped JSON object."""
+        attributes = dict(self.attributes)
+        if self.thread_id:
+            attributes["thread_id"] = self.thread_id
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is off, so call sites need no checks."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, values: Dict[str, Any]) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "jokestruc_current_span", default=None
+)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Wrap span records in an OTLP/HTTP JSON ``ExportTraceServiceRequest``."""
+    spans = [
+        {
+            "traceId": record["traceId"],
+            "spanId": record["spanId"],
+            "parentSpanId": record["parentSpanId"],
+            "name": record["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(record["startTimeUnixNano"]),
+            "endTimeUnixNano": str(record["endTimeUnixNano"]),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in record["attributes"].items()
+            ],
+            "status": {"code": 2 if record["status"]["code"] == "ERROR" else 0},
+        }
+        for record in records
+    ]
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {"stringValue": SERVICE_NAME},
+                        }
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """Batches finished spans on a daemon thread and writes them out."""
+
+    def __init__(
+        self, trace_file: Optional[Path], otlp_endpoint: Optional[str]
+    ) -> None:
+        self.trace_file = trace_file
+        self.otlp_endpoint = otlp_endpoint
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span for the next batch."""
+        self._queue.put(span.to_record())
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + EXPORT_FLUSH_SEC
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    record = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0.01)
+                    )
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            if self.trace_file is not None:
+                self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+                with self.trace_file.open("a", encoding="utf-8") as handle:
+                    for record in batch:
+                        handle.write(json.dumps(record, default=str) + "\n")
+            if self.otlp_endpoint:
+                request = urllib.request.Request(
+                    self.otlp_endpoint,
+                    data=json.dumps(_otlp_payload(batch), default=str).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+        except Exception:  # exporting must never break a workflow run
+            logger.warning("Dropped %d spans", len(batch), exc_info=True)
+
+    def shutdown(self) -> None:
+        """Flush queued spans and stop the exporter thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_checked = False
+_listeners: List[Callable[[Span], None]] = []
+
+
+def add_span_listener(listener: Callable[[Span], None]) -> None:
+    """Call ``listener`` with every finished span, e.g. to derive metrics."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def get_span_exporter() -> Optional[SpanExporter]:
+    """Return the shared exporter, or ``None`` when tracing is not configured."""
+    global _exporter, _exporter_checked
+    if not _exporter_checked:
+        trace_file = os.getenv(TRACE_FILE_ENV_VAR)
+        endpoint = os.getenv(TRACE_OTLP_ENDPOINT_ENV_VAR)
+        if trace_file or endpoint:
+            _exporter = SpanExporter(Path(trace_file) if trace_file else None, endpoint)
+        _exporter_checked = True
+    return _exporter
+
+
+@contextmanager
+def span(
+    name: str, thread_id: Optional[str] = None, **attributes: Any
+) -> Iterator[Any]:
+    """Time the enclosed block as a child of the current span.
+
+    Exceptions are recorded on the span and re-raised. ``thread_id`` starts
+    (or joins) that thread's trace; nested spans inherit it.
+    """
+    exporter = get_span_exporter()
+    if exporter is None and not _listeners:
+        yield _NOOP_SPAN
+        return
+    current = Span(name, _current_span.get(), thread_id)
+    current.set_attributes(attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.record_error(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        if exporter is not None:
+            exporter.export(current)
+        for listener in _listeners:
+            try:
+                listener(current)
+            except Exception:  # a broken listener must never fail the run
+                logger.exception("Span listener failed for %s", name)
+
+
+def current_span() -> Any:
+    """Return the active span (a no-op stand-in outside any span)."""
+    return _current_span.get() or _NOOP_SPAN
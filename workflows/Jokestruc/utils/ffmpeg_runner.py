@@ -0,0 +1,282 @@
+"""Async FFmpeg execution with progress events, timeouts, and cancellation."""
+
+import asyncio
+import collections
+import logging
+import os
+import signal
+from typing import Callable, Deque, Dict, List, Optional, Sequence, TypedDict
+
+from ..tracing import span
+from .sandbox import sandbox_argv
+
+logger = logging.getLogger(__name__)
+
+STEP_TIMEOUT_ENV_VAR = "RENDER_STEP_TIMEOUT_SEC"
+DEFAULT_STEP_TIMEOUT_SEC = 600.0
+STDERR_TAIL_LINES = 40
+
+
+class FFmpegProgress(TypedDict):
+    frame: int
+    out_time_sec: float
+    speed: Optional[float]
+    done: bool
+
+
+ProgressCallback = Callable[[FFmpegProgress], None]
+
+
+class FFmpegError(RuntimeError):
+    """Raised when an FFmpeg process exits with a non-zero status."""
+
+    def __init__(
+        self,
+        message: str,
+        command: Sequence[str],
+        returncode: Optional[int],
+        stderr_tail: List[str],
+    ) -> None:
+        detail = "\n".join(stderr_tail[-10:])
+        super().__init__(f"{message}\n{detail}" if detail else message)
+        self.command = list(command)
+        self.returncode = returncode
+        self.stderr_tail = stderr_tail
+
+
+class FFmpegTimeoutError(FFmpegError):
+    """Raised when an FFmpeg process exceeds its step timeout."""
+
+    pass
+
+
+def default_step_timeout() -> float:
+    """Return the per-step render timeout in seconds from the environment."""
+    value = os.getenv(STEP_TIMEOUT_ENV_VAR)
+    return float(value) if value else DEFAULT_STEP_TIMEOUT_SEC
+
+
+def with_progress_args(command: Sequence[str]) -> List[str]:
+    """Insert machine-readable progress flags into an ffmpeg command."""
+    argv = list(command)
+    if not argv or not argv[0].endswith("ffmpeg") or "-progress" in argv:
+        return argv
+    return [argv[0], "-hide_banner", "-progress", "pipe:1", "-nostats", *argv[1:]]
+
+
+def _parse_speed(value: str) -> Optional[float]:
+    """Parse ffmpeg's ``1.23x`` speed field."""
+    try:
+        return float(value.rstrip("x"))
+    except ValueError:
+        return None
+
+
+def _to_progress(fields: Dict[str, str]) -> FFmpegProgress:
+    """Convert one block of ``key=value`` progress lines into an event."""
+    try:
+        frame = int(fields.get("frame", "0"))
+    except ValueError:
+        frame = 0
+    try:
+        out_time_sec = int(fields.get("out_time_us", "0")) / 1_000_000
+    except ValueError:
+        out_time_sec = 0.0
+    return {
+        "frame": frame,
+        "out_time_sec": max(out_time_sec, 0.0),
+        "speed": _parse_speed(fields.get("speed", "N/A")),
+        "done": fields.get("progress") == "end",
+    }
+
+
+async def _read_progress(
+    stream: asyncio.StreamReader, on_progress: Optional[ProgressCallback]
+) -> None:
+    """Consume ffmpeg ``-progress`` output and emit one event per block."""
+    fields: Dict[str, str] = {}
+    async for raw in stream:
+        key, _, value = raw.decode(errors="replace").strip().partition("=")
+        if not key:
+            continue
+        fields[key] = value
+        if key == "progress":
+            event = _to_progress(fields)
+            fields = {}
+            if on_progress is not None:
+                try:
+                    on_progress(event)
+                except Exception:  # progress reporting must never kill a render
+                    logger.exception("ffmpeg progress callback failed")
+
+
+async def _read_stderr(stream: asyncio.StreamReader, tail: Deque[str]) -> None:
+    """Keep the last few stderr lines for diagnostics."""
+    async for raw in stream:
+        line = raw.decode(errors="replace").rstrip()
+        if line:
+            tail.append(line)
+
+
+def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+    """Kill ffmpeg and any helpers it spawned."""
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+# ffmpeg options that take no value; every other ``-option`` consumes one
+_FLAG_OPTIONS = {
+    "-y",
+    "-n",
+    "-an",
+    "-vn",
+    "-sn",
+    "-dn",
+    "-re",
+    "-shortest",
+    "-copyts",
+    "-nostdin",
+    "-nostats",
+    "-stats",
+    "-hide_banner",
+}
+
+
+def _output_paths(command: Sequence[str]) -> List[str]:
+    """Return the output files of an ffmpeg command, in order.
+
+    Outputs are the positional arguments that are neither an option value
+    nor an ``-i`` input; ``-`` and ``pipe:`` outputs (e.g. ``-f null -``)
+    are not files and are skipped.
+    """
+    outputs: List[str] = []
+    args = iter(command[1:])
+    for arg in args:
+        if arg.startswith("-") and arg != "-":
+            if arg not in _FLAG_OPTIONS:
+                next(args, None)
+        elif arg != "-" and not arg.startswith("pipe:"):
+            outputs.append(arg)
+    return outputs
+
+
+def _output_name(command: Sequence[str]) -> str:
+    """Return the file name of the last (primary) output file."""
+    outputs = _output_paths(command)
+    return os.path.basename(outputs[-1]) if outputs else ""
+
+
+def _output_bytes(command: Sequence[str]) -> Optional[int]:
+    """Return the combined size of the command's output files that exist."""
+    sizes = []
+    for path in _output_paths(command):
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            continue
+    return sum(sizes) if sizes else None
+
+
+def _signal_name(signum: int) -> str:
+    """Name a signal number, falling back to the number for unnamed ones."""
+    try:
+        return signal.Signals(signum).name
+    except ValueError:
+        return f"signal {signum}"
+
+
+async def run_ffmpeg(
+    command: Sequence[str],
+    *,
+    timeout: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    stderr_lines: int = STDERR_TAIL_LINES,
+) -> List[str]:
+    """Run an ffmpeg command, reporting progress and enforcing a timeout.
+
+    Returns the captured stderr tail. Raises ``FFmpegError`` on failure and
+    ``FFmpegTimeoutError`` when ``timeout`` elapses; cancelling the awaiting
+    task kills the whole process group. With ``RENDER_WORKER=process`` the
+    command runs in the separate render worker instead of an API child.
+    """
+    from .render_worker import get_render_worker, render_worker_enabled
+
+    in_worker = render_worker_enabled()
+    with span("ffmpeg", output=_output_name(command), worker=in_worker) as current:
+        if in_worker:
+            tail = await get_render_worker().run(
+                command, timeout=timeout, on_progress=on_progress
+            )
+        else:
+            tail = await run_ffmpeg_local(
+                command,
+                timeout=timeout,
+                on_progress=on_progress,
+                stderr_lines=stderr_lines,
+            )
+        current.set_attribute("bytes", _output_bytes(command))
+    return tail
+
+
+async def run_ffmpeg_local(
+    command: Sequence[str],
+    *,
+    timeout: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    stderr_lines: int = STDERR_TAIL_LINES,
+) -> List[str]:
+    """Run an ffmpeg command as a sandboxed child of the current process."""
+    argv = with_progress_args(command)
+    proc = await asyncio.create_subprocess_exec(
+        *sandbox_argv(argv),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    stderr_tail: Deque[str] = collections.deque(maxlen=stderr_lines)
+
+    async def _communicate() -> int:
+        assert proc.stdout is not None and proc.stderr is not None
+        await asyncio.gather(
+            _read_progress(proc.stdout, on_progress),
+            _read_stderr(proc.stderr, stderr_tail),
+        )
+        return await proc.wait()
+
+    try:
+        returncode = await asyncio.wait_for(_communicate(), timeout)
+    except asyncio.TimeoutError:
+        _kill_process_group(proc)
+        await proc.wait()
+        raise FFmpegTimeoutError(
+            f"ffmpeg timed out after {timeout:.0f}s",
+            argv,
+            proc.returncode,
+            list(stderr_tail),
+        ) from None
+    except asyncio.CancelledError:
+        _kill_process_group(proc)
+        await proc.wait()
+        raise
+
+    if returncode < 0:
+        # SIGXCPU/SIGKILL here usually means a sandbox rlimit was hit
+        raise FFmpegError(
+            f"ffmpeg killed by {_signal_name(-returncode)}",
+            argv,
+            returncode,
+            list(stderr_tail),
+        )
+    if returncode != 0:
+        raise FFmpegError(
+            f"ffmpeg exited with status {returncode}",
+            argv,
+            returncode,
+            list(stderr_tail),
+        )
+    return list(stderr_tail)
@@ -6,8 +6,22 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 FONT_ENV_VAR = "CAPTION_FONT_PATH"
+ENCODER_PRESET_ENV_VAR = "RENDER_X264_PRESET"
+ENCODER_CRF_ENV_VAR = "RENDER_X264_CRF"
 FONT_SIZE = 36
 LINE_SPACING = 6
+DEFAULT_VIDEO_WIDTH = 1280
+FONT_COLOR = "white"
+BOX_COLOR = "0x00000099"
+BOX_BORDER = 20
+ENCODER_ARGS = [
+    "-c:v",
+    "libx264",
+    "-preset",
+    os.getenv(ENCODER_PRESET_ENV_VAR) or "medium",
+    "-crf",
+    os.getenv(ENCODER_CRF_ENV_VAR) or "23",
+]
 DEFAULT_FONT_PATHS = [
     "/Users/admin/Documents/MemeVid/workflows/Jokestruc/arial/ARIAL.TTF",
     "/System/Library/Fonts/Supplemental/Arial.ttf",
@@ -28,6 +42,17 @@ def pick_font_path() -> str:
     )
 
 
+def caption_style(font_size: int = FONT_SIZE) -> Dict[str, Any]:
+    """Return the visual parameters that affect rendered caption pixels."""
+    return {
+        "font_size": font_size,
+        "line_spacing": LINE_SPACING,
+        "font_color": FONT_COLOR,
+        "box_color": BOX_COLOR,
+        "box_border": BOX_BORDER,
+    }
+
+
 def _escape_drawtext(text: str) -> str:
     """Escape special characters for drawtext."""
     return (
@@ -55,10 +80,19 @@ def wrap_caption_lines(
     return wrapped.splitlines()
 
 
+def caption_line_offsets(line_count: int, font_size: int = FONT_SIZE) -> List[int]:
+    """Return each wrapped line's distance from the frame bottom to its top edge."""
+    bottom_margin = font_size  # tweak as needed
+    return [
+        bottom_margin + (line_count - idx) * (font_size + LINE_SPACING)
+        for idx in range(line_count)
+    ]
+
+
 def build_drawtext_filters(
     beat: Dict[str, Any],
     font_path: str,
-    video_width: int = 1280,
+    video_width: int = DEFAULT_VIDEO_WIDTH,
     font_size: int = FONT_SIZE,
 ) -> List[str]:
     """Create drawtext filters for a timing beat, one per wrapped line."""
@@ -69,23 +103,18 @@ def build_drawtext_filters(
     end = float(beat["end"])
 
     filters: List[str] = []
-    total_height = len(caption_lines) * (font_size + LINE_SPACING) - LINE_SPACING
-
-    bottom_margin = font_size  # tweak as needed
+    offsets = caption_line_offsets(len(caption_lines), font_size)
 
-    for idx, line in enumerate(caption_lines):
+    for line, offset in zip(caption_lines, offsets):
         escaped = _escape_drawtext(line)
-        y_offset = (
-            f"h - {bottom_margin} - "
-            f"({len(caption_lines) - idx})*({font_size + LINE_SPACING})"
-        )
+        y_offset = f"h - {offset}"
         filters.append(
             "drawtext="
             f"text='{escaped}':"
             f"fontfile='{font_path}':"
             f"fontsize={font_size}:"
-            "fontcolor=white:"
-            "box=1:boxcolor=0x00000099:boxborderw=20:"
+            f"fontcolor={FONT_COLOR}:"
+            f"box=1:boxcolor={BOX_COLOR}:boxborderw={BOX_BORDER}:"
             "x=(w-text_w)/2:"
             f"y={y_offset}:"
             f"enable=between(t\\,{start}\\,{end})"
@@ -0,0 +1,134 @@
+"""Decide when an input needs a normalized mezzanine and build its transcode."""
+
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MEZZANINE_PIX_FMTS = {"yuv420p", "yuvj420p"}
+MEZZANINE_VIDEO_CODEC = "h264"
+MEZZANINE_AUDIO_CODEC = "aac"
+DEFAULT_FPS = 30
+MAX_FPS = 60
+GOP_SEC = 2
+VFR_TOLERANCE = 0.01
+
+
+def _rate(value: Optional[str]) -> Optional[Fraction]:
+    try:
+        rate = Fraction(value or "")
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def _rotation(stream: Dict[str, Any]) -> int:
+    rotation = (stream.get("tags") or {}).get("rotate")
+    for side_data in stream.get("side_data_list") or []:
+        rotation = side_data.get("rotation", rotation)
+    try:
+        return int(float(rotation or 0)) % 360
+    except ValueError:
+        return 0
+
+
+def display_size(streams: Sequence[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+    """Return the first video stream's upright ``(width, height)``, if probed.
+
+    ffmpeg applies the rotation tag while decoding, so a 90/270 degree
+    rotation swaps the stored dimensions.
+    """
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        return None
+    try:
+        width, height = int(video["width"]), int(video["height"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if _rotation(video) in (90, 270):
+        width, height = height, width
+    return width, height
+
+
+def normalization_reasons(streams: Sequence[Dict[str, Any]]) -> List[str]:
+    """List why a probed input should be normalized; empty means pass through."""
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        return []
+
+    reasons: List[str] = []
+    if video.get("codec_name") != MEZZANINE_VIDEO_CODEC:
+        reasons.append(f"codec:{video.get('codec_name')}")
+    if video.get("pix_fmt") not in MEZZANINE_PIX_FMTS:
+        reasons.append(f"pix_fmt:{video.get('pix_fmt')}")
+    real, average = _rate(video.get("r_frame_rate")), _rate(video.get("avg_frame_rate"))
+    if real and average and abs(float(real - average)) > VFR_TOLERANCE * float(real):
+        reasons.append("vfr")
+    if _rotation(video):
+        reasons.append(f"rotation:{_rotation(video)}")
+    for audio in (s for s in streams if s.get("codec_type") == "audio"):
+        if audio.get("codec_name") != MEZZANINE_AUDIO_CODEC:
+            reasons.append(f"audio:{audio.get('codec_name')}")
+            break
+    return reasons
+
+
+def audio_only(reasons: Sequence[str]) -> bool:
+    """Whether the audio codec is the only reason to normalize."""
+    return bool(reasons) and all(reason.startswith("audio:") for reason in reasons)
+
+
+def mezzanine_fps(streams: Sequence[Dict[str, Any]]) -> int:
+    """Pick the constant frame rate closest to the source's average rate."""
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    average = _rate(video.get("avg_frame_rate")) or _rate(video.get("r_frame_rate"))
+    if not average:
+        return DEFAULT_FPS
+    return max(1, min(round(float(average)), MAX_FPS))
+
+
+def build_mezzanine_command(
+    input_path: Path, output_path: Path, fps: int, copy_video: bool = False
+) -> List[str]:
+    """Transcode to CFR 8-bit H.264/AAC with upright pixels and a fixed GOP.
+
+    ffmpeg applies the rotation tag while decoding, so the mezzanine is
+    stored upright without one; the fixed GOP keeps keyframes evenly spaced
+    for seeking and chunked renders. With ``copy_video`` (the video already
+    qualifies, see :func:`audio_only`) the video stream is copied as is and
+    only the audio is transcoded.
+    """
+    if copy_video:
+        video_args = ["-c:v", "copy"]
+    else:
+        video_args = [
+            "-vf",
+            f"fps={fps},format=yuv420p",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-crf",
+            "18",
+            "-g",
+            str(fps * GOP_SEC),
+        ]
+    return [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(input_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        *video_args,
+        "-c:a",
+        "aac",
+        "-b:a",
+        "160k",
+        "-movflags",
+        "+faststart",
+        "-f",
+        "mp4",
+        str(output_path),
+    ]
@@ -0,0 +1,113 @@
+"""Output target presets and single-pass multi-format filter graphs."""
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from ..artifact_store import safe_name
+from .ffmpeg_util import ENCODER_ARGS, FONT_SIZE, build_drawtext_filters
+
+REFERENCE_SHORT_SIDE = 720
+
+OUTPUT_TARGET_PRESETS: Dict[str, Dict[str, Any]] = {
+    "vertical_1080": {"name": "vertical_1080", "width": 1080, "height": 1920},
+    "square_1080": {"name": "square_1080", "width": 1080, "height": 1080},
+    "landscape_720": {"name": "landscape_720", "width": 1280, "height": 720},
+    "preview": {
+        "name": "preview",
+        "width": 640,
+        "height": 360,
+        "video_bitrate": "400k",
+    },
+}
+
+
+def resolve_output_targets(
+    targets: Sequence[Union[str, Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Expand preset names and validate explicit target dictionaries.
+
+    Target names become part of output file names, so anything that is not
+    already a single safe path component is rejected.
+    """
+    resolved: List[Dict[str, Any]] = []
+    for target in targets:
+        if isinstance(target, str):
+            if target not in OUTPUT_TARGET_PRESETS:
+                raise ValueError(f"Unknown output target preset: {target}")
+            resolved.append(dict(OUTPUT_TARGET_PRESETS[target]))
+            continue
+        preset = OUTPUT_TARGET_PRESETS.get(target.get("name", ""), {})
+        merged = {**preset, **target}
+        if not merged.get("width") or not merged.get("height"):
+            raise ValueError(f"Output target needs width and height: {target}")
+        merged.setdefault("name", f"{merged['width']}x{merged['height']}")
+        resolved.append(merged)
+
+    names = [str(target["name"]) for target in resolved]
+    for name in names:
+        if safe_name(name) != name:
+            raise ValueError(f"Invalid output target name: {name!r}")
+    if len(set(names)) != len(names):
+        raise ValueError(f"Output target names must be unique: {names}")
+    return resolved
+
+
+def target_font_size(target: Dict[str, Any]) -> int:
+    """Scale the caption font with the target's short side."""
+    if target.get("font_size"):
+        return int(target["font_size"])
+    short_side = min(int(target["width"]), int(target["height"]))
+    return max(round(FONT_SIZE * short_side / REFERENCE_SHORT_SIDE), 12)
+
+
+def target_encoder_args(target: Dict[str, Any]) -> List[str]:
+    """Return encoder flags for a target, honouring an optional bitrate cap."""
+    bitrate = target.get("video_bitrate")
+    if not bitrate:
+        return list(ENCODER_ARGS)
+    return [
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-b:v",
+        bitrate,
+        "-maxrate",
+        bitrate,
+        "-bufsize",
+        bitrate,
+    ]
+
+
+def build_multi_target_filtergraph(
+    beats: Sequence[Dict[str, Any]],
+    font_path: str,
+    targets: Sequence[Dict[str, Any]],
+) -> Tuple[str, List[str]]:
+    """Decode once, ``split`` per target, then scale/pad/caption each branch.
+
+    Returns the ``-filter_complex`` string and the output pad label for each
+    target, in order.
+    """
+    branch_labels = [f"[src{idx}]" for idx in range(len(targets))]
+    chains = [f"[0:v]split={len(targets)}{''.join(branch_labels)}"]
+    out_labels: List[str] = []
+
+    for idx, target in enumerate(targets):
+        width, height = int(target["width"]), int(target["height"])
+        font_size = target_font_size(target)
+        filters = [
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            "setsar=1",
+        ]
+        for beat in beats:
+            filters.extend(
+                build_drawtext_filters(
+                    beat, font_path, video_width=width, font_size=font_size
+                )
+            )
+        out_label = f"[out{idx}]"
+        chains.append(f"{branch_labels[idx]}{','.join(filters)}{out_label}")
+        out_labels.append(out_label)
+
+    return ";".join(chains), out_labels
@@ -0,0 +1,152 @@
+"""Build the single-pass ffmpeg command that packages a render for the web."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+MP4_LAYOUTS = {
+    "faststart": "+faststart",
+    "fragmented": "+frag_keyframe+empty_moov+default_base_moof",
+}
+PREVIEW_CODECS = {"webp": ["-c:v", "libwebp", "-quality", "60"], "gif": []}
+
+DEFAULT_PACKAGING: Dict[str, Any] = {
+    "background": True,
+    "layout": "faststart",
+    "hls": False,
+    "hls_segment_sec": 4,
+    "poster": True,
+    "poster_width": 640,
+    "preview": True,
+    "preview_format": "webp",
+    "preview_sec": 3.0,
+    "preview_fps": 10,
+    "preview_width": 320,
+}
+
+
+def package_dir_for(video_path: Path) -> Path:
+    """Return the directory that holds a render's packaged artifacts."""
+    return video_path.parent / f"{video_path.stem}_package"
+
+
+def resolve_packaging_options(options: Any) -> Dict[str, Any]:
+    """Merge ``render_options['packaging']`` over the defaults and validate it."""
+    if options is True or options is None:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError("render_options['packaging'] must be an object or boolean")
+    resolved = {**DEFAULT_PACKAGING, **options}
+    if resolved["layout"] not in MP4_LAYOUTS:
+        raise ValueError(
+            f"Unknown packaging layout {resolved['layout']!r}; "
+            f"expected one of {tuple(MP4_LAYOUTS)}"
+        )
+    if resolved["preview_format"] not in PREVIEW_CODECS:
+        raise ValueError(
+            f"Unknown preview format {resolved['preview_format']!r}; "
+            f"expected one of {tuple(PREVIEW_CODECS)}"
+        )
+    return resolved
+
+
+def _still_filters(options: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Return filtergraph chains and their output labels for poster/preview."""
+    branches: List[Tuple[str, str]] = []
+    if options["poster"]:
+        # ``thumbnail`` picks the most representative frame of the opening batch.
+        branches.append(("poster", f"thumbnail=50,scale={options['poster_width']}:-2"))
+    if options["preview"]:
+        chain = (
+            f"trim=duration={options['preview_sec']},setpts=PTS-STARTPTS,"
+            f"fps={options['preview_fps']},scale={options['preview_width']}:-2"
+        )
+        if options["preview_format"] == "gif":
+            chain += ",split[pal_in][gif_in];[pal_in]palettegen[pal];"
+            chain += "[gif_in][pal]paletteuse"
+        branches.append(("preview", chain))
+
+    if not branches:
+        return [], []
+    if len(branches) == 1:
+        name, chain = branches[0]
+        return [f"[0:v]{chain}[{name}]"], [name]
+    split_labels = "".join(f"[{name}_in]" for name, _ in branches)
+    chains = [f"[0:v]split={len(branches)}{split_labels}"]
+    chains.extend(f"[{name}_in]{chain}[{name}]" for name, chain in branches)
+    return chains, [name for name, _ in branches]
+
+
+def build_packaging_command(
+    video_path: Path, package_dir: Path, options: Dict[str, Any]
+) -> Tuple[List[str], Dict[str, str]]:
+    """Build one ffmpeg invocation that writes every packaging artifact.
+
+    Container outputs are stream copies; poster and preview share a single
+    decode through ``split``. Returns the command and an artifact-to-path map;
+    the caller creates the output directories.
+    """
+    stem = video_path.stem
+    artifacts: Dict[str, str] = {}
+    command = ["ffmpeg", "-y", "-i", str(video_path)]
+
+    chains, labels = _still_filters(options)
+    if chains:
+        command.extend(["-filter_complex", ";".join(chains)])
+
+    mp4_path = package_dir / f"{stem}.mp4"
+    command.extend(["-map", "0:v", "-map", "0:a?", "-c", "copy"])
+    command.extend(["-movflags", MP4_LAYOUTS[options["layout"]], str(mp4_path)])
+    artifacts["mp4"] = str(mp4_path)
+
+    if options["hls"]:
+        hls_dir = package_dir / "hls"
+        playlist = hls_dir / "index.m3u8"
+        command.extend(["-map", "0:v", "-map", "0:a?", "-c", "copy", "-f", "hls"])
+        command.extend(["-hls_time", str(options["hls_segment_sec"])])
+        command.extend(["-hls_playlist_type", "vod", "-hls_segment_type", "fmp4"])
+        command.extend(["-hls_fmp4_init_filename", "init.mp4"])
+        command.extend(["-hls_segment_filename", str(hls_dir / "segment_%03d.m4s")])
+        command.append(str(playlist))
+        artifacts["hls"] = str(playlist)
+
+    for label in labels:
+        command.extend(["-map", f"[{label}]"])
+        if label == "poster":
+            path = package_dir / "poster.jpg"
+            command.extend(["-frames:v", "1", "-q:v", "3", str(path)])
+        else:
+            path = package_dir / f"preview.{options['preview_format']}"
+            command.extend([*PREVIEW_CODECS[options["preview_format"]], "-loop", "0"])
+            command.append(str(path))
+        artifacts[label] = str(path)
+
+    return command, artifacts
+
+
+def build_packaging_manifest(
+    source: Path,
+    artifacts: Dict[str, str],
+    options: Dict[str, Any],
+    elapsed_sec: float,
+) -> Dict[str, Any]:
+    """Describe the packaged artifacts (paths, sizes, layout)."""
+    entries: Dict[str, Any] = {}
+    for name, path in artifacts.items():
+        artifact = Path(path)
+        entry: Dict[str, Any] = {
+            "path": str(artifact),
+            "bytes": artifact.stat().st_size,
+        }
+        if name == "hls":
+            segments = sorted(artifact.parent.glob("segment_*.m4s"))
+            entry["segments"] = [segment.name for segment in segments]
+            entry["bytes"] += sum(segment.stat().st_size for segment in segments)
+        entries[name] = entry
+    entries["mp4"]["layout"] = options["layout"]
+
+    return {
+        "version": 1,
+        "source": str(source),
+        "elapsed_sec": round(elapsed_sec, 3),
+        "artifacts": entries,
+    }
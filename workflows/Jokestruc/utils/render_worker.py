@@ -0,0 +1,273 @@
+"""Optional out-of-process render worker fed over a local multiprocessing queue."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .ffmpeg_runner import (
+    FFmpegError,
+    FFmpegTimeoutError,
+    ProgressCallback,
+    run_ffmpeg_local,
+)
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKER_ENV_VAR = "RENDER_WORKER"
+RENDER_WORKER_MODES = ("inline", "process")
+EVENT_POLL_SEC = 1.0
+
+# Jobs:   ("run", job_id, argv, timeout) | ("cancel", job_id) | None to stop
+# Events: (kind, job_id, payload) with kind in progress/done/error/cancelled
+Message = Tuple[Any, ...]
+# Worker generation the job was queued to, its loop, future and progress hook
+Waiter = Tuple[
+    int, asyncio.AbstractEventLoop, asyncio.Future, Optional[ProgressCallback]
+]
+
+
+def render_worker_enabled() -> bool:
+    """Return True when ffmpeg should run in the separate worker process."""
+    mode = os.getenv(RENDER_WORKER_ENV_VAR, "inline").lower()
+    if mode not in RENDER_WORKER_MODES:
+        raise ValueError(
+            f"{RENDER_WORKER_ENV_VAR} must be one of {RENDER_WORKER_MODES}"
+        )
+    return mode == "process"
+
+
+def _error_payload(exc: BaseException) -> Dict[str, Any]:
+    """Flatten an exception into picklable fields for the event queue."""
+    if isinstance(exc, FFmpegError):
+        message = str(exc).split("\n", 1)[0]
+        return {
+            "timeout": isinstance(exc, FFmpegTimeoutError),
+            "message": message,
+            "command": exc.command,
+            "returncode": exc.returncode,
+            "stderr_tail": exc.stderr_tail,
+        }
+    return {
+        "timeout": False,
+        "message": f"render worker failed: {exc!r}",
+        "command": [],
+        "returncode": None,
+        "stderr_tail": [],
+    }
+
+
+def _rebuild_error(payload: Dict[str, Any]) -> FFmpegError:
+    error_cls = FFmpegTimeoutError if payload["timeout"] else FFmpegError
+    return error_cls(
+        payload["message"],
+        payload["command"],
+        payload["returncode"],
+        payload["stderr_tail"],
+    )
+
+
+async def _run_job(
+    job_id: str,
+    argv: List[str],
+    timeout: Optional[float],
+    events: "multiprocessing.Queue[Message]",
+) -> None:
+    try:
+        tail = await run_ffmpeg_local(
+            argv,
+            timeout=timeout,
+            on_progress=lambda event: events.put(("progress", job_id, event)),
+        )
+    except asyncio.CancelledError:
+        events.put(("cancelled", job_id, None))
+    except Exception as exc:
+        events.put(("error", job_id, _error_payload(exc)))
+    else:
+        events.put(("done", job_id, tail))
+
+
+async def _serve(
+    jobs: "multiprocessing.Queue[Optional[Message]]",
+    events: "multiprocessing.Queue[Message]",
+) -> None:
+    loop = asyncio.get_running_loop()
+    running: Dict[str, "asyncio.Task[None]"] = {}
+    while True:
+        message = await loop.run_in_executor(None, jobs.get)
+        if message is None:
+            break
+        if message[0] == "cancel":
+            task = running.get(message[1])
+            if task is not None:
+                task.cancel()
+            continue
+        _, job_id, argv, timeout = message
+        task = asyncio.ensure_future(_run_job(job_id, argv, timeout, events))
+        running[job_id] = task
+        task.add_done_callback(lambda _, key=job_id: running.pop(key, None))
+    for task in list(running.values()):
+        task.cancel()
+    await asyncio.gather(*running.values(), return_exceptions=True)
+
+
+def _worker_main(
+    jobs: "multiprocessing.Queue[Optional[Message]]",
+    events: "multiprocessing.Queue[Message]",
+) -> None:
+    """Entry point of the worker process."""
+    asyncio.run(_serve(jobs, events))
+
+
+class RenderWorker:
+    """API-side handle that ships ffmpeg jobs to a spawned worker process.
+
+    The scheduler still admits work on the API side; the worker only keeps
+    ffmpeg and its pipe readers off the API's event loop and out of its
+    process tree, so a render crash or stall cannot take the API down.
+    """
+
+    def __init__(self) -> None:
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, Waiter] = {}
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._jobs: Any = None
+        self._events: Any = None
+        # Bumped on every (re)start so a dead worker's reader only fails its own jobs.
+        self._generation = 0
+        self._exited: Set[int] = set()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return
+            self._generation += 1
+            self._jobs = self._ctx.Queue()
+            self._events = self._ctx.Queue()
+            self._process = self._ctx.Process(
+                target=_worker_main,
+                args=(self._jobs, self._events),
+                name="render-worker",
+                daemon=True,
+            )
+            self._process.start()
+            threading.Thread(
+                target=self._read_events,
+                args=(self._process, self._events, self._generation),
+                name="render-worker-events",
+                daemon=True,
+            ).start()
+            logger.info("Started render worker pid %s", self._process.pid)
+
+    def _read_events(
+        self,
+        process: multiprocessing.process.BaseProcess,
+        events: Any,
+        generation: int,
+    ) -> None:
+        """Forward one worker's events to the awaiting futures on their loops."""
+        while True:
+            try:
+                kind, job_id, payload = events.get(timeout=EVENT_POLL_SEC)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self._fail_generation(
+                    generation, f"render worker exited with code {process.exitcode}"
+                )
+                return
+            with self._lock:
+                waiter = self._waiters.get(job_id)
+            if waiter is not None and waiter[0] == generation:
+                _, loop, future, on_progress = waiter
+                loop.call_soon_threadsafe(
+                    self._deliver, future, on_progress, kind, payload
+                )
+
+    def _fail_generation(self, generation: int, message: str) -> None:
+        """Fail the jobs queued to one dead worker, leaving later workers alone."""
+        with self._lock:
+            self._exited.add(generation)
+            waiters = [w for w in self._waiters.values() if w[0] == generation]
+        for _, loop, future, on_progress in waiters:
+            payload = _error_payload(RuntimeError(message))
+            loop.call_soon_threadsafe(
+                self._deliver, future, on_progress, "error", payload
+            )
+
+    @staticmethod
+    def _deliver(
+        future: asyncio.Future,
+        on_progress: Optional[ProgressCallback],
+        kind: str,
+        payload: Any,
+    ) -> None:
+        if future.done():
+            return
+        if kind == "progress":
+            if on_progress is not None:
+                try:
+                    on_progress(payload)
+                except Exception:  # progress reporting must never kill a render
+                    logger.exception("ffmpeg progress callback failed")
+        elif kind == "done":
+            future.set_result(payload)
+        elif kind == "error":
+            future.set_exception(_rebuild_error(payload))
+        else:
+            future.cancel()
+
+    async def run(
+        self,
+        command: Sequence[str],
+        *,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> List[str]:
+        """Run ``command`` in the worker with ``run_ffmpeg`` semantics."""
+        await asyncio.to_thread(self._ensure_started)
+        job_id = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[List[str]]" = loop.create_future()
+        with self._lock:
+            generation, jobs = self._generation, self._jobs
+            if generation in self._exited:
+                # Died between the start check and now; the next call restarts it.
+                raise _rebuild_error(
+                    _error_payload(RuntimeError("render worker exited"))
+                )
+            self._waiters[job_id] = (generation, loop, future, on_progress)
+        try:
+            jobs.put(("run", job_id, list(command), timeout))
+            return await future
+        except asyncio.CancelledError:
+            jobs.put(("cancel", job_id))
+            raise
+        finally:
+            with self._lock:
+                self._waiters.pop(job_id, None)
+
+    def stop(self) -> None:
+        """Ask the worker to cancel its jobs and exit."""
+        with self._lock:
+            process, jobs = self._process, self._jobs
+            self._process = None
+        if process is not None and process.is_alive():
+            jobs.put(None)
+            process.join(timeout=10)
+
+
+_worker: Optional[RenderWorker] = None
+
+
+def get_render_worker() -> RenderWorker:
+    """Return the shared render worker handle, creating it if needed."""
+    global _worker
+    if _worker is None:
+        _worker = RenderWorker()
+    return _worker
@@ -0,0 +1,136 @@
+"""Resource limits for ffmpeg/ffprobe children so renders cannot starve the API."""
+
+import logging
+import os
+import shutil
+from functools import lru_cache
+from typing import List, Optional, Sequence, Set, TypedDict
+
+logger = logging.getLogger(__name__)
+
+NICE_ENV_VAR = "FFMPEG_NICE"
+IONICE_CLASS_ENV_VAR = "FFMPEG_IONICE_CLASS"
+IONICE_LEVEL_ENV_VAR = "FFMPEG_IONICE_LEVEL"
+CPU_AFFINITY_ENV_VAR = "FFMPEG_CPU_AFFINITY"
+MAX_MEMORY_ENV_VAR = "FFMPEG_MAX_MEMORY_BYTES"
+MAX_CPU_SEC_ENV_VAR = "FFMPEG_MAX_CPU_SEC"
+API_CPU_AFFINITY_ENV_VAR = "API_CPU_AFFINITY"
+
+DEFAULT_NICE = 10
+IONICE_CLASSES = {"realtime": "1", "best-effort": "2", "idle": "3"}
+DEFAULT_IONICE_CLASS = "best-effort"
+DEFAULT_IONICE_LEVEL = 7
+SANDBOXED_BINARIES = ("ffmpeg", "ffprobe")
+
+
+class SandboxConfig(TypedDict):
+    nice: int
+    ionice_class: Optional[str]
+    ionice_level: int
+    cpus: Optional[str]
+    max_memory_bytes: Optional[int]
+    max_cpu_sec: Optional[int]
+
+
+def parse_cpu_list(spec: str) -> Set[int]:
+    """Parse a ``taskset``-style CPU list such as ``"2-5,7"``."""
+    cpus: Set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        cpus.update(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+@lru_cache(maxsize=1)
+def load_sandbox_config() -> SandboxConfig:
+    """Read sandbox limits from the environment once per process."""
+    ionice_class = os.getenv(IONICE_CLASS_ENV_VAR, DEFAULT_IONICE_CLASS) or None
+    if ionice_class and ionice_class not in IONICE_CLASSES:
+        raise ValueError(
+            f"{IONICE_CLASS_ENV_VAR} must be one of {tuple(IONICE_CLASSES)}"
+        )
+    cpus = os.getenv(CPU_AFFINITY_ENV_VAR) or None
+    if cpus:
+        parse_cpu_list(cpus)  # fail fast on a malformed list
+    return {
+        "nice": int(os.getenv(NICE_ENV_VAR) or DEFAULT_NICE),
+        "ionice_class": ionice_class,
+        "ionice_level": int(os.getenv(IONICE_LEVEL_ENV_VAR) or DEFAULT_IONICE_LEVEL),
+        "cpus": cpus,
+        "max_memory_bytes": _optional_int(MAX_MEMORY_ENV_VAR),
+        "max_cpu_sec": _optional_int(MAX_CPU_SEC_ENV_VAR),
+    }
+
+
+def render_cpu_count() -> int:
+    """Return how many CPUs ffmpeg children may actually run on.
+
+    Honours ``FFMPEG_CPU_AFFINITY`` first, then the affinity inherited from
+    this process, so thread budgets never assume cores a render cannot use.
+    """
+    cpus = load_sandbox_config()["cpus"]
+    if cpus:
+        return max(len(parse_cpu_list(cpus)), 1)
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+@lru_cache(maxsize=None)
+def _tool(name: str) -> Optional[str]:
+    path = shutil.which(name)
+    if path is None:
+        logger.warning("%s not found; ffmpeg runs without that limit", name)
+    return path
+
+
+def sandbox_argv(
+    command: Sequence[str], config: Optional[SandboxConfig] = None
+) -> List[str]:
+    """Prefix an ffmpeg/ffprobe command with nice, ionice, taskset and prlimit.
+
+    Limits are applied by exec-chaining the util-linux tools instead of a
+    ``preexec_fn``, which is unsafe to run in a forked child of a threaded
+    process such as the API server.
+    """
+    argv = list(command)
+    if not argv or os.path.basename(argv[0]) not in SANDBOXED_BINARIES:
+        return argv
+    config = config or load_sandbox_config()
+
+    prefix: List[str] = []
+    limits = []
+    if config["max_memory_bytes"]:
+        limits.append(f"--as={config['max_memory_bytes']}")
+    if config["max_cpu_sec"]:
+        limits.append(f"--cpu={config['max_cpu_sec']}")
+    if limits and _tool("prlimit"):
+        prefix += ["prlimit", *limits, "--"]
+    if config["cpus"] and _tool("taskset"):
+        prefix += ["taskset", "-c", config["cpus"]]
+    if config["ionice_class"] and _tool("ionice"):
+        prefix += ["ionice", "-c", IONICE_CLASSES[config["ionice_class"]]]
+        if config["ionice_class"] != "idle":
+            prefix += ["-n", str(config["ionice_level"])]
+    if config["nice"] and _tool("nice"):
+        prefix += ["nice", "-n", str(config["nice"])]
+    return prefix + argv
+
+
+def apply_api_affinity() -> Optional[Set[int]]:
+    """Pin the current (API) process to ``API_CPU_AFFINITY`` if it is set."""
+    spec = os.getenv(API_CPU_AFFINITY_ENV_VAR)
+    if not spec or not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = parse_cpu_list(spec)
+    os.sched_setaffinity(0, cpus)
+    logger.info("Pinned API process to CPUs %s", sorted(cpus))
+    return cpus
@@ -0,0 +1,146 @@
+"""Plan keyframe-aligned chunked renders that run across CPU cores."""
+
+import bisect
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .ffmpeg_util import ENCODER_ARGS, build_drawtext_filters
+from .sandbox import render_cpu_count
+
+MIN_CHUNK_SEC = 4.0
+MAX_CHUNKS = 32
+SEGMENT_GROUP = "segments"
+
+
+def choose_chunk_count(
+    duration_sec: float,
+    cores: Optional[int] = None,
+    min_chunk_sec: float = MIN_CHUNK_SEC,
+) -> int:
+    """Pick how many chunks to split a clip into from its length and core count."""
+    cores = cores or render_cpu_count()
+    by_length = int(duration_sec // min_chunk_sec)
+    return max(1, min(cores, by_length, MAX_CHUNKS))
+
+
+def plan_chunks(
+    duration_sec: float, keyframes: Sequence[float], chunk_count: int
+) -> List[Tuple[float, float]]:
+    """Split ``[0, duration)`` into at most ``chunk_count`` keyframe-aligned spans."""
+    cut_points = sorted(t for t in keyframes if 0.0 < t < duration_sec)
+    boundaries = [0.0]
+    for idx in range(1, chunk_count):
+        ideal = duration_sec * idx / chunk_count
+        pos = bisect.bisect_left(cut_points, ideal)
+        candidates = cut_points[max(pos - 1, 0) : pos + 1]
+        if not candidates:
+            continue
+        nearest = min(candidates, key=lambda t: abs(t - ideal))
+        if nearest > boundaries[-1]:
+            boundaries.append(nearest)
+    boundaries.append(duration_sec)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def offset_beats(
+    beats: Sequence[Dict[str, Any]], start: float, end: float
+) -> List[Dict[str, Any]]:
+    """Return the beats visible in ``[start, end)`` rebased to the chunk origin."""
+    shifted: List[Dict[str, Any]] = []
+    for beat in beats:
+        beat_start, beat_end = float(beat["start"]), float(beat["end"])
+        if beat_end <= start or beat_start >= end:
+            continue
+        shifted.append(
+            {
+                **beat,
+                "start": round(max(beat_start, start) - start, 6),
+                "end": round(min(beat_end, end) - start, 6),
+            }
+        )
+    return shifted
+
+
+def build_segment_parallel_plan(
+    input_video: Path,
+    output_path: Path,
+    beats: Sequence[Dict[str, Any]],
+    font_path: str,
+    duration_sec: float,
+    keyframes: Sequence[float],
+    chunk_count: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Build parallel per-chunk caption renders followed by a stream-copy concat.
+
+    Chunk steps share ``parallel_group`` so the renderer runs them together;
+    the concat step remuxes the chunks with the untouched source audio.
+    """
+    chunk_count = chunk_count or choose_chunk_count(duration_sec)
+    chunks = plan_chunks(duration_sec, keyframes, chunk_count)
+
+    work_dir = output_path.parent / f".{output_path.stem}_segments"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    concat_list = work_dir / "concat.txt"
+
+    steps: List[Dict[str, Any]] = []
+    chunk_paths: List[Path] = []
+    for idx, (start, end) in enumerate(chunks):
+        chunk_path = work_dir / f"chunk_{idx:03d}.mp4"
+        chunk_paths.append(chunk_path)
+        draw_filters: List[str] = []
+        for beat in offset_beats(beats, start, end):
+            draw_filters.extend(build_drawtext_filters(beat, font_path))
+
+        command = [
+            "ffmpeg",
+            "-y",
+            "-ss",
+            f"{start:.6f}",
+            "-i",
+            str(input_video),
+            "-t",
+            f"{end - start:.6f}",
+            "-an",
+        ]
+        if draw_filters:
+            command.extend(["-vf", ",".join(draw_filters)])
+        command.extend([*ENCODER_ARGS, str(chunk_path)])
+        steps.append(
+            {
+                "step": f"render_segment_{idx}",
+                "command": command,
+                "outputs": [str(chunk_path)],
+                "parallel_group": SEGMENT_GROUP,
+            }
+        )
+
+    concat_list.write_text(
+        "".join(f"file '{path.name}'\n" for path in chunk_paths), encoding="utf-8"
+    )
+    steps.append(
+        {
+            "step": "concat_segments",
+            "command": [
+                "ffmpeg",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-i",
+                str(input_video),
+                "-map",
+                "0:v",
+                "-map",
+                "1:a?",
+                "-c",
+                "copy",
+                str(output_path),
+            ],
+            "outputs": [str(output_path)],
+            "cleanup": [str(work_dir)],
+        }
+    )
+    return steps
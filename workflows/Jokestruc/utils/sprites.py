@@ -0,0 +1,121 @@
+"""Build single-decode sprite sheets and their WebVTT thumbnail maps."""
+
+import math
+from fractions import Fraction
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from .subtitles import cue_timestamp
+
+SPRITE_COLUMNS = 10
+THUMB_WIDTH = 160
+THUMB_HEIGHT = 90
+DEFAULT_STRIDE_SEC = 2.0
+MAX_SPRITE_FRAMES = 200
+
+
+def effective_stride(
+    duration_sec: float, boundary_count: int, stride_sec: float = DEFAULT_STRIDE_SEC
+) -> float:
+    """Widen the stride so a long clip stays within ``MAX_SPRITE_FRAMES``."""
+    budget = max(MAX_SPRITE_FRAMES - boundary_count - 1, 1)
+    return max(stride_sec, duration_sec / budget)
+
+
+def sprite_rows(duration_sec: float, boundary_count: int, stride_sec: float) -> int:
+    """Return enough tile rows for every frame the select expression can pick."""
+    max_frames = boundary_count + math.ceil(duration_sec / stride_sec) + 1
+    return max(math.ceil(max_frames / SPRITE_COLUMNS), 1)
+
+
+def _select_expression(boundaries: Sequence[float], stride_sec: float) -> str:
+    """Pick the first frame, one frame per stride bucket, and each boundary."""
+    prev_t = "prev_pts*TB"
+    terms = ["eq(n\\,0)", f"gt(floor(t/{stride_sec})\\,floor({prev_t}/{stride_sec}))"]
+    terms.extend(
+        f"gte(t\\,{boundary})*lt({prev_t}\\,{boundary})"
+        for boundary in sorted(set(boundaries))
+        if boundary > 0
+    )
+    return "+".join(terms)
+
+
+def build_sprite_command(
+    video_path: Path,
+    sprite_path: Path,
+    frames_path: Path,
+    duration_sec: float,
+    boundaries: Sequence[float],
+    stride_sec: float,
+) -> List[str]:
+    """Build one decode that tiles the selected frames and logs their times.
+
+    The selected thumbnails are split: one branch is tiled into the sheet,
+    the other goes to a ``framecrc`` log whose PTS give each tile's time.
+    """
+    rows = sprite_rows(duration_sec, len(boundaries), stride_sec)
+    filter_complex = (
+        f"[0:v]select='{_select_expression(boundaries, stride_sec)}',"
+        f"scale={THUMB_WIDTH}:{THUMB_HEIGHT}:force_original_aspect_ratio=decrease,"
+        f"pad={THUMB_WIDTH}:{THUMB_HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1,"
+        f"split[sheet_in][log];[sheet_in]tile={SPRITE_COLUMNS}x{rows}[sheet]"
+    )
+    return [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(video_path),
+        "-an",
+        "-filter_complex",
+        filter_complex,
+        "-map",
+        "[sheet]",
+        "-frames:v",
+        "1",
+        "-q:v",
+        "4",
+        str(sprite_path),
+        "-map",
+        "[log]",
+        "-fps_mode",
+        "passthrough",
+        "-f",
+        "framecrc",
+        str(frames_path),
+    ]
+
+
+def parse_frame_times(framecrc: str) -> List[float]:
+    """Read frame timestamps from ``framecrc`` output."""
+    time_base = Fraction(1)
+    times: List[float] = []
+    for line in framecrc.splitlines():
+        if line.startswith("#tb 0:"):
+            time_base = Fraction(line.split(":", 1)[1].strip())
+        elif line and not line.startswith("#"):
+            fields = [field.strip() for field in line.split(",")]
+            times.append(round(float(int(fields[1]) * time_base), 3))
+    return times
+
+
+def tile_rect(idx: int) -> Tuple[int, int, int, int]:
+    """Return the ``x, y, w, h`` of tile ``idx`` in the sheet."""
+    row, col = divmod(idx, SPRITE_COLUMNS)
+    return col * THUMB_WIDTH, row * THUMB_HEIGHT, THUMB_WIDTH, THUMB_HEIGHT
+
+
+def build_thumbnail_vtt(
+    sprite_name: str, frame_times: Sequence[float], duration_sec: float
+) -> str:
+    """Map each tile to the interval until the next tile as WebVTT cues."""
+    cues = []
+    for idx, start in enumerate(frame_times):
+        end = frame_times[idx + 1] if idx + 1 < len(frame_times) else duration_sec
+        if end <= start:
+            continue
+        x, y, w, h = tile_rect(idx)
+        cues.append(
+            f"{cue_timestamp(start, '.')} --> {cue_timestamp(end, '.')}\n"
+            f"{sprite_name}#xywh={x},{y},{w},{h}\n"
+        )
+    return "WEBVTT\n\n" + "\n".join(cues)
@@ -0,0 +1,56 @@
+"""Build ffmpeg commands for single-frame grabs and captioned stills."""
+
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from .ffmpeg_util import build_drawtext_filters
+
+STILL_JPEG_QUALITY = 4
+
+
+def build_frame_grab_command(
+    video_path: Path, at_sec: float, output_path: Path
+) -> List[str]:
+    """Decode exactly one frame at ``at_sec`` into a lossless PNG.
+
+    ``-ss`` before ``-i`` jumps to the preceding keyframe, so only the
+    frames between it and ``at_sec`` are decoded.
+    """
+    return [
+        "ffmpeg",
+        "-y",
+        "-ss",
+        f"{max(at_sec, 0.0):.3f}",
+        "-i",
+        str(video_path),
+        "-frames:v",
+        "1",
+        "-an",
+        str(output_path),
+    ]
+
+
+def build_caption_stills_command(
+    frame_path: Path,
+    captions: Sequence[str],
+    font_path: str,
+    output_dir: Path,
+) -> Tuple[List[str], List[Path]]:
+    """Composite every caption onto one cached frame in a single invocation."""
+    labels = [f"[in{idx}]" for idx in range(len(captions))]
+    chains = [f"[0:v]split={len(captions)}{''.join(labels)}"]
+    for idx, caption in enumerate(captions):
+        beat = {"start": 0.0, "end": 1.0, "caption": caption}
+        chains.append(
+            f"[in{idx}]{','.join(build_drawtext_filters(beat, font_path))}[out{idx}]"
+        )
+
+    command = ["ffmpeg", "-y", "-i", str(frame_path), "-filter_complex"]
+    command.append(";".join(chains))
+    outputs: List[Path] = []
+    for idx in range(len(captions)):
+        path = output_dir / f"still_{idx:02d}.jpg"
+        command.extend(["-map", f"[out{idx}]", "-frames:v", "1"])
+        command.extend(["-q:v", str(STILL_JPEG_QUALITY), str(path)])
+        outputs.append(path)
+    return command, outputs
@@ -0,0 +1,214 @@
+"""Compile caption timing plans into subtitle documents."""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import yaml
+
+from .ffmpeg_util import (
+    BOX_BORDER,
+    DEFAULT_VIDEO_WIDTH,
+    FONT_SIZE,
+    caption_line_offsets,
+    wrap_caption_lines,
+)
+
+STYLE_CONFIG_PATH = (
+    Path(__file__).resolve().parent.parent / "config" / "caption_style.yaml"
+)
+DEFAULT_VIDEO_HEIGHT = 720
+
+
+@lru_cache(maxsize=1)
+def load_caption_style() -> Dict[str, Any]:
+    """Load caption style overrides merged over the drawtext defaults."""
+    with STYLE_CONFIG_PATH.open() as f:
+        overrides = yaml.safe_load(f) or {}
+    return {
+        "font_name": "Arial",
+        "font_size": FONT_SIZE,
+        "bold": False,
+        "primary_color": "FFFFFF",
+        "box_color": "000000",
+        "box_opacity": 0.6,
+        "box_padding": BOX_BORDER,
+        **overrides,
+    }
+
+
+def _ass_color(rgb: str, opacity: float = 1.0) -> str:
+    """Convert ``RRGGBB`` plus opacity into ASS ``&HAABBGGRR`` notation."""
+    rgb = rgb.lstrip("#")
+    alpha = round((1.0 - opacity) * 255)
+    return f"&H{alpha:02X}{rgb[4:6]}{rgb[2:4]}{rgb[0:2]}".upper()
+
+
+def _ass_timestamp(seconds: float) -> str:
+    """Format seconds as ASS ``H:MM:SS.cc``."""
+    centis = max(round(seconds * 100), 0)
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def _escape_ass(text: str) -> str:
+    """Neutralize ASS override blocks and line-break escapes in caption text."""
+    # A word joiner after each backslash stops libass reading ``\N``-style codes.
+    return (
+        text.replace("\\", "\\\u2060")
+        .replace("{", "\\{")
+        .replace("}", "\\}")
+        .replace("\n", " ")
+    )
+
+
+def build_ass_document(
+    beats: Sequence[Dict[str, Any]],
+    video_width: int = DEFAULT_VIDEO_WIDTH,
+    video_height: int = DEFAULT_VIDEO_HEIGHT,
+    font_size: int = 0,
+) -> str:
+    """Render every beat into one ASS script, one positioned event per line.
+
+    ``video_width``/``video_height`` must be the frame's real size: they
+    become ``PlayResX``/``PlayResY``, and libass stretches that canvas onto
+    the frame. Lines are then wrapped and placed in frame pixels with the
+    same layout as the drawtext backend given the same width, so switching
+    backends does not move captions.
+    """
+    style = load_caption_style()
+    font_size = font_size or int(style["font_size"])
+    primary = _ass_color(style["primary_color"])
+    box = _ass_color(style["box_color"], float(style["box_opacity"]))
+    bold = -1 if style["bold"] else 0
+
+    lines: List[str] = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {video_width}",
+        f"PlayResY: {video_height}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
+        "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, "
+        "ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, "
+        "MarginL, MarginR, MarginV, Encoding",
+        f"Style: Caption,{style['font_name']},{font_size},{primary},{primary},"
+        f"{box},{box},{bold},0,0,0,100,100,0,0,3,{style['box_padding']},0,8,"
+        "0,0,0,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, "
+        "Effect, Text",
+    ]
+
+    center_x = video_width // 2
+    for beat in beats:
+        start = _ass_timestamp(float(beat["start"]))
+        end = _ass_timestamp(float(beat["end"]))
+        caption_lines = wrap_caption_lines(
+            beat["caption"], video_width=video_width, font_size=font_size
+        )
+        offsets = caption_line_offsets(len(caption_lines), font_size)
+        for text, offset in zip(caption_lines, offsets):
+            lines.append(
+                f"Dialogue: 0,{start},{end},Caption,,0,0,0,,"
+                f"{{\\pos({center_x},{video_height - offset})}}{_escape_ass(text)}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def cue_timestamp(seconds: float, separator: str) -> str:
+    """Format seconds as ``HH:MM:SS<sep>mmm`` for SRT and WebVTT."""
+    millis = max(round(seconds * 1000), 0)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _cue_text(beat: Dict[str, Any], video_width: int, font_size: int) -> str:
+    return "\n".join(
+        wrap_caption_lines(
+            beat["caption"], video_width=video_width, font_size=font_size
+        )
+    )
+
+
+def build_srt_document(
+    beats: Sequence[Dict[str, Any]],
+    video_width: int = DEFAULT_VIDEO_WIDTH,
+    font_size: int = FONT_SIZE,
+) -> str:
+    """Render beats as a SubRip document with the layout's line breaks."""
+    cues = [
+        f"{idx}\n{cue_timestamp(float(beat['start']), ',')} --> "
+        f"{cue_timestamp(float(beat['end']), ',')}\n"
+        f"{_cue_text(beat, video_width, font_size)}\n"
+        for idx, beat in enumerate(beats, start=1)
+    ]
+    return "\n".join(cues)
+
+
+def build_webvtt_document(
+    beats: Sequence[Dict[str, Any]],
+    video_width: int = DEFAULT_VIDEO_WIDTH,
+    font_size: int = FONT_SIZE,
+) -> str:
+    """Render beats as a WebVTT document with the layout's line breaks."""
+    cues = [
+        f"{cue_timestamp(float(beat['start']), '.')} --> {cue_timestamp(float(beat['end']), '.')}"
+        f" align:center\n{_cue_text(beat, video_width, font_size)}\n"
+        for beat in beats
+    ]
+    return "WEBVTT\n\n" + "\n".join(cues)
+
+
+def build_overlay_manifest(
+    beats: Sequence[Dict[str, Any]],
+    video_width: int = DEFAULT_VIDEO_WIDTH,
+    video_height: int = DEFAULT_VIDEO_HEIGHT,
+    font_size: int = 0,
+) -> Dict[str, Any]:
+    """Describe caption boxes for client-side overlay rendering.
+
+    Positions are in ``canvas`` pixels, which should be the source frame's
+    real size; each line is anchored at its top-centre, matching the
+    burned-in layout.
+    """
+    style = load_caption_style()
+    font_size = font_size or int(style["font_size"])
+    cues = []
+    for beat in beats:
+        caption_lines = wrap_caption_lines(
+            beat["caption"], video_width=video_width, font_size=font_size
+        )
+        offsets = caption_line_offsets(len(caption_lines), font_size)
+        cues.append(
+            {
+                "start": float(beat["start"]),
+                "end": float(beat["end"]),
+                "caption": beat["caption"],
+                "lines": [
+                    {"text": text, "x": video_width // 2, "y": video_height - offset}
+                    for text, offset in zip(caption_lines, offsets)
+                ],
+            }
+        )
+    return {
+        "version": 1,
+        "canvas": {"width": video_width, "height": video_height},
+        "anchor": "top-center",
+        "style": {**style, "font_size": font_size},
+        "cues": cues,
+    }
+
+
+def escape_filter_path(path: str) -> str:
+    """Quote a file path for use as an ffmpeg filter option value."""
+    return "'" + path.replace("'", r"'\''") + "'"
@@ -0,0 +1,60 @@
+"""Generate synthetic test clips with ffmpeg's lavfi sources."""
+
+import subprocess
+from pathlib import Path
+from typing import List
+
+
+def make_test_clip(
+    output_path: Path,
+    duration_sec: float,
+    width: int = 1280,
+    height: int = 720,
+    fps: int = 30,
+    gop_sec: float = 2.0,
+) -> Path:
+    """Encode a ``testsrc2`` + ``sine`` clip with a fixed keyframe interval."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    gop = max(int(fps * gop_sec), 1)
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={width}x{height}:rate={fps}:duration={duration_sec}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:sample_rate=48000:duration={duration_sec}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-pix_fmt",
+        "yuv420p",
+        "-g",
+        str(gop),
+        "-keyint_min",
+        str(gop),
+        "-sc_threshold",
+        "0",
+        "-c:a",
+        "aac",
+        "-shortest",
+        str(output_path),
+    ]
+    subprocess.run(cmd, check=True)
+    return output_path
+
+
+def synthetic_keyframes(
+    duration_sec: float, fps: int = 30, gop_sec: float = 2.0
+) -> List[float]:
+    """Return the keyframe times ``make_test_clip`` produces for a duration."""
+    gop = max(int(fps * gop_sec), 1)
+    step = gop / fps
+    count = int(duration_sec / step) + 1
+    return [round(idx * step, 6) for idx in range(count) if idx * step < duration_sec]
@@ -0,0 +1,57 @@
+"""Compute trim windows so renders cover only the part of the clip that is used."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_LEAD_IN_SEC = 0.5
+DEFAULT_LEAD_OUT_SEC = 0.5
+TRIM_SOURCES = ("segment", "beats")
+
+
+def trim_window(
+    source: str,
+    selected_segment: Optional[Dict[str, Any]],
+    beats: Sequence[Dict[str, Any]],
+    lead_in_sec: float = DEFAULT_LEAD_IN_SEC,
+    lead_out_sec: float = DEFAULT_LEAD_OUT_SEC,
+    duration_sec: Optional[float] = None,
+) -> Tuple[float, float]:
+    """Return the padded ``(start, end)`` window to render, clamped to the clip.
+
+    ``source="segment"`` uses the selected segment, widened to cover any
+    beat that spills past it; ``source="beats"`` spans the beats alone.
+    """
+    if source not in TRIM_SOURCES:
+        raise ValueError(f"Unknown trim source {source!r}; expected {TRIM_SOURCES}")
+
+    starts = [float(beat["start"]) for beat in beats]
+    ends = [float(beat["end"]) for beat in beats]
+    if source == "segment":
+        segment = selected_segment or {}
+        if segment.get("start") is None or segment.get("end") is None:
+            raise ValueError("selected_segment is required to trim to the segment")
+        starts.append(float(segment["start"]))
+        ends.append(float(segment["end"]))
+
+    start = max(min(starts) - max(lead_in_sec, 0.0), 0.0)
+    end = max(ends) + max(lead_out_sec, 0.0)
+    if duration_sec:
+        end = min(end, float(duration_sec))
+    if end <= start:
+        raise ValueError(f"Empty trim window {start:.3f}-{end:.3f}s")
+    return round(start, 6), round(end, 6)
+
+
+def seek_input_args(
+    input_path: str, window: Optional[Tuple[float, float]]
+) -> List[str]:
+    """Return ``-i`` arguments, fast-seeking into ``window`` when one is given.
+
+    ``-ss``/``-t`` go before ``-i`` so the demuxer jumps straight to the
+    keyframe ahead of the window instead of decoding from the start; when
+    re-encoding, ffmpeg then drops frames up to ``start`` so the cut stays
+    frame-accurate.
+    """
+    if window is None:
+        return ["-i", input_path]
+    start, end = window
+    return ["-ss", f"{start:.6f}", "-t", f"{end - start:.6f}", "-i", input_path]
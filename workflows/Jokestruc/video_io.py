@@ -1,19 +1,29 @@
 """Video I/O utilities for duration probing and uploads."""
 
 import asyncio
+import hashlib
 import json
 import logging
+import os
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import google.generativeai as genai
 
+from .tracing import span
+from .utils.sandbox import sandbox_argv
+
 # from google.generativeai import files
 
 
 logger = logging.getLogger(__name__)
 
+FINGERPRINT_CHUNK_BYTES = 1024 * 1024
+UPLOAD_POLL_ENV_VAR = "GEMINI_UPLOAD_POLL_SEC"
+DEFAULT_UPLOAD_POLL_SEC = 2.0
+_fingerprints: Dict[Tuple[str, int, int], str] = {}
+
 
 def probe_duration_seconds(video_path: Path) -> Optional[float]:
     """Return the duration of a video file in seconds using ffprobe."""
@@ -29,7 +39,10 @@ def probe_duration_seconds(video_path: Path) -> Optional[float]:
         "json",
         str(video_path),
     ]
-    completed = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    with span("ffprobe.duration", file=video_path.name):
+        completed = subprocess.run(
+            sandbox_argv(cmd), capture_output=True, text=True, check=False
+        )
     if completed.returncode != 0:
         return None
 
@@ -40,6 +53,49 @@ def probe_duration_seconds(video_path: Path) -> Optional[float]:
         return None
 
 
+def probe_streams(video_path: Path) -> Optional[List[Dict[str, Any]]]:
+    """Return codec, pixel format, frame rate and rotation for every stream."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "stream=index,codec_type,codec_name,pix_fmt,r_frame_rate,avg_frame_rate,"
+        "width,height:stream_tags=rotate:stream_side_data=rotation",
+        "-of",
+        "json",
+        str(video_path),
+    ]
+    with span("ffprobe.streams", file=video_path.name):
+        completed = subprocess.run(
+            sandbox_argv(cmd), capture_output=True, text=True, check=False
+        )
+    if completed.returncode != 0:
+        return None
+
+    try:
+        return json.loads(completed.stdout).get("streams", [])
+    except ValueError:
+        return None
+
+
+def content_fingerprint(path: Path) -> str:
+    """Return a SHA-256 digest of a file's contents, memoized by size and mtime."""
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    cached = _fingerprints.get(memo_key)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    fingerprint = digest.hexdigest()
+    _fingerprints[memo_key] = fingerprint
+    return fingerprint
+
+
 async def upload_video_file(video_path: Path) -> str:
     """Upload a video to Gemini and return its file URI."""
     logger.info(f"Uploading video: {video_path.name}")
@@ -50,13 +106,20 @@ async def upload_video_file(video_path: Path) -> str:
             display_name=video_path.name,
         )
 
-    file_obj = await asyncio.to_thread(_upload)
+    poll_sec = float(os.getenv(UPLOAD_POLL_ENV_VAR) or DEFAULT_UPLOAD_POLL_SEC)
+    with span("gemini.upload", file=video_path.name) as current:
+        current.set_attribute("bytes", video_path.stat().st_size)
+        file_obj = await asyncio.to_thread(_upload)
     logger.info(f"Upload initiated for {video_path.name}, state={file_obj.state.name}")
 
-    while file_obj.state.name == "PROCESSING":
-        logger.debug(f"File {file_obj.name} still processing...")
-        await asyncio.sleep(2)
-        file_obj = genai.get_file(file_obj.name)
+    with span("gemini.upload_poll", poll_sec=poll_sec) as current:
+        polls = 0
+        while file_obj.state.name == "PROCESSING":
+            logger.debug(f"File {file_obj.name} still processing...")
+            await asyncio.sleep(poll_sec)
+            file_obj = await asyncio.to_thread(genai.get_file, file_obj.name)
+            polls += 1
+        current.set_attributes({"polls": polls, "state": file_obj.state.name})
 
     if file_obj.state.name != "ACTIVE":
         logger.error(f"Upload failed: state={file_obj.state.name}")